@@ -3,6 +3,7 @@ import express from 'express';
 import serverless from 'serverless-http';
 import { registerRoutes } from "../server/routes";
 import { connectDB } from "../server/db";
+import { migrateIndexes } from "../server/migrations";
 
 const app = express();
 app.use(express.json());
@@ -10,6 +11,7 @@ app.use(express.urlencoded({ extended: false }));
 
 const initPromise: Promise<void> = (async () => {
   await connectDB();
+  await migrateIndexes();
   await registerRoutes(app);
 })();
 
@@ -3,6 +3,7 @@ import express from 'express';
 import serverless from 'serverless-http';
 import { registerRoutes } from "../server/routes";
 import { connectDB } from "../server/db";
+import { migrateIndexes } from "../server/migrations";
 
 let cachedHandler: ((req: any, res: any) => any) | null = null;
 let initError: Error | null = null;
@@ -21,6 +22,7 @@ export async function getServerlessHandler() {
     console.log('Connecting to database...');
     await connectDB();
     console.log('Database connected successfully');
+    await migrateIndexes();
 
     console.log('Registering routes...');
     await registerRoutes(app);
@@ -3,6 +3,7 @@ import express from 'express';
 import serverless from 'serverless-http';
 import { registerRoutes } from "../server/routes";
 import { connectDB } from "../server/db";
+import { migrateIndexes } from "../server/migrations";
 
 // Create a new Express app instance for the serverless function
 const app = express();
@@ -12,6 +13,7 @@ app.use(express.urlencoded({ extended: false }));
 // Initialize DB and register routes once per cold start
 const initPromise: Promise<void> = (async () => {
   await connectDB();
+  await migrateIndexes();
   await registerRoutes(app);
 })();
 
@@ -1,5 +1,5 @@
-import { useState } from 'react';
-import { useMutation, useQueryClient } from '@tanstack/react-query';
+import { useEffect, useState } from 'react';
+import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query';
 import { apiRequest } from '@/lib/queryClient';
 import { useToast } from '@/hooks/use-toast';
 // Removed unused FoodEntryDocument import
@@ -59,21 +59,17 @@ interface AnalysisResult {
   suggestions: string[];
 }
 
-// Enhanced food database with more accurate nutritional information
-const foodDatabase = [
-  { name: "Chicken Breast (100g)", calories: 165, protein: 31, carbs: 0, fat: 3.6, fiber: 0, sugar: 0, category: "protein" },
-  { name: "Salmon (100g)", calories: 208, protein: 25, carbs: 0, fat: 12, fiber: 0, sugar: 0, category: "protein" },
-  { name: "Quinoa (1 cup cooked)", calories: 222, protein: 8, carbs: 39, fat: 4, fiber: 5, sugar: 2, category: "grain" },
-  { name: "Greek Yogurt (170g)", calories: 100, protein: 17, carbs: 6, fat: 0.5, fiber: 0, sugar: 4, category: "dairy" },
-  { name: "Banana (medium)", calories: 105, protein: 1.3, carbs: 27, fat: 0.4, fiber: 3, sugar: 14, category: "fruit" },
-  { name: "Apple (medium)", calories: 95, protein: 0.5, carbs: 25, fat: 0.3, fiber: 4, sugar: 19, category: "fruit" },
-  { name: "Almonds (28g)", calories: 164, protein: 6, carbs: 6, fat: 14, fiber: 4, sugar: 1, category: "nuts" },
-  { name: "Spinach (1 cup raw)", calories: 7, protein: 0.9, carbs: 1, fat: 0.1, fiber: 0.7, sugar: 0.1, category: "vegetable" },
-  { name: "Sweet Potato (100g)", calories: 86, protein: 1.6, carbs: 20, fat: 0.1, fiber: 3, sugar: 4, category: "vegetable" },
-  { name: "Oatmeal (1 cup cooked)", calories: 166, protein: 6, carbs: 28, fat: 3.6, fiber: 4, sugar: 1, category: "grain" },
-  { name: "Egg (large)", calories: 70, protein: 6, carbs: 0.6, fat: 5, fiber: 0, sugar: 0.4, category: "protein" },
-  { name: "Avocado (100g)", calories: 160, protein: 2, carbs: 9, fat: 15, fiber: 7, sugar: 0.7, category: "fruit" },
-];
+// A match from the server's nutrition index; values are per servingSize
+interface FoodSearchResult {
+  name: string;
+  servingSize: string;
+  calories: number;
+  protein: number;
+  carbs: number;
+  fat: number;
+  fiber: number;
+  sugar: number;
+}
 
 const FoodEntryForm = () => {
   const { toast } = useToast();
@@ -122,8 +118,9 @@ const FoodEntryForm = () => {
     };
   };
 
-  const handleFoodSelect = (food: typeof foodDatabase[0]) => {
+  const handleFoodSelect = (food: FoodSearchResult) => {
     form.setValue('name', food.name);
+    form.setValue('servingSize', food.servingSize);
     form.setValue('calories', food.calories);
     form.setValue('protein', food.protein);
     form.setValue('carbs', food.carbs);
@@ -133,9 +130,19 @@ const FoodEntryForm = () => {
     setShowFoodDatabase(false);
   };
 
-  const filteredFoods = foodDatabase.filter(food =>
-    food.name.toLowerCase().includes(form.watch('name').toLowerCase())
-  );
+  // Search the server's nutrition index once typing pauses
+  const searchTerm = form.watch('name');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 200);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  const { data: searchResults } = useQuery<{ foods: FoodSearchResult[] }>({
+    queryKey: [`/api/foods/search?${new URLSearchParams({ q: debouncedSearch })}`],
+    enabled: showFoodDatabase && debouncedSearch.length >= 2,
+  });
+  const filteredFoods = searchResults?.foods ?? [];
 
   const mutation = useMutation({
     mutationFn: async (data: FoodEntryFormData) => {
@@ -555,16 +562,16 @@ const FoodEntryForm = () => {
                 <div className="card-body">
                   <h3 className="card-title">Food Database</h3>
                   <div className="space-y-2 max-h-60 overflow-y-auto">
-                    {filteredFoods.map((food, index) => (
+                    {filteredFoods.map((food) => (
                       <button
-                        key={index}
+                        key={food.name}
                         onClick={() => handleFoodSelect(food)}
                         className="btn btn-ghost w-full justify-start text-left"
                       >
                         <div>
                           <div className="font-medium">{food.name}</div>
                           <div className="text-sm text-base-content/70">
-                            {food.calories} cal • {food.protein}g protein • {food.carbs}g carbs • {food.fat}g fat
+                            {food.servingSize} • {food.calories} cal • {food.protein}g protein • {food.carbs}g carbs • {food.fat}g fat
                           </div>
                         </div>
                       </button>
@@ -2,7 +2,7 @@ import { useEffect, useRef } from 'react';
 import { useQuery } from '@tanstack/react-query';
 import { Chart, PolarAreaController, RadialLinearScale, ArcElement, Tooltip } from 'chart.js';
 import { Progress } from '@/components/ui/progress';
-import { FoodEntryDocument } from '../types';
+import type { DailySummary } from '@/hooks/use-dashboard-data';
 
 Chart.register(PolarAreaController, RadialLinearScale, ArcElement, Tooltip);
 
@@ -10,33 +10,25 @@ const NutrientBreakdownChart = ({ userId = 1 }) => {
   const chartRef = useRef<HTMLCanvasElement>(null);
   const chartInstance = useRef<Chart | null>(null);
   
-  // Fetch food entries
-  const { data: todayEntries = [] } = useQuery<FoodEntryDocument[]>({
-    queryKey: [`/api/food-entries/daily?userId=${userId}`],
-    initialData: []
+  // Today's totals, summed on the server
+  const { data: dailySummary } = useQuery<DailySummary>({
+    queryKey: [`/api/food-entries/daily?userId=${userId}`]
   });
   
-  // Calculate macronutrient totals and percentages
+  // Calculate macronutrient percentages
   const calculateMacros = () => {
-    if (!todayEntries || !todayEntries.length) {
-      return { protein: 0, carbs: 0, fat: 0, proteinPct: 0, carbsPct: 0, fatPct: 0 };
-    }
-    
-    const totals = todayEntries.reduce((acc, entry) => {
-      return {
-        protein: acc.protein + (entry.protein || 0),
-        carbs: acc.carbs + (entry.carbs || 0),
-        fat: acc.fat + (entry.fat || 0),
-      };
-    }, { protein: 0, carbs: 0, fat: 0 });
-    
-    const totalCals = totals.protein * 4 + totals.carbs * 4 + totals.fat * 9;
+    const protein = dailySummary?.protein || 0;
+    const carbs = dailySummary?.carbs || 0;
+    const fat = dailySummary?.fat || 0;
+    const totalCals = protein * 4 + carbs * 4 + fat * 9;
     
     return {
-      ...totals,
-      proteinPct: totalCals > 0 ? Math.round((totals.protein * 4 / totalCals) * 100) : 0,
-      carbsPct: totalCals > 0 ? Math.round((totals.carbs * 4 / totalCals) * 100) : 0,
-      fatPct: totalCals > 0 ? Math.round((totals.fat * 9 / totalCals) * 100) : 0,
+      protein,
+      carbs,
+      fat,
+      proteinPct: totalCals > 0 ? Math.round((protein * 4 / totalCals) * 100) : 0,
+      carbsPct: totalCals > 0 ? Math.round((carbs * 4 / totalCals) * 100) : 0,
+      fatPct: totalCals > 0 ? Math.round((fat * 9 / totalCals) * 100) : 0,
     };
   };
   
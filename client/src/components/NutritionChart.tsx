@@ -1,56 +1,25 @@
 import { useEffect, useRef } from 'react';
 import { useQuery } from '@tanstack/react-query';
 import { Chart, DoughnutController, ArcElement, Legend, Tooltip } from 'chart.js';
-import { FoodEntryDocument } from '../types';
+import type { DailySummary } from '@/hooks/use-dashboard-data';
 import { useAuth } from '@/hooks/use-auth';
 
 Chart.register(DoughnutController, ArcElement, Legend, Tooltip);
 
-interface NutritionTotals {
-  calories: number;
-  protein: number;
-  carbs: number;
-  fat: number;
-}
-
 const NutritionChart = () => {
   const chartRef = useRef<HTMLCanvasElement>(null);
   const chartInstance = useRef<Chart | null>(null);
   const { user } = useAuth();
   
-  // Fetch food entries with proper typing
-  const { data: todayEntries = [], isLoading } = useQuery<FoodEntryDocument[]>({
+  // Today's totals, summed on the server
+  const { data: dailySummary, isLoading } = useQuery<DailySummary>({
     queryKey: [`/api/food-entries/daily?userId=${user?.id}`],
-    initialData: [],
     enabled: !!user?.id
   });
   
-  // Calculate macronutrient totals and percentages
-  const calculateMacros = () => {
-    if (!todayEntries || !todayEntries.length) {
-      return { protein: 0, carbs: 0, fat: 0, proteinPct: 0, carbsPct: 0, fatPct: 0 };
-    }
-    
-    const totals = todayEntries.reduce((acc: NutritionTotals, entry: FoodEntryDocument) => {
-      return {
-        calories: acc.calories + (entry.calories || 0),
-        protein: acc.protein + (entry.protein || 0),
-        carbs: acc.carbs + (entry.carbs || 0),
-        fat: acc.fat + (entry.fat || 0)
-      };
-    }, { calories: 0, protein: 0, carbs: 0, fat: 0 });
-    
-    const totalCals = totals.protein * 4 + totals.carbs * 4 + totals.fat * 9;
-    
-    return {
-      ...totals,
-      proteinPct: totalCals > 0 ? Math.round((totals.protein * 4 / totalCals) * 100) : 0,
-      carbsPct: totalCals > 0 ? Math.round((totals.carbs * 4 / totalCals) * 100) : 0,
-      fatPct: totalCals > 0 ? Math.round((totals.fat * 9 / totalCals) * 100) : 0,
-    };
-  };
-  
-  const { protein, carbs, fat } = calculateMacros();
+  const protein = dailySummary?.protein || 0;
+  const carbs = dailySummary?.carbs || 0;
+  const fat = dailySummary?.fat || 0;
   
   // Calculate percentages
   const totalGrams = protein + carbs + fat;
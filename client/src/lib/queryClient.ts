@@ -25,6 +25,57 @@ export const apiRequest = async (
   return res;
 };
 
+export type ServerSentEvent = { event: string; data: any };
+
+// POST a JSON body and hand each Server-Sent Event in the response to onEvent
+// as it arrives. EventSource only does GET, so the stream is read by hand.
+export const postEventStream = async (
+  path: string,
+  body: unknown,
+  onEvent: (event: ServerSentEvent) => void,
+  signal?: AbortSignal
+): Promise<void> => {
+  const res = await fetch(path, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "text/event-stream",
+    },
+    credentials: "include",
+    body: JSON.stringify(body),
+    signal,
+  });
+
+  await throwIfResNotOk(res);
+  if (!res.body) {
+    throw new Error("Response has no body to stream");
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value.replace(/\r\n/g, "\n");
+
+    // Events end with a blank line; lines starting with ":" are comments
+    let boundary: number;
+    while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = "message";
+      const data: string[] = [];
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data.push(line.slice(5).replace(/^ /, ""));
+      }
+      if (data.length > 0) {
+        onEvent({ event, data: JSON.parse(data.join("\n")) });
+      }
+    }
+  }
+};
+
 type UnauthorizedBehavior = "returnNull" | "throw";
 export const getQueryFn: <T>(options: {
   on401: UnauthorizedBehavior;
@@ -60,3 +111,9 @@ export const queryClient = new QueryClient({
   },
 });
 
+
+// Exposed in development so the Playwright harness can wait for fetches to
+// settle instead of sleeping (testsprite_tests/harness/waits.py)
+if (import.meta.env.DEV) {
+  (window as any).__REACT_QUERY_CLIENT__ = queryClient;
+}
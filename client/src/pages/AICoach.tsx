@@ -1,7 +1,7 @@
 import { useState, useRef, useEffect } from 'react';
 import { motion } from 'framer-motion';
-import { useQuery, useMutation } from '@tanstack/react-query';
-import { apiRequest } from '@/lib/queryClient';
+import { useQuery } from '@tanstack/react-query';
+import { postEventStream } from '@/lib/queryClient';
 import { useToast } from '@/hooks/use-toast';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
@@ -199,10 +199,30 @@ export default function AICoach() {
     }
   }, [messages]);
 
-  // Enhanced AI chat mutation
-  const chatMutation = useMutation({
-    mutationFn: async (message: string) => {
-      const response = await apiRequest('POST', '/api/chat', {
+  // Stream the coach's reply into the chat as it is generated (POST /api/chat/stream):
+  // `token` events extend the message, and `done` replaces it with the saved
+  // reply plus its action items, follow-up questions and category
+  const streamReply = async (message: string) => {
+    const aiMessageId = `${Date.now()}_ai`;
+    let received = false;
+    const showReply = (update: (current: Message) => Message) => {
+      if (received) {
+        setMessages(prev => prev.map(m => (m.id === aiMessageId ? update(m) : m)));
+        return;
+      }
+      received = true;
+      setIsTyping(false);
+      setMessages(prev => [...prev, update({
+        id: aiMessageId,
+        text: '',
+        sender: 'ai',
+        timestamp: new Date(),
+        type: 'instruction'
+      })]);
+    };
+
+    try {
+      await postEventStream('/api/chat/stream', {
         message,
         conversationId,
         userContext: {
@@ -212,35 +232,34 @@ export default function AICoach() {
           availableTime: '1 hour daily',
           equipment: ['dumbbells', 'resistance bands']
         }
-      });
-      return response.json();
-    },
-    onSuccess: (data) => {
-      const aiMessage: Message = {
-        id: Date.now().toString(),
-        text: data.response || generateEnhancedAIResponse(data.message),
-        sender: 'ai',
-        timestamp: new Date(),
-        type: 'instruction',
-        metadata: {
-          category: data.category || determineMessageCategory(data.message),
-          actionItems: data.actionItems || extractActionItems(data.response),
-          followUpQuestions: data.followUpQuestions || generateFollowUpQuestions(data.message),
-          confidence: data.confidence || 0.9
+      }, ({ event, data }) => {
+        if (event === 'token') {
+          showReply(current => ({ ...current, text: current.text + data.text }));
+        } else if (event === 'done') {
+          showReply(current => ({
+            ...current,
+            text: data.response || current.text || generateEnhancedAIResponse(message),
+            metadata: {
+              category: data.category || determineMessageCategory(message),
+              actionItems: data.actionItems || extractActionItems(data.response),
+              followUpQuestions: data.followUpQuestions || generateFollowUpQuestions(message),
+              confidence: data.confidence || 0.9
+            }
+          }));
+        } else if (event === 'error') {
+          throw new Error(data.message);
         }
-      };
-      setMessages(prev => [...prev, aiMessage]);
-      setIsTyping(false);
-    },
-    onError: () => {
+      });
+    } catch {
       toast({
         title: 'Error',
         description: 'Failed to get AI response. Please try again.',
         variant: 'destructive',
       });
+    } finally {
       setIsTyping(false);
     }
-  });
+  };
 
   const sendMessage = async (text: string) => {
     if (!text.trim()) return;
@@ -256,7 +275,7 @@ export default function AICoach() {
     setInputValue('');
     setIsTyping(true);
 
-    chatMutation.mutate(text);
+    void streamReply(text);
   };
 
   const generateEnhancedAIResponse = (userInput: string): string => {
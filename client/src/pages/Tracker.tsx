@@ -1,6 +1,6 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { motion } from 'framer-motion';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { apiRequest } from '@/lib/queryClient';
 import { useToast } from '@/hooks/use-toast';
 import { useAuth } from '@/hooks/use-auth';
@@ -47,6 +47,13 @@ interface WeeklyData {
   calories: number;
 }
 
+interface FoodEntryPage {
+  entries: FoodEntryDocument[];
+  nextCursor: string | null;
+}
+
+const ENTRIES_PAGE_SIZE = 25;
+
 interface NutritionGoals {
   calorieGoal: number;
   proteinGoal: number;
@@ -63,6 +70,13 @@ export default function Tracker() {
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedMeal, setSelectedMeal] = useState<string>('all');
   const [selectedDate, setSelectedDate] = useState(new Date());
+  const [debouncedSearch, setDebouncedSearch] = useState('');
+
+  // Wait for a pause in typing before asking the server for a new name filter
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
 
   // Fetch daily summary
   const { data: dailySummary, isLoading: summaryLoading } = useQuery<DailySummary>({
@@ -82,9 +96,37 @@ export default function Tracker() {
     enabled: !!user?.id,
   });
 
-  // Fetch food entries
-  const { data: foodEntries, isLoading: entriesLoading } = useQuery<FoodEntryDocument[]>({
-    queryKey: ['/api/food-entries'],
+  // Fetch the selected day's food entries a page at a time, filtered on the server
+  const dayStart = new Date(selectedDate);
+  dayStart.setHours(0, 0, 0, 0);
+  const dayEnd = new Date(dayStart);
+  dayEnd.setDate(dayEnd.getDate() + 1);
+  const entryFilters = {
+    from: dayStart.toISOString(),
+    to: dayEnd.toISOString(),
+    mealType: selectedMeal === 'all' ? undefined : selectedMeal,
+    name: debouncedSearch || undefined,
+  };
+
+  const {
+    data: entryPages,
+    isLoading: entriesLoading,
+    hasNextPage,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
+    queryKey: ['/api/food-entries', entryFilters],
+    queryFn: async ({ pageParam }) => {
+      const params = new URLSearchParams({ limit: String(ENTRIES_PAGE_SIZE) });
+      for (const [key, value] of Object.entries(entryFilters)) {
+        if (value) params.set(key, value);
+      }
+      if (pageParam) params.set('cursor', pageParam);
+      const res = await apiRequest('GET', `/api/food-entries?${params}`);
+      return (await res.json()) as FoodEntryPage;
+    },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
     enabled: !!user?.id,
   });
 
@@ -110,14 +152,8 @@ export default function Tracker() {
     },
   });
 
-  // Filter entries based on search and meal type
-  const filteredEntries = foodEntries?.filter(entry => {
-    const matchesSearch = entry.name.toLowerCase().includes(searchTerm.toLowerCase());
-    const matchesMeal = selectedMeal === 'all' || entry.mealType === selectedMeal;
-    const entryDate = new Date(entry.timestamp);
-    const matchesDate = entryDate.toDateString() === selectedDate.toDateString();
-    return matchesSearch && matchesMeal && matchesDate;
-  }) || [];
+  // Search, meal type and date are applied by the server
+  const filteredEntries = entryPages?.pages.flatMap(page => page.entries) ?? [];
 
   // Calculate progress percentages
   const getProgressPercentage = (current: number, goal: number) => {
@@ -459,7 +495,7 @@ export default function Tracker() {
                     <div>
                       <CardTitle className="text-foreground">Food Entries</CardTitle>
                       <CardDescription className="text-muted-foreground">
-                        {filteredEntries.length} entries for {formatDate(selectedDate)}
+                        {filteredEntries.length}{hasNextPage ? '+' : ''} entries for {formatDate(selectedDate)}
                       </CardDescription>
                     </div>
                     <div className="flex items-center gap-2">
@@ -559,7 +595,7 @@ export default function Tracker() {
                           </div>
                           <div className="flex items-center gap-2">
                             <div className="text-sm text-muted-foreground">
-                              {formatTime(entry.timestamp)}
+                              {formatTime(entry.entryDate ?? entry.timestamp)}
                             </div>
                             <div className="opacity-0 group-hover:opacity-100 transition-opacity">
                               <Button
@@ -574,6 +610,16 @@ export default function Tracker() {
                           </div>
                         </motion.div>
                       ))}
+                      {hasNextPage && (
+                        <Button
+                          variant="outline"
+                          className="w-full"
+                          onClick={() => fetchNextPage()}
+                          disabled={isFetchingNextPage}
+                        >
+                          {isFetchingNextPage ? 'Loading...' : 'Load more'}
+                        </Button>
+                      )}
                     </div>
                   )}
                 </CardContent>
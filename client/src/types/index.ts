@@ -27,6 +27,7 @@ export interface FoodEntryDocument {
   sugar?: number;
   servingSize: string;
   timestamp: string;
+  entryDate?: string;
   imageUrl?: string;
   mealType?: string;
   aiAnalysis?: string;
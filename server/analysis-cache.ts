@@ -0,0 +1,161 @@
+import crypto from 'crypto';
+import storage from './storage';
+import { analyzeFoodEntry, type FoodAnalysis } from './openai';
+import { LruCache } from './cache';
+import { registerMetrics } from './metrics';
+import { resolveFood, type ResolvedFood } from './nutrition-index';
+
+// Two-tier cache in front of analyzeFoodEntry.
+//
+// Results are keyed by a SHA-256 of the normalized food name, description and
+// serving size plus a digest of the image, so "Banana " and "banana" share an
+// entry while a different photo does not. Lookups try an in-process LRU first
+// (ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_MEMORY_TTL_MS), then the foodanalyses
+// collection, whose TTL index expires entries after ANALYSIS_CACHE_TTL_DAYS.
+// Only successful analyses are stored. A failing second tier is treated as a
+// miss, never as an error. `npm run cache:warm` fills both tiers from a list
+// of common foods.
+//
+// Ahead of both tiers, a plain name and serving (no description or photo) is
+// looked up in the local nutrition index (nutrition-index.ts); a confident
+// match is answered from there and never cached or sent to the model.
+
+function normalize(text: string | undefined): string {
+  return (text ?? '').toLowerCase().normalize('NFKC').replace(/\s+/g, ' ').trim();
+}
+
+export function foodAnalysisKey(foodName: string, description: string, servingSize: string, imageBase64?: string): string {
+  // The data: URL prefix doesn't change the image, so only its payload is hashed
+  const image = imageBase64 ? crypto.createHash('sha256').update(imageBase64.split(',').pop()!).digest('hex') : '';
+  return crypto
+    .createHash('sha256')
+    .update(JSON.stringify([normalize(foodName), normalize(description), normalize(servingSize), image]))
+    .digest('hex');
+}
+
+const memory = new LruCache<string, FoodAnalysis>(
+  Number(process.env.ANALYSIS_CACHE_SIZE ?? 5000),
+  Number(process.env.ANALYSIS_CACHE_MEMORY_TTL_MS ?? 60 * 60 * 1000)
+);
+
+const counts = { indexHits: 0, memoryHits: 0, storeHits: 0, misses: 0, storeErrors: 0 };
+
+registerMetrics('analysisCache', () => {
+  const lookups = counts.indexHits + counts.memoryHits + counts.storeHits + counts.misses;
+  return {
+    ...counts,
+    hitRate: lookups ? (counts.indexHits + counts.memoryHits + counts.storeHits) / lookups : 0,
+    memory: memory.stats()
+  };
+});
+
+type AnalysisSource = 'index' | 'memory' | 'store' | 'openai';
+
+function round(value: number, digits = 1): number {
+  const factor = 10 ** digits;
+  return Math.round(value * factor) / factor;
+}
+
+function indexAnalysis({ food, matched, scale }: ResolvedFood, servingSize: string): FoodAnalysis {
+  const portion = scale === 1 ? food.servingSize : `${round(scale, 2)} x ${food.servingSize}`;
+  return {
+    calories: Math.round(food.calories * scale),
+    protein: round(food.protein * scale),
+    carbs: round(food.carbs * scale),
+    fat: round(food.fat * scale),
+    analysis: `Nutrition for ${food.name} (${portion}${servingSize ? `, logged as "${servingSize}"` : ''}) from the local food database, matched on "${matched}".`
+  };
+}
+
+async function resolveAnalysis(
+  foodName: string,
+  description: string,
+  servingSize: string,
+  imageBase64?: string
+): Promise<[FoodAnalysis, AnalysisSource]> {
+  if (!imageBase64 && !normalize(description)) {
+    const local = resolveFood(foodName, servingSize);
+    if (local) {
+      counts.indexHits++;
+      return [indexAnalysis(local, servingSize), 'index'];
+    }
+  }
+
+  const key = foodAnalysisKey(foodName, description, servingSize, imageBase64);
+
+  const remembered = memory.get(key);
+  if (remembered) {
+    counts.memoryHits++;
+    return [remembered, 'memory'];
+  }
+
+  try {
+    const stored = await storage.getCachedFoodAnalysis(key) as FoodAnalysis | null;
+    if (stored) {
+      counts.storeHits++;
+      memory.set(key, stored);
+      return [stored, 'store'];
+    }
+  } catch (error) {
+    counts.storeErrors++;
+    console.error('Error reading the food analysis cache:', error);
+  }
+
+  counts.misses++;
+  const analysis = await analyzeFoodEntry(foodName, description, servingSize, imageBase64);
+  memory.set(key, analysis);
+  try {
+    await storage.saveCachedFoodAnalysis(key, foodName, analysis);
+  } catch (error) {
+    counts.storeErrors++;
+    console.error('Error writing the food analysis cache:', error);
+  }
+  return [analysis, 'openai'];
+}
+
+export async function analyzeFoodEntryCached(
+  foodName: string,
+  description: string,
+  servingSize: string,
+  imageBase64?: string
+): Promise<FoodAnalysis> {
+  const [analysis] = await resolveAnalysis(foodName, description, servingSize, imageBase64);
+  return analysis;
+}
+
+export interface WarmFood {
+  name: string;
+  description?: string;
+  servingSize: string;
+}
+
+export interface WarmReport {
+  local: number;    // answered by the nutrition index, nothing to cache
+  cached: number;   // already in either tier
+  analyzed: number;
+  failed: string[];
+}
+
+// Analyze every food not cached yet, `concurrency` at a time
+export async function warmAnalysisCache(foods: WarmFood[], concurrency = 4): Promise<WarmReport> {
+  const report: WarmReport = { local: 0, cached: 0, analyzed: 0, failed: [] };
+  const queue = [...foods];
+  const worker = async () => {
+    for (let food = queue.shift(); food; food = queue.shift()) {
+      try {
+        const [, source] = await resolveAnalysis(food.name, food.description ?? '', food.servingSize);
+        if (source === 'openai') {
+          report.analyzed++;
+        } else if (source === 'index') {
+          report.local++;
+        } else {
+          report.cached++;
+        }
+      } catch {
+        report.failed.push(food.name);
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: concurrency }, worker));
+  return report;
+}
@@ -129,7 +129,7 @@ export function setupAuth(app: Express) {
   passport.deserializeUser(async (id: number, done) => {
     try {
       console.log('Deserializing user:', id);
-      const user = await storage.getUser(id);
+      const user = await storage.getSessionUser(id);
       if (!user) {
         console.log('User not found during deserialization:', id);
         return done(null, false);
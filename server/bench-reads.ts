@@ -0,0 +1,115 @@
+import 'dotenv/config';
+import mongoose from 'mongoose';
+import { connectDB } from './db';
+import { migrateIndexes } from './migrations';
+import storage, { localDayKey, models } from './storage';
+import { sequences } from './sequences';
+
+// Compares hydrated and lean/projected food-entry reads for one heavy user.
+//
+//   npm run bench:reads                       # 10k entries, 20 rounds
+//   npm run bench:reads -- --entries 50000 --rounds 10 --cleanup
+//
+// Seeds a synthetic user (BENCH_USER_ID, default 900000001) up to --entries
+// entries, a tenth of them with a ~40 KB imageUrl and all with an aiAnalysis
+// paragraph like the ones analyzeFoodEntry stores. For each read path it
+// reports median latency, heap retained by one result, and response size.
+
+function arg(name: string, fallback: number): number {
+  const index = process.argv.indexOf(`--${name}`);
+  return index >= 0 ? Number(process.argv[index + 1]) : fallback;
+}
+
+const ENTRIES = arg('entries', 10_000);
+const ROUNDS = arg('rounds', 20);
+const USER_ID = Number(process.env.BENCH_USER_ID) || 900_000_001;
+
+const ANALYSIS = 'Balanced mix of protein, complex carbohydrates and unsaturated fat. '.repeat(12);
+const IMAGE = `data:image/jpeg;base64,${'A'.repeat(40_000)}`;
+
+async function seed() {
+  const existing = await models.FoodEntry.countDocuments({ userId: USER_ID });
+  const missing = ENTRIES - existing;
+  if (missing <= 0) return;
+
+  const firstId = await sequences.reserve('foodentries', missing);
+  const now = Date.now();
+  const docs = Array.from({ length: missing }, (_, i) => ({
+    id: firstId + i,
+    userId: USER_ID,
+    name: `Bench food ${i % 50}`,
+    servingSize: '1 serving',
+    mealType: ['breakfast', 'lunch', 'dinner', 'snack'][i % 4],
+    calories: 200 + (i % 400),
+    protein: 10 + (i % 30),
+    carbs: 20 + (i % 60),
+    fat: 5 + (i % 25),
+    entryDate: new Date(now - (i % 365) * 86_400_000 - (i % 24) * 3_600_000),
+    aiAnalysis: ANALYSIS,
+    imageUrl: i % 10 === 0 ? IMAGE : undefined,
+  }));
+  for (let i = 0; i < docs.length; i += 1000) {
+    await models.FoodEntry.insertMany(docs.slice(i, i + 1000), { ordered: false });
+  }
+  console.log(`Seeded ${missing} entries for user ${USER_ID}`);
+}
+
+function collectGarbage() {
+  (globalThis as any).gc?.();
+}
+
+async function measure(label: string, read: () => Promise<unknown[]>) {
+  await read(); // warm up the connection and the query plan cache
+  const timings: number[] = [];
+  for (let i = 0; i < ROUNDS; i++) {
+    const started = process.hrtime.bigint();
+    await read();
+    timings.push(Number(process.hrtime.bigint() - started) / 1e6);
+  }
+  timings.sort((a, b) => a - b);
+
+  collectGarbage();
+  const before = process.memoryUsage().heapUsed;
+  const result = await read();
+  collectGarbage();
+  const retainedMb = (process.memoryUsage().heapUsed - before) / 1024 / 1024;
+  const jsonMb = Buffer.byteLength(JSON.stringify(result)) / 1024 / 1024;
+
+  console.log(
+    `${label.padEnd(34)} ${String(result.length).padStart(7)} rows  ` +
+    `p50 ${timings[Math.floor(timings.length / 2)].toFixed(1).padStart(8)} ms  ` +
+    `heap ${retainedMb.toFixed(1).padStart(7)} MB  json ${jsonMb.toFixed(1).padStart(7)} MB`
+  );
+}
+
+(async () => {
+  let exitCode = 0;
+  try {
+    await connectDB();
+    await migrateIndexes();
+    await seed();
+    await storage.rebuildDailyRollups(USER_ID);  // seed() bypasses createFoodEntry
+    if (!(globalThis as any).gc) {
+      console.warn('Run with NODE_OPTIONS=--expose-gc for stable heap numbers');
+    }
+
+    await measure('hydrated getFoodEntriesByUserId', () => storage.getFoodEntriesByUserId(USER_ID));
+    await measure('lean listFoodEntries', () => storage.listFoodEntries(USER_ID));
+    await measure('rollup getDailyRollups (7d)', () =>
+      storage.getDailyRollups(USER_ID, localDayKey(new Date(Date.now() - 7 * 86_400_000)), localDayKey(new Date(Date.now() + 86_400_000))));
+    await measure('hydrated getRecentFoodEntries(10)', () => storage.getRecentFoodEntries(USER_ID, 10));
+    await measure('lean listRecentFoodEntries(10)', () => storage.listRecentFoodEntries(USER_ID, 10));
+
+    if (process.argv.includes('--cleanup')) {
+      await models.FoodEntry.deleteMany({ userId: USER_ID });
+      await models.DailyRollup.deleteMany({ userId: USER_ID });
+      console.log(`Removed the entries for user ${USER_ID}`);
+    }
+  } catch (error) {
+    console.error('Benchmark failed:', error);
+    exitCode = 1;
+  } finally {
+    await mongoose.disconnect();
+  }
+  process.exit(exitCode);
+})();
@@ -0,0 +1,78 @@
+// Bounded in-process cache with least-recently-used eviction and a TTL.
+//
+// A Map keeps keys in insertion order, so re-inserting a key on every hit
+// keeps the least recently used key first and eviction is O(1). Entries
+// older than the TTL are dropped when they are next read. Hit, miss,
+// eviction and expiry counts are kept for the metrics endpoint.
+
+export interface CacheStats {
+  size: number;
+  maxEntries: number;
+  ttlMs: number;
+  hits: number;
+  misses: number;
+  evictions: number;
+  expirations: number;
+  hitRate: number;
+}
+
+export class LruCache<K, V> {
+  private entries = new Map<K, { value: V; expiresAt: number }>();
+  private hits = 0;
+  private misses = 0;
+  private evictions = 0;
+  private expirations = 0;
+
+  constructor(private maxEntries: number, private ttlMs: number) {}
+
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.misses++;
+      return undefined;
+    }
+    this.entries.delete(key);
+    if (entry.expiresAt <= Date.now()) {
+      this.expirations++;
+      this.misses++;
+      return undefined;
+    }
+    this.entries.set(key, entry);  // now the most recently used
+    this.hits++;
+    return entry.value;
+  }
+
+  set(key: K, value: V): void {
+    if (this.maxEntries <= 0) {
+      return;
+    }
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + this.ttlMs });
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value as K);
+      this.evictions++;
+    }
+  }
+
+  delete(key: K): void {
+    this.entries.delete(key);
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+
+  stats(): CacheStats {
+    const lookups = this.hits + this.misses;
+    return {
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+      ttlMs: this.ttlMs,
+      hits: this.hits,
+      misses: this.misses,
+      evictions: this.evictions,
+      expirations: this.expirations,
+      hitRate: lookups ? this.hits / lookups : 0,
+    };
+  }
+}
@@ -0,0 +1,110 @@
+import storage, { type ChatTurn } from './storage';
+import { summarizeConversation } from './openai';
+import { registerMetrics } from './metrics';
+
+// Prompt history for the AI coach.
+//
+// Only the most recent turns that fit CHAT_HISTORY_TOKENS are sent with a new
+// message. Turns that fall out of that window are folded into a per-conversation
+// summary (the chatsummaries collection), which goes into the system prompt
+// instead. Folding runs after the reply has been sent, one conversation at a
+// time per process, and only ever adds the turns newer than what the summary
+// already covers, so each turn is summarized once.
+//
+// The Mongo read is bounded: at most CHAT_HISTORY_MAX_TURNS turns, newest
+// first, off the {conversationId, timestamp} index. Turns older than that which
+// were never summarized (conversations from before summaries existed) are
+// left out rather than read back.
+
+const HISTORY_TOKENS = Number(process.env.CHAT_HISTORY_TOKENS) || 1500;
+const MAX_TURNS = Number(process.env.CHAT_HISTORY_MAX_TURNS) || 20;
+
+export type PromptMessage = { role: 'user' | 'assistant'; content: string };
+
+export interface ChatContext {
+  messages: PromptMessage[];
+  summary?: string;
+  // Turns outside the window that the summary doesn't cover yet, oldest first
+  unsummarized: ChatTurn[];
+  previousThroughId: number | null;
+}
+
+// Rough BPE-sized count: about four characters per token
+export function estimateTokens(text: string): number {
+  return Math.max(1, Math.ceil(text.length / 4));
+}
+
+function turnMessages(turn: ChatTurn): PromptMessage[] {
+  const messages: PromptMessage[] = [{ role: 'user', content: turn.message }];
+  if (turn.response) {
+    messages.push({ role: 'assistant', content: turn.response });
+  }
+  return messages;
+}
+
+const stats = { requests: 0, turnsSent: 0, turnsDropped: 0, folds: 0, foldFailures: 0, foldConflicts: 0 };
+registerMetrics('chatHistory', () => ({ ...stats, tokenBudget: HISTORY_TOKENS, maxTurns: MAX_TURNS }));
+
+export async function buildChatContext(conversationId: string): Promise<ChatContext> {
+  const [recent, summary] = await Promise.all([
+    storage.getRecentChatTurns(conversationId, MAX_TURNS),
+    storage.getChatSummary(conversationId)
+  ]);
+
+  const covered = summary?.throughTimestamp.getTime() ?? -Infinity;
+  const pending = recent.filter(turn => new Date(turn.timestamp).getTime() > covered);
+
+  // Newest turns first until the budget runs out; always keep the latest one
+  const window: ChatTurn[] = [];
+  let tokens = 0;
+  for (const turn of pending) {
+    const cost = turnMessages(turn).reduce((sum, message) => sum + estimateTokens(message.content), 0);
+    if (window.length > 0 && tokens + cost > HISTORY_TOKENS) {
+      break;
+    }
+    window.push(turn);
+    tokens += cost;
+  }
+
+  stats.requests++;
+  stats.turnsSent += window.length;
+  stats.turnsDropped += pending.length - window.length;
+
+  return {
+    messages: window.reverse().flatMap(turnMessages),
+    summary: summary?.summary,
+    unsummarized: pending.slice(window.length).reverse(),
+    previousThroughId: summary?.throughId ?? null
+  };
+}
+
+const folding = new Set<string>();
+
+// Fold the turns that left the window into the summary. Never throws: on
+// failure the summary stays as it was and the turns are tried again next time.
+export async function foldChatHistory(conversationId: string, context: ChatContext): Promise<void> {
+  if (context.unsummarized.length === 0 || folding.has(conversationId)) {
+    return;
+  }
+  folding.add(conversationId);
+  try {
+    const summary = await summarizeConversation(context.summary ?? null, context.unsummarized);
+    const newest = context.unsummarized[context.unsummarized.length - 1];
+    const saved = await storage.saveChatSummary(conversationId, {
+      summary,
+      throughTimestamp: newest.timestamp,
+      throughId: newest.id,
+      foldedTurns: context.unsummarized.length
+    }, context.previousThroughId);
+    if (saved) {
+      stats.folds++;
+    } else {
+      stats.foldConflicts++;  // another process folded first; its summary stands
+    }
+  } catch (error) {
+    stats.foldFailures++;
+    console.error('Error summarizing chat history:', error);
+  } finally {
+    folding.delete(conversationId);
+  }
+}
@@ -0,0 +1,121 @@
+import type { Request, Response } from 'express';
+import storage from './storage';
+import { streamFitnessResponse } from './openai';
+import { buildChatContext, foldChatHistory, type ChatContext } from './chat-history';
+import { registerMetrics, SampleWindow } from './metrics';
+
+// POST /api/chat/stream: the AI coach reply as Server-Sent Events.
+//
+// Takes the same body as POST /api/chat. The reply is relayed as `token`
+// events ({ text }) while the model generates it. Once it is complete the
+// message is saved and a single `done` event carries the saved message with
+// actionItems, followUpQuestions, category and confidence, shaped like the
+// POST /api/chat response. A failure after the stream has started is sent as
+// an `error` event. If the client disconnects, the upstream request is aborted
+// and nothing is saved. Comment lines keep idle proxies from closing the
+// connection while the model is still thinking.
+//
+// Time to first token and total duration (percentiles over the last
+// STREAM_SAMPLES replies) are under chatStream at /api/metrics.
+
+const HEARTBEAT_MS = 15_000;
+const STREAM_SAMPLES = 500;
+
+const stats = { streams: 0, completed: 0, aborted: 0, failed: 0 };
+const firstTokenMs = new SampleWindow(STREAM_SAMPLES);
+const totalMs = new SampleWindow(STREAM_SAMPLES);
+
+registerMetrics('chatStream', () => ({
+  ...stats,
+  timeToFirstTokenMs: firstTokenMs.snapshot(),
+  totalMs: totalMs.snapshot()
+}));
+
+function sendEvent(res: Response, event: string, data: unknown) {
+  res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+}
+
+export async function streamChatHandler(req: Request, res: Response) {
+  const { message, conversationId, userContext } = req.body;
+  if (!message || !conversationId) {
+    return res.status(400).json({ message: 'Message and conversation ID are required' });
+  }
+
+  // Handle both authenticated and anonymous users
+  const userId = req.isAuthenticated() && req.user?.id ? req.user.id : 0;
+  const started = Date.now();
+  stats.streams++;
+
+  let history: ChatContext;
+  try {
+    history = await buildChatContext(conversationId);
+  } catch (error) {
+    stats.failed++;
+    console.error('Error in chat stream:', error);
+    return res.status(500).json({ message: 'Failed to process chat message' });
+  }
+
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream; charset=utf-8',
+    'Cache-Control': 'no-cache, no-transform',
+    'Connection': 'keep-alive',
+    'X-Accel-Buffering': 'no'
+  });
+  res.flushHeaders();
+
+  const upstream = new AbortController();
+  let ended = false;
+  res.on('close', () => {
+    if (!ended) {
+      upstream.abort();
+    }
+  });
+  const heartbeat = setInterval(() => res.write(': keep-alive\n\n'), HEARTBEAT_MS);
+
+  let firstToken = true;
+  try {
+    const reply = await streamFitnessResponse(message, history.messages, userContext, history.summary, text => {
+      if (firstToken) {
+        firstToken = false;
+        firstTokenMs.record(Date.now() - started);
+      }
+      sendEvent(res, 'token', { text });
+    }, upstream.signal);
+
+    // Storage assigns the id from the chatmessages sequence
+    const chatMessage = await storage.createChatMessage({
+      userId,
+      message,
+      response: reply.response,
+      timestamp: new Date(),
+      conversationId,
+      createdAt: new Date(),
+      updatedAt: new Date()
+    });
+
+    sendEvent(res, 'done', {
+      ...chatMessage.toJSON(),
+      actionItems: reply.actionItems,
+      followUpQuestions: reply.followUpQuestions,
+      category: reply.category,
+      confidence: reply.confidence
+    });
+    stats.completed++;
+    totalMs.record(Date.now() - started);
+
+    // Summarize turns that left the window once the reply is out
+    void foldChatHistory(conversationId, history);
+  } catch (error) {
+    if (upstream.signal.aborted) {
+      stats.aborted++;
+    } else {
+      stats.failed++;
+      console.error('Error in chat stream:', error);
+      sendEvent(res, 'error', { message: 'Failed to process chat message' });
+    }
+  } finally {
+    clearInterval(heartbeat);
+    ended = true;
+    res.end();
+  }
+}
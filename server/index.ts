@@ -4,7 +4,9 @@ import { createServer } from "http";
 import { registerRoutes } from "./routes";
 import { setupVite, log } from "./vite";
 import { connectDB } from "./db";
+import { backfillDailyRollups, migrateIndexes } from "./migrations";
 import storage from "./storage";
+import { getNutritionIndex } from "./nutrition-index";
 import mongoose from 'mongoose';
 
 // Log environment variables (without sensitive values)
@@ -72,6 +74,10 @@ app.use((req, res, next) => {
       throw new Error('MongoDB connection failed');
     }
     
+    // Build any indexes declared in storage.ts that the collections don't have yet
+    await migrateIndexes();
+    await backfillDailyRollups();
+    getNutritionIndex();
 
     // Verify storage instance is properly initialized
     if (!storage || typeof storage.getUserByUsername !== 'function') {
@@ -0,0 +1,57 @@
+import type { Request, Response } from 'express';
+
+// In-process counters, served at GET /api/metrics.
+//
+// Components register a named snapshot function; the endpoint calls each one
+// and returns the results as one JSON object. Counts are per process and
+// reset on restart. The endpoint answers a signed-in session, or a scraper
+// sending `Authorization: Bearer <METRICS_TOKEN>` when that is set; anyone
+// else gets a 403.
+
+type Snapshot = () => unknown;
+
+const sources = new Map<string, Snapshot>();
+
+export function registerMetrics(name: string, snapshot: Snapshot): void {
+  sources.set(name, snapshot);
+}
+
+// The most recent `size` values of a duration, reported as percentiles
+export class SampleWindow {
+  private samples: number[] = [];
+
+  constructor(private size = 500) {}
+
+  record(value: number): void {
+    this.samples.push(value);
+    if (this.samples.length > this.size) {
+      this.samples.shift();
+    }
+  }
+
+  snapshot() {
+    if (this.samples.length === 0) {
+      return null;
+    }
+    const sorted = [...this.samples].sort((a, b) => a - b);
+    const at = (p: number) => sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+    return { p50: at(0.5), p95: at(0.95), max: sorted[sorted.length - 1], samples: sorted.length };
+  }
+}
+
+export function collectMetrics(): Record<string, unknown> {
+  const metrics: Record<string, unknown> = { uptimeSeconds: Math.round(process.uptime()) };
+  sources.forEach((snapshot, name) => {
+    metrics[name] = snapshot();
+  });
+  return metrics;
+}
+
+export function metricsHandler(req: Request, res: Response) {
+  const token = process.env.METRICS_TOKEN;
+  const hasToken = !!token && req.headers.authorization === `Bearer ${token}`;
+  if (!hasToken && !req.isAuthenticated()) {
+    return res.status(403).json({ message: 'Not authorized' });
+  }
+  res.set('Cache-Control', 'no-store').json(collectMetrics());
+}
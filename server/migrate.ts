@@ -0,0 +1,40 @@
+import 'dotenv/config';
+import mongoose from 'mongoose';
+import { connectDB } from './db';
+import { backfillDailyRollups, explainQueryShapes, migrateIndexes } from './migrations';
+import storage from './storage';
+
+// npm run db:migrate  - build any missing indexes
+// npm run db:explain  - explain() every Storage query shape; exits 1 on a collection scan
+// npm run db:rollups  - rebuild the daily rollups from the food entries (-- --user <id> for one user)
+
+(async () => {
+  let exitCode = 0;
+  try {
+    await connectDB();
+    if (process.argv.includes('--rebuild-rollups')) {
+      const userIndex = process.argv.indexOf('--user');
+      const userId = userIndex >= 0 ? Number(process.argv[userIndex + 1]) : undefined;
+      const started = Date.now();
+      const written = await storage.rebuildDailyRollups(userId);
+      console.log(`Rebuilt ${written} daily rollups${userId === undefined ? '' : ` for user ${userId}`} in ${Date.now() - started}ms`);
+    } else if (process.argv.includes('--explain')) {
+      const results = await explainQueryShapes();
+      const scans = results.filter(result => result.collectionScan);
+      if (scans.length > 0) {
+        console.error(`${scans.length} query shape(s) use a collection scan: ${scans.map(scan => scan.name).join(', ')}`);
+        exitCode = 1;
+      }
+    } else {
+      const report = await migrateIndexes();
+      await backfillDailyRollups();
+      exitCode = report.failed.length > 0 ? 1 : 0;
+    }
+  } catch (error) {
+    console.error('Migration failed:', error);
+    exitCode = 1;
+  } finally {
+    await mongoose.disconnect();
+  }
+  process.exit(exitCode);
+})();
@@ -0,0 +1,171 @@
+import mongoose from 'mongoose';
+import storage, { models } from './storage';
+
+// Index management for the Mongo collections.
+//
+// Indexes are declared on the schemas in storage.ts (with autoIndex off) and
+// built here, at startup or with `npm run db:migrate`. Only indexes missing
+// from a collection are created, so running it again is a no-op, and each
+// build is logged with its position and duration. `npm run db:explain` runs
+// explain() on every query shape Storage issues and flags collection scans.
+//
+// backfillDailyRollups() fills the daily rollup collection the first time it
+// is deployed against existing entries; `npm run db:rollups` rebuilds it.
+
+type Log = (message: string) => void;
+
+type IndexSpec = [Record<string, 1 | -1>, Record<string, unknown>];
+
+export interface MigrationReport {
+  created: string[];
+  existing: number;
+  failed: string[];
+}
+
+function describe(collection: string, keys: Record<string, unknown>): string {
+  return `${collection} {${Object.entries(keys).map(([field, dir]) => `${field}: ${dir}`).join(', ')}}`;
+}
+
+export async function migrateIndexes(log: Log = console.log): Promise<MigrationReport> {
+  const report: MigrationReport = { created: [], existing: 0, failed: [] };
+
+  // Work out what is missing first so the progress count is known up front
+  const pending: Array<{ model: mongoose.Model<any>; keys: Record<string, 1 | -1>; options: Record<string, unknown> }> = [];
+  for (const model of Object.values(models)) {
+    const existing = await model.collection.indexes().catch(() => [] as Array<{ key: Record<string, unknown> }>);
+    const existingKeys = new Set(existing.map(index => JSON.stringify(index.key)));
+    for (const [keys, options] of model.schema.indexes() as IndexSpec[]) {
+      if (existingKeys.has(JSON.stringify(keys))) {
+        report.existing++;
+      } else {
+        pending.push({ model, keys, options });
+      }
+    }
+  }
+
+  if (pending.length === 0) {
+    log(`[migrate] indexes up to date (${report.existing} present)`);
+    return report;
+  }
+
+  for (const [i, { model, keys, options }] of pending.entries()) {
+    const name = describe(model.collection.collectionName, keys);
+    log(`[migrate] (${i + 1}/${pending.length}) building ${name}`);
+    const started = Date.now();
+    try {
+      await model.collection.createIndex(keys, options);
+      report.created.push(name);
+      log(`[migrate] (${i + 1}/${pending.length}) built ${name} in ${Date.now() - started}ms`);
+    } catch (error) {
+      // e.g. duplicate values under a new unique index; keep serving and report it
+      report.failed.push(name);
+      log(`[migrate] (${i + 1}/${pending.length}) failed ${name}: ${error instanceof Error ? error.message : error}`);
+    }
+  }
+
+  log(`[migrate] done: ${report.created.length} built, ${report.existing} already present, ${report.failed.length} failed`);
+  return report;
+}
+
+// Rollups only track writes made after they were introduced; build them from
+// the raw entries once, when the collection is still empty
+export async function backfillDailyRollups(log: Log = console.log): Promise<void> {
+  try {
+    const [rollups, entries] = await Promise.all([
+      models.DailyRollup.estimatedDocumentCount(),
+      models.FoodEntry.estimatedDocumentCount(),
+    ]);
+    if (rollups > 0 || entries === 0) {
+      return;
+    }
+    const started = Date.now();
+    const written = await storage.rebuildDailyRollups();
+    log(`[migrate] built ${written} daily rollups from ${entries} food entries in ${Date.now() - started}ms`);
+  } catch (error) {
+    log(`[migrate] daily rollup backfill failed: ${error instanceof Error ? error.message : error}`);
+  }
+}
+
+// One entry per distinct query Storage issues; the values only need the right types
+interface QueryShape {
+  name: string;
+  model: mongoose.Model<any>;
+  filter: Record<string, unknown>;
+  sort?: Record<string, 1 | -1>;
+}
+
+const sampleDay = { $gte: new Date(0), $lte: new Date(86_399_999) };
+
+export const QUERY_SHAPES: QueryShape[] = [
+  { name: 'getUser', model: models.User, filter: { id: 1 } },
+  { name: 'getUserByUsername', model: models.User, filter: { username: '' } },
+  { name: 'getUserByEmail', model: models.User, filter: { email: '' } },
+  { name: 'getUserByFirebaseId', model: models.User, filter: { firebaseId: '' } },
+  { name: 'getFoodEntryById', model: models.FoodEntry, filter: { id: 1 } },
+  { name: 'getFoodEntriesByUserId', model: models.FoodEntry, filter: { userId: 1 } },
+  { name: 'getDailyFoodEntries', model: models.FoodEntry, filter: { userId: 1, entryDate: sampleDay } },
+  { name: 'getRecentFoodEntries', model: models.FoodEntry, filter: { userId: 1 }, sort: { entryDate: -1 } },
+  { name: 'listFoodEntries', model: models.FoodEntry, filter: { userId: 1, entryDate: sampleDay }, sort: { entryDate: -1, id: -1 } },
+  { name: 'listRecentFoodEntries', model: models.FoodEntry, filter: { userId: 1 }, sort: { entryDate: -1, id: -1 } },
+  {
+    name: 'pageFoodEntries',
+    model: models.FoodEntry,
+    filter: { userId: 1, entryDate: sampleDay, $or: [{ entryDate: { $lt: new Date(0) } }, { entryDate: new Date(0), id: { $lt: 1 } }] },
+    sort: { entryDate: -1, id: -1 },
+  },
+  { name: 'getChatMessagesByUserId', model: models.ChatMessage, filter: { userId: 1 } },
+  { name: 'getChatMessagesByConversationId', model: models.ChatMessage, filter: { conversationId: '' }, sort: { timestamp: 1 } },
+  { name: 'getUserConversations', model: models.ChatMessage, filter: { userId: 1 } },
+  { name: 'getRecentChatTurns', model: models.ChatMessage, filter: { conversationId: '' }, sort: { timestamp: -1 } },
+  { name: 'getChatSummary', model: models.ChatSummary, filter: { conversationId: '' } },
+  { name: 'getCachedFoodAnalysis', model: models.FoodAnalysis, filter: { key: '' } },
+  { name: 'deleteChatMessage', model: models.ChatMessage, filter: { id: 1 } },
+  { name: 'getNutritionGoalById', model: models.NutritionGoal, filter: { id: 1 } },
+  { name: 'getNutritionGoalByUserId', model: models.NutritionGoal, filter: { userId: 1 } },
+  { name: 'getDailyRollups', model: models.DailyRollup, filter: { userId: 1, day: { $gte: '', $lt: '' } }, sort: { day: 1 } },
+];
+
+// Every stage name in an explain() plan tree, whichever engine produced it
+function planStages(plan: unknown, stages: string[] = []): string[] {
+  if (Array.isArray(plan)) {
+    plan.forEach(child => planStages(child, stages));
+  } else if (plan && typeof plan === 'object') {
+    for (const [key, value] of Object.entries(plan)) {
+      if (key === 'stage' && typeof value === 'string') {
+        stages.push(value);
+      } else {
+        planStages(value, stages);
+      }
+    }
+  }
+  return stages;
+}
+
+export interface ExplainResult {
+  name: string;
+  collection: string;
+  stages: string[];
+  collectionScan: boolean;
+}
+
+export async function explainQueryShapes(log: Log = console.log): Promise<ExplainResult[]> {
+  const results: ExplainResult[] = [];
+  for (const shape of QUERY_SHAPES) {
+    let query = shape.model.find(shape.filter);
+    if (shape.sort) {
+      query = query.sort(shape.sort);
+    }
+    const explained: any = await query.explain('queryPlanner');
+    const plan = (Array.isArray(explained) ? explained[0] : explained)?.queryPlanner?.winningPlan;
+    const stages = planStages(plan);
+    const result = {
+      name: shape.name,
+      collection: shape.model.collection.collectionName,
+      stages,
+      collectionScan: stages.includes('COLLSCAN'),
+    };
+    results.push(result);
+    log(`${result.collectionScan ? 'COLLSCAN' : 'ok      '}  ${result.name.padEnd(32)} ${stages.join(' <- ')}`);
+  }
+  return results;
+}
@@ -0,0 +1,374 @@
+import fs from 'fs';
+import bundledFoods from './data/nutrition.json';
+import { registerMetrics } from './metrics';
+
+// In-memory nutrition index, consulted before analyzeFoodEntry.
+//
+// Foods come from server/data/nutrition.json, or from the file named by
+// NUTRITION_DATASET (a JSON array or NDJSON of the same records) for a larger
+// dataset. Every name and alias is tokenized (lowercased, accents and plural
+// endings stripped) into an inverted index of sorted posting lists. A query
+// matches the names containing all of its tokens; the last token also matches
+// as a prefix, for typeahead, and tokens of four or more letters that aren't
+// in the vocabulary match words one edit away (symmetric-delete lookup, so a
+// typo costs a few hash probes rather than a vocabulary scan).
+//
+// resolveFood() only answers when every word of the food name is a word of a
+// name or alias as is (no typo or prefix matches), that name is covered
+// completely, and the serving size can be converted from the record's serving;
+// anything less certain is left to the model.
+
+export interface NutritionFood {
+  name: string;
+  aliases?: string[];
+  servingSize: string;   // what the values below are for, e.g. "1 cup"
+  grams?: number;        // weight of that serving
+  calories: number;
+  protein: number;
+  carbs: number;
+  fat: number;
+  fiber?: number;
+  sugar?: number;
+}
+
+export interface NutritionMatch {
+  food: NutritionFood;
+  matched: string;     // the name or alias that matched
+  score: number;       // 0-1: match quality times the share of the name covered
+  complete: boolean;   // every word of the matched name is in the query
+  exact: boolean;      // every query word matched a name word as is (no prefix or typo match)
+}
+
+export interface ResolvedFood {
+  food: NutritionFood;
+  matched: string;
+  scale: number;       // servings of food.servingSize in the requested serving
+}
+
+const STOPWORDS = new Set(['a', 'an', 'and', 'the', 'of', 'with', 'in', 'on']);
+const PREFIX_EXPANSIONS = 64;
+const MIN_FUZZY_LENGTH = 4;
+const EXACT_WEIGHT = 1;
+const PREFIX_WEIGHT = 0.9;
+const FUZZY_WEIGHT = 0.7;
+
+function stem(token: string): string {
+  if (token.length > 4 && token.endsWith('ies')) return `${token.slice(0, -3)}y`;
+  if (token.length > 4 && token.endsWith('oes')) return token.slice(0, -2);
+  if (token.length > 3 && token.endsWith('s') && !token.endsWith('ss')) return token.slice(0, -1);
+  return token;
+}
+
+export function tokenize(text: string): string[] {
+  return text
+    .toLowerCase()
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .split(/[^a-z0-9%&]+/)
+    .filter(token => token && !STOPWORDS.has(token))
+    .map(stem);
+}
+
+function deletions(token: string): string[] {
+  const result: string[] = [];
+  for (let i = 0; i < token.length; i++) {
+    result.push(token.slice(0, i) + token.slice(i + 1));
+  }
+  return result;
+}
+
+// Optimal string alignment distance, capped: returns max + 1 once it is exceeded
+function editDistance(a: string, b: string, max: number): number {
+  if (Math.abs(a.length - b.length) > max) return max + 1;
+  let previous2: number[] = [];
+  let previous = Array.from({ length: b.length + 1 }, (_, j) => j);
+  for (let i = 1; i <= a.length; i++) {
+    const current = [i];
+    let rowMin = i;
+    for (let j = 1; j <= b.length; j++) {
+      const cost = a[i - 1] === b[j - 1] ? 0 : 1;
+      let value = Math.min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost);
+      if (i > 1 && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+        value = Math.min(value, previous2[j - 2] + 1);
+      }
+      current.push(value);
+      rowMin = Math.min(rowMin, value);
+    }
+    if (rowMin > max) return max + 1;
+    previous2 = previous;
+    previous = current;
+  }
+  return previous[b.length];
+}
+
+function contains(postings: Uint32Array, key: number): boolean {
+  let low = 0;
+  let high = postings.length - 1;
+  while (low <= high) {
+    const mid = (low + high) >>> 1;
+    if (postings[mid] === key) return true;
+    if (postings[mid] < key) low = mid + 1;
+    else high = mid - 1;
+  }
+  return false;
+}
+
+type Variant = { postings: Uint32Array; weight: number };
+
+// Higher score first, then the shorter (more generic) name
+function compareMatches(a: NutritionMatch, b: NutritionMatch): number {
+  return b.score - a.score || a.food.name.length - b.food.name.length;
+}
+
+export class NutritionIndex {
+  readonly foods: NutritionFood[] = [];
+  // One key per name or alias
+  private keyFood: number[] = [];
+  private keyText: string[] = [];
+  private keyLength: number[] = [];
+  private postings = new Map<string, Uint32Array>();
+  private vocabulary: string[];
+  private deletes = new Map<string, string[]>();
+
+  constructor(records: NutritionFood[]) {
+    const lists = new Map<string, number[]>();
+    for (const record of records) {
+      if (!record?.name || ![record.calories, record.protein, record.carbs, record.fat].every(Number.isFinite)) {
+        continue;
+      }
+      const foodId = this.foods.push(record) - 1;
+      for (const text of [record.name, ...(record.aliases ?? [])]) {
+        const tokens = [...new Set(tokenize(text))];
+        if (tokens.length === 0) continue;
+        const key = this.keyFood.push(foodId) - 1;
+        this.keyText.push(text);
+        this.keyLength.push(tokens.length);
+        for (const token of tokens) {
+          let list = lists.get(token);
+          if (!list) lists.set(token, (list = []));
+          list.push(key);  // keys are assigned in order, so every list stays sorted
+        }
+      }
+    }
+
+    lists.forEach((list, token) => this.postings.set(token, Uint32Array.from(list)));
+    this.vocabulary = [...lists.keys()].sort();
+    for (const token of this.vocabulary) {
+      if (token.length < MIN_FUZZY_LENGTH - 1) continue;
+      for (const deleted of deletions(token)) {
+        const similar = this.deletes.get(deleted);
+        if (similar) similar.push(token);
+        else this.deletes.set(deleted, [token]);
+      }
+    }
+  }
+
+  get size() {
+    return { foods: this.foods.length, keys: this.keyFood.length, tokens: this.vocabulary.length };
+  }
+
+  // Vocabulary words starting with `prefix`, nearest in length first
+  private prefixMatches(prefix: string): string[] {
+    let low = 0;
+    let high = this.vocabulary.length;
+    while (low < high) {
+      const mid = (low + high) >>> 1;
+      if (this.vocabulary[mid] < prefix) low = mid + 1;
+      else high = mid;
+    }
+    const matches: string[] = [];
+    for (let i = low; i < this.vocabulary.length && this.vocabulary[i].startsWith(prefix); i++) {
+      matches.push(this.vocabulary[i]);
+    }
+    return matches.sort((a, b) => a.length - b.length).slice(0, PREFIX_EXPANSIONS);
+  }
+
+  // Vocabulary words one edit from `token`
+  private fuzzyMatches(token: string): string[] {
+    const candidates = new Set<string>(this.deletes.get(token) ?? []);
+    for (const deleted of deletions(token)) {
+      if (this.postings.has(deleted)) candidates.add(deleted);
+      this.deletes.get(deleted)?.forEach(candidate => candidates.add(candidate));
+    }
+    return [...candidates].filter(candidate => editDistance(token, candidate, 1) <= 1);
+  }
+
+  private variants(token: string, prefix: boolean): Variant[] {
+    const variants: Variant[] = [];
+    const exact = this.postings.get(token);
+    if (exact) {
+      variants.push({ postings: exact, weight: EXACT_WEIGHT });
+    }
+    if (prefix) {
+      for (const word of this.prefixMatches(token)) {
+        if (word !== token) variants.push({ postings: this.postings.get(word)!, weight: PREFIX_WEIGHT });
+      }
+    }
+    if (!exact && token.length >= MIN_FUZZY_LENGTH) {
+      for (const word of this.fuzzyMatches(token)) {
+        variants.push({ postings: this.postings.get(word)!, weight: FUZZY_WEIGHT });
+      }
+    }
+    return variants;
+  }
+
+  // Best match per food, best first. With `prefix`, the query's last word may be
+  // unfinished.
+  search(query: string, limit = 10, { prefix = true }: { prefix?: boolean } = {}): NutritionMatch[] {
+    const terms = [...new Set(tokenize(query))];
+    if (terms.length === 0 || limit < 1) {
+      return [];
+    }
+    const perTerm = terms.map((term, i) => this.variants(term, prefix && i === terms.length - 1));
+    if (perTerm.some(variants => variants.length === 0)) {
+      return [];
+    }
+
+    // Start from the rarest term and check the others against its keys
+    perTerm.sort((a, b) =>
+      a.reduce((sum, v) => sum + v.postings.length, 0) - b.reduce((sum, v) => sum + v.postings.length, 0));
+    const scores = new Map<number, number>();
+    for (const { postings, weight } of perTerm[0]) {
+      for (const key of postings) {
+        scores.set(key, Math.max(scores.get(key) ?? 0, weight));
+      }
+    }
+    for (const variants of perTerm.slice(1)) {
+      scores.forEach((score, key) => {
+        let best = 0;
+        for (const { postings, weight } of variants) {
+          if (weight > best && contains(postings, key)) best = weight;
+        }
+        if (best === 0) scores.delete(key);
+        else scores.set(key, score + best);
+      });
+      if (scores.size === 0) return [];
+    }
+
+    // Keep only the best `limit` foods rather than sorting every candidate
+    const top: NutritionMatch[] = [];
+    scores.forEach((total, key) => {
+      const keyLength = this.keyLength[key];
+      const score = total / Math.max(terms.length, keyLength);
+      const food = this.foods[this.keyFood[key]];
+      const last = top.length === limit ? top[limit - 1] : null;
+      if (last && (score < last.score || (score === last.score && food.name.length >= last.food.name.length))) {
+        return;
+      }
+      const existing = top.findIndex(match => match.food === food);
+      if (existing >= 0) {
+        if (top[existing].score >= score) return;
+        top.splice(existing, 1);
+      }
+      const match = {
+        food,
+        matched: this.keyText[key],
+        score,
+        complete: keyLength <= terms.length,
+        exact: total === terms.length * EXACT_WEIGHT,
+      };
+      const position = top.findIndex(other => compareMatches(match, other) < 0);
+      top.splice(position < 0 ? top.length : position, 0, match);
+      if (top.length > limit) top.pop();
+    });
+    return top;
+  }
+}
+
+const SERVING_WORDS = new Set(['', 'x', 'serving', 'portion', 'helping']);
+const GRAMS_PER_UNIT: Record<string, number> = { g: 1, gram: 1, gr: 1, kg: 1000, oz: 28.35, ounce: 28.35, lb: 453.6 };
+
+function parseServing(text: string): { amount: number; unit: string } | null {
+  const match = text.toLowerCase().trim().match(/^(\d+(?:\.\d+)?)?(?:\/(\d+))?\s*([a-z]*)/);
+  if (!match || (match[2] && !match[1])) return null;
+  const amount = match[1] ? Number(match[1]) / (match[2] ? Number(match[2]) : 1) : 1;
+  return { amount, unit: stem(match[3]) };
+}
+
+// How many of the food's servings `servingSize` is, or null if that can't be
+// told without guessing (e.g. "1 bowl" of a food measured in cups)
+export function servingScale(servingSize: string, food: NutritionFood): number | null {
+  const requested = servingSize.toLowerCase().replace(/\s+/g, ' ').trim();
+  if (!requested || requested === food.servingSize.toLowerCase()) {
+    return 1;
+  }
+  const wanted = parseServing(requested);
+  const base = parseServing(food.servingSize);
+  if (!wanted || !base) {
+    return null;
+  }
+
+  let scale: number | null = null;
+  if (SERVING_WORDS.has(wanted.unit)) {
+    scale = wanted.amount;
+  } else if (wanted.unit in GRAMS_PER_UNIT && food.grams) {
+    scale = (wanted.amount * GRAMS_PER_UNIT[wanted.unit]) / food.grams;
+  } else if (wanted.unit === base.unit) {
+    scale = wanted.amount / base.amount;
+  }
+  return scale !== null && Number.isFinite(scale) && scale > 0 && scale <= 50 ? scale : null;
+}
+
+let index: NutritionIndex | null = null;
+let buildMs = 0;
+const counts = { searches: 0, lookups: 0, resolved: 0 };
+
+registerMetrics('nutritionIndex', () => ({
+  ...counts,
+  loaded: index !== null,
+  buildMs,
+  ...(index ? index.size : {}),
+}));
+
+function loadFoods(): NutritionFood[] {
+  const file = process.env.NUTRITION_DATASET;
+  if (!file) {
+    return bundledFoods as NutritionFood[];
+  }
+  try {
+    const text = fs.readFileSync(file, 'utf8');
+    if (file.endsWith('.json')) {
+      return JSON.parse(text);
+    }
+    return text
+      .split('\n')
+      .filter(line => line.trim())
+      .map(line => JSON.parse(line));
+  } catch (error) {
+    console.error(`Error loading NUTRITION_DATASET ${file}, using the bundled foods:`, error);
+    return bundledFoods as NutritionFood[];
+  }
+}
+
+// Built on first use; call it at startup to keep a large dataset's build off
+// the first request
+export function getNutritionIndex(): NutritionIndex {
+  if (!index) {
+    const started = Date.now();
+    index = new NutritionIndex(loadFoods());
+    buildMs = Date.now() - started;
+    const { foods, keys, tokens } = index.size;
+    console.log(`[nutrition] indexed ${foods} foods (${keys} names, ${tokens} words) in ${buildMs}ms`);
+  }
+  return index;
+}
+
+export function searchFoods(query: string, limit?: number): NutritionMatch[] {
+  counts.searches++;
+  return getNutritionIndex().search(query, limit);
+}
+
+export function resolveFood(foodName: string, servingSize: string): ResolvedFood | null {
+  counts.lookups++;
+  // Typo matches are fine for suggestions, but "chai" must not be logged as chia seeds
+  const best = getNutritionIndex().search(foodName, 5, { prefix: false }).find(match => match.complete && match.exact);
+  if (!best) {
+    return null;
+  }
+  const scale = servingScale(servingSize, best.food);
+  if (scale === null) {
+    return null;
+  }
+  counts.resolved++;
+  return { food: best.food, matched: best.matched, scale };
+}
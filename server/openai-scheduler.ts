@@ -0,0 +1,345 @@
+import { registerMetrics, SampleWindow } from './metrics';
+
+// Shared gate in front of every OpenAI request.
+//
+// At most OPENAI_MAX_IN_FLIGHT requests run at once, and two token buckets
+// keep the process under OPENAI_RPM requests and OPENAI_TPM tokens a minute
+// (a request is charged its estimated tokens up front and corrected to the
+// reported usage afterwards). Waiting requests are served by priority: chat
+// first, then analysis, then background work such as history summaries. A
+// request's priority improves by one level for every PRIORITY_AGING_MS it has
+// waited, so background work still runs under sustained chat load.
+//
+// 429s, 5xx responses and connection errors are retried up to
+// OPENAI_MAX_RETRIES times with full-jitter exponential backoff. A Retry-After
+// (or retry-after-ms) header sets the delay instead, and a 429's delay holds
+// back every queued request, not just the one that hit it. A request still
+// queued after OPENAI_QUEUE_TIMEOUT_MS fails, so callers fall back rather
+// than hang. Queue depth, wait times and retry counts are under
+// openaiScheduler at /api/metrics.
+
+export type UpstreamPriority = 'chat' | 'analysis' | 'background';
+
+const PRIORITIES: UpstreamPriority[] = ['chat', 'analysis', 'background'];
+const PRIORITY_AGING_MS = 10_000;
+
+export interface SchedulerOptions {
+  maxInFlight: number;
+  requestsPerMinute: number;
+  tokensPerMinute: number;
+  maxRetries: number;
+  retryBaseMs: number;
+  retryMaxMs: number;
+  queueTimeoutMs: number;
+}
+
+export interface RunOptions<T> {
+  estimatedTokens: number;
+  signal?: AbortSignal;
+  // Tokens the finished request actually used, when the response says
+  usage?: (result: T) => number | undefined;
+  // Checked before each retry; false makes the last error final
+  canRetry?: () => boolean;
+}
+
+export class UpstreamQueueTimeout extends Error {
+  readonly status = 429;
+
+  constructor(waitedMs: number) {
+    super(`Waited ${waitedMs}ms for an OpenAI request slot`);
+    this.name = 'UpstreamQueueTimeout';
+  }
+}
+
+class TokenBucket {
+  private level: number;
+  private updated = Date.now();
+
+  constructor(readonly capacity: number) {
+    this.level = capacity;
+  }
+
+  private refill(now: number) {
+    this.level = Math.min(this.capacity, this.level + ((now - this.updated) * this.capacity) / 60_000);
+    this.updated = now;
+  }
+
+  // Milliseconds until `amount` is available (0 if it is now)
+  waitFor(amount: number, now = Date.now()): number {
+    this.refill(now);
+    const needed = Math.min(amount, this.capacity) - this.level;
+    return needed <= 0 ? 0 : Math.ceil((needed * 60_000) / this.capacity);
+  }
+
+  take(amount: number) {
+    this.level -= Math.min(amount, this.capacity);
+  }
+
+  // Correct an up-front estimate; the level may go negative after an overrun
+  adjust(delta: number) {
+    this.level = Math.min(this.capacity, this.level - delta);
+  }
+
+  get available() {
+    return Math.floor(this.level);
+  }
+}
+
+interface Waiter {
+  priority: UpstreamPriority;
+  tokens: number;
+  enqueuedAt: number;
+  grant: () => void;
+  fail: (error: unknown) => void;
+}
+
+function sleep(ms: number, signal?: AbortSignal): Promise<void> {
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) {
+      return reject(signal.reason);
+    }
+    const onAbort = () => {
+      clearTimeout(timer);
+      reject(signal!.reason);
+    };
+    const timer = setTimeout(() => {
+      signal?.removeEventListener('abort', onAbort);
+      resolve();
+    }, ms);
+    signal?.addEventListener('abort', onAbort, { once: true });
+  });
+}
+
+function errorStatus(error: unknown): number | undefined {
+  const status = (error as { status?: unknown } | null)?.status;
+  return typeof status === 'number' ? status : undefined;
+}
+
+function isRetryable(error: unknown): boolean {
+  const status = errorStatus(error);
+  if (status === undefined) {
+    // The SDK's connection failures and timeouts carry no status
+    const name = (error as { name?: unknown } | null)?.name;
+    return name === 'APIConnectionError' || name === 'APIConnectionTimeoutError';
+  }
+  return status === 408 || status === 409 || status === 429 || status >= 500;
+}
+
+// Delay the server asked for, in milliseconds
+function retryAfterMs(error: unknown): number | undefined {
+  const headers = (error as { headers?: any } | null)?.headers;
+  if (!headers) {
+    return undefined;
+  }
+  const header = (name: string): string | undefined =>
+    (typeof headers.get === 'function' ? headers.get(name) : headers[name]) ?? undefined;
+
+  const ms = Number(header('retry-after-ms'));
+  if (ms > 0) {
+    return ms;
+  }
+  const value = header('retry-after');
+  if (!value) {
+    return undefined;
+  }
+  const seconds = Number(value);
+  if (!Number.isNaN(seconds)) {
+    return Math.max(0, seconds * 1000);
+  }
+  const date = Date.parse(value);
+  return Number.isNaN(date) ? undefined : Math.max(0, date - Date.now());
+}
+
+export class UpstreamScheduler {
+  private inFlight = 0;
+  private queues: Record<UpstreamPriority, Waiter[]> = { chat: [], analysis: [], background: [] };
+  private requests: TokenBucket;
+  private tokens: TokenBucket;
+  private pausedUntil = 0;
+  private timer: NodeJS.Timeout | null = null;
+  private stats = { started: 0, retries: 0, rateLimited: 0, serverErrors: 0, failed: 0, queueTimeouts: 0 };
+  private waits: Record<UpstreamPriority, SampleWindow> = {
+    chat: new SampleWindow(),
+    analysis: new SampleWindow(),
+    background: new SampleWindow()
+  };
+
+  constructor(private options: SchedulerOptions) {
+    this.requests = new TokenBucket(options.requestsPerMinute);
+    this.tokens = new TokenBucket(options.tokensPerMinute);
+  }
+
+  async run<T>(priority: UpstreamPriority, call: () => Promise<T>, options: RunOptions<T>): Promise<T> {
+    for (let attempt = 0; ; attempt++) {
+      await this.acquire(priority, options.estimatedTokens, options.signal);
+      let result: T;
+      try {
+        result = await call();
+      } catch (error) {
+        this.release();
+        const status = errorStatus(error);
+        if (status === 429) this.stats.rateLimited++;
+        else if (status !== undefined && status >= 500) this.stats.serverErrors++;
+
+        if (options.signal?.aborted || !isRetryable(error) || attempt >= this.options.maxRetries
+          || (options.canRetry && !options.canRetry())) {
+          this.stats.failed++;
+          throw error;
+        }
+
+        const requested = retryAfterMs(error);
+        const backoff = Math.random() * Math.min(this.options.retryMaxMs, this.options.retryBaseMs * 2 ** attempt);
+        const delay = Math.min(this.options.retryMaxMs, requested ?? backoff);
+        if (status === 429) {
+          // The limit is per API key: hold everyone back, not just this request
+          this.pausedUntil = Math.max(this.pausedUntil, Date.now() + delay);
+        }
+        this.stats.retries++;
+        await sleep(delay, options.signal);
+        continue;
+      }
+
+      this.release();
+      const used = options.usage?.(result);
+      if (used !== undefined) {
+        this.tokens.adjust(used - Math.min(options.estimatedTokens, this.tokens.capacity));
+      }
+      return result;
+    }
+  }
+
+  private acquire(priority: UpstreamPriority, tokens: number, signal?: AbortSignal): Promise<void> {
+    if (signal?.aborted) {
+      return Promise.reject(signal.reason);
+    }
+    return new Promise((resolve, reject) => {
+      const waiter: Waiter = { priority, tokens, enqueuedAt: Date.now(), grant: resolve, fail: reject };
+      const onAbort = () => {
+        if (this.remove(waiter)) {
+          reject(signal!.reason);
+        }
+      };
+      waiter.grant = () => {
+        signal?.removeEventListener('abort', onAbort);
+        resolve();
+      };
+      signal?.addEventListener('abort', onAbort, { once: true });
+      this.queues[priority].push(waiter);
+      this.dispatch();
+    });
+  }
+
+  private remove(waiter: Waiter): boolean {
+    const queue = this.queues[waiter.priority];
+    const index = queue.indexOf(waiter);
+    if (index < 0) {
+      return false;
+    }
+    queue.splice(index, 1);
+    return true;
+  }
+
+  private release() {
+    this.inFlight--;
+    this.dispatch();
+  }
+
+  // The waiter to serve next: the head of the queue with the best aged priority
+  private next(now: number): Waiter | undefined {
+    let best: Waiter | undefined;
+    let bestRank = Infinity;
+    PRIORITIES.forEach((priority, level) => {
+      const head = this.queues[priority][0];
+      if (!head) return;
+      const rank = level - Math.floor((now - head.enqueuedAt) / PRIORITY_AGING_MS);
+      if (rank < bestRank) {
+        best = head;
+        bestRank = rank;
+      }
+    });
+    return best;
+  }
+
+  private dispatch() {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+
+    const now = Date.now();
+    for (const queue of Object.values(this.queues)) {
+      while (queue.length > 0 && now - queue[0].enqueuedAt >= this.options.queueTimeoutMs) {
+        const expired = queue.shift()!;
+        this.stats.queueTimeouts++;
+        expired.fail(new UpstreamQueueTimeout(now - expired.enqueuedAt));
+      }
+    }
+
+    // Start whatever the slots, the pause and the buckets allow; otherwise
+    // note how long until the next waiter could start
+    let retryIn = Infinity;
+    while (this.inFlight < this.options.maxInFlight) {
+      const waiter = this.next(now);
+      if (!waiter) {
+        break;
+      }
+      const wait = Math.max(
+        this.pausedUntil - now,
+        this.requests.waitFor(1, now),
+        this.tokens.waitFor(waiter.tokens, now)
+      );
+      if (wait > 0) {
+        retryIn = wait;
+        break;
+      }
+
+      this.remove(waiter);
+      this.requests.take(1);
+      this.tokens.take(waiter.tokens);
+      this.inFlight++;
+      this.stats.started++;
+      this.waits[waiter.priority].record(now - waiter.enqueuedAt);
+      waiter.grant();
+    }
+
+    // Wake up for that, or to expire the oldest waiter on time
+    const oldest = Math.min(...Object.values(this.queues).map(queue => queue[0]?.enqueuedAt ?? Infinity));
+    const wakeIn = Math.min(retryIn, oldest + this.options.queueTimeoutMs - now);
+    if (wakeIn !== Infinity) {
+      this.timer = setTimeout(() => this.dispatch(), Math.max(0, wakeIn));
+    }
+  }
+
+  snapshot() {
+    return {
+      ...this.stats,
+      inFlight: this.inFlight,
+      maxInFlight: this.options.maxInFlight,
+      queued: {
+        chat: this.queues.chat.length,
+        analysis: this.queues.analysis.length,
+        background: this.queues.background.length
+      },
+      pausedForMs: Math.max(0, this.pausedUntil - Date.now()),
+      requestsAvailable: this.requests.available,
+      tokensAvailable: this.tokens.available,
+      waitMs: {
+        chat: this.waits.chat.snapshot(),
+        analysis: this.waits.analysis.snapshot(),
+        background: this.waits.background.snapshot()
+      }
+    };
+  }
+}
+
+export const upstream = new UpstreamScheduler({
+  maxInFlight: Number(process.env.OPENAI_MAX_IN_FLIGHT) || 8,
+  requestsPerMinute: Number(process.env.OPENAI_RPM) || 500,
+  tokensPerMinute: Number(process.env.OPENAI_TPM) || 200_000,
+  maxRetries: Number(process.env.OPENAI_MAX_RETRIES ?? 3),
+  retryBaseMs: Number(process.env.OPENAI_RETRY_BASE_MS) || 500,
+  retryMaxMs: Number(process.env.OPENAI_RETRY_MAX_MS) || 20_000,
+  queueTimeoutMs: Number(process.env.OPENAI_QUEUE_TIMEOUT_MS) || 60_000
+});
+
+registerMetrics('openaiScheduler', () => upstream.snapshot());
@@ -1,16 +1,83 @@
 import OpenAI from "openai";
+import crypto from "crypto";
+import { registerMetrics } from "./metrics";
+import { upstream, type UpstreamPriority } from "./openai-scheduler";
+
+// OPENAI_BASE_URL points the client at another chat-completions server, e.g. the
+// local stub in testsprite_tests/harness/openai_stub.py (http://localhost:8787/v1)
+const openaiBaseUrl = process.env.OPENAI_BASE_URL || undefined;
 
 // the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
 const openai = new OpenAI({ 
-  apiKey: process.env.OPENAI_API_KEY || 'sk-dummy-key-for-development' 
+  apiKey: process.env.OPENAI_API_KEY || 'sk-dummy-key-for-development',
+  baseURL: openaiBaseUrl,
+  maxRetries: 0  // retries go through the scheduler in openai-scheduler.ts
 });
 
-// Add a check to warn if using a dummy key
-if (!process.env.OPENAI_API_KEY) {
+if (openaiBaseUrl) {
+  console.log(`Using OpenAI-compatible API at ${openaiBaseUrl}`);
+} else if (!process.env.OPENAI_API_KEY) {
+  // Add a check to warn if using a dummy key
   console.warn('⚠️ WARNING: OPENAI_API_KEY is not set. Using a dummy key that will not work with OpenAI API.');
   console.warn('⚠️ Please set the OPENAI_API_KEY environment variable in your .env file.');
 }
 
+// Single flight: identical calls made while one is already running wait for
+// that call instead of starting their own, and all of them get its parsed
+// result (or its error). The key is a hash of the call's arguments; the entry
+// is removed as soon as the call settles, so nothing is cached here.
+const inFlight = new Map<string, Promise<unknown>>();
+const flightStats: Record<string, { calls: number; upstream: number; coalesced: number }> = {};
+
+registerMetrics('openaiCoalescing', () => ({ inFlight: inFlight.size, ...flightStats }));
+
+function singleFlight<T>(kind: string, args: unknown[], call: () => Promise<T>): Promise<T> {
+  const stats = flightStats[kind] ??= { calls: 0, upstream: 0, coalesced: 0 };
+  stats.calls++;
+
+  const key = `${kind}:${crypto.createHash('sha256').update(JSON.stringify(args)).digest('hex')}`;
+  const running = inFlight.get(key);
+  if (running) {
+    stats.coalesced++;
+    return running as Promise<T>;
+  }
+
+  stats.upstream++;
+  const promise = call().finally(() => inFlight.delete(key));
+  inFlight.set(key, promise);
+  return promise;
+}
+
+// Charged against the tokens-per-minute bucket before a request starts
+const IMAGE_TOKENS = 800;
+const DEFAULT_COMPLETION_TOKENS = 500;
+
+function estimateRequestTokens(messages: any[], maxTokens?: number | null): number {
+  const textTokens = (text: string) => Math.ceil(text.length / 4);
+  let tokens = 0;
+  for (const message of messages) {
+    if (typeof message.content === 'string') {
+      tokens += textTokens(message.content);
+    } else if (Array.isArray(message.content)) {
+      for (const part of message.content) {
+        tokens += part.type === 'text' ? textTokens(part.text) : IMAGE_TOKENS;
+      }
+    }
+  }
+  return tokens + (maxTokens ?? DEFAULT_COMPLETION_TOKENS);
+}
+
+// A non-streaming completion, queued and retried by the upstream scheduler
+function complete(
+  priority: UpstreamPriority,
+  params: OpenAI.Chat.ChatCompletionCreateParamsNonStreaming
+): Promise<OpenAI.Chat.ChatCompletion> {
+  return upstream.run(priority, () => openai.chat.completions.create(params), {
+    estimatedTokens: estimateRequestTokens(params.messages, params.max_tokens),
+    usage: response => response.usage?.total_tokens
+  });
+}
+
 // Enhanced system message for better fitness coaching
 const ENHANCED_FITNESS_SYSTEM_MESSAGE = `You are an expert fitness and nutrition coach with deep knowledge of exercise science, nutrition, and behavior change. Your role is to provide:
 
@@ -42,13 +109,7 @@ const ENHANCED_FITNESS_SYSTEM_MESSAGE = `You are an expert fitness and nutrition
 
 Always ask clarifying questions when needed to provide more personalized advice.`;
 
-// Analyze food entry and return nutritional information
-export async function analyzeFoodEntry(
-  foodName: string,
-  description: string,
-  servingSize: string,
-  imageBase64?: string
-): Promise<{
+export interface FoodAnalysis {
   calories: number;
   protein: number;
   carbs: number;
@@ -57,7 +118,26 @@ export async function analyzeFoodEntry(
   ingredients?: string[];
   healthBenefits?: string[];
   possibleAllergens?: string[];
-}> {
+}
+
+// Analyze food entry and return nutritional information
+// (routes go through analyzeFoodEntryCached in analysis-cache.ts)
+export function analyzeFoodEntry(
+  foodName: string,
+  description: string,
+  servingSize: string,
+  imageBase64?: string
+): Promise<FoodAnalysis> {
+  return singleFlight('analyzeFoodEntry', [foodName, description, servingSize, imageBase64 ?? null],
+    () => requestFoodAnalysis(foodName, description, servingSize, imageBase64));
+}
+
+async function requestFoodAnalysis(
+  foodName: string,
+  description: string,
+  servingSize: string,
+  imageBase64?: string
+): Promise<FoodAnalysis> {
   try {
     const promptTemplate = `
       Analyze the following food entry and provide detailed nutritional information:
@@ -104,7 +184,7 @@ export async function analyzeFoodEntry(
       messages = [{ role: "user", content: promptTemplate }];
     }
 
-    const response = await openai.chat.completions.create({
+    const response = await complete('analysis', {
       model: "gpt-3.5-turbo",
       messages: messages as any,
       response_format: { type: "json_object" },
@@ -132,26 +212,31 @@ export async function analyzeFoodEntry(
   }
 }
 
-// Enhanced chat with AI about fitness and nutrition
-export async function getFitnessResponse(
-  userMessage: string,
-  previousMessages: Array<{ role: "user" | "assistant"; content: string }> = [],
-  userContext?: {
-    fitnessLevel?: string;
-    goals?: string[];
-    dietaryRestrictions?: string[];
-    availableTime?: string;
-    equipment?: string[];
-  }
-): Promise<{
+export interface FitnessUserContext {
+  fitnessLevel?: string;
+  goals?: string[];
+  dietaryRestrictions?: string[];
+  availableTime?: string;
+  equipment?: string[];
+}
+
+export interface FitnessResponse {
   response: string;
   actionItems: string[];
   followUpQuestions: string[];
   category: string;
   confidence: number;
-}> {
-  try {
-    const contextPrompt = userContext ? `
+}
+
+type ChatTurnMessage = { role: "user" | "assistant"; content: string };
+
+function fitnessMessages(
+  userMessage: string,
+  previousMessages: ChatTurnMessage[],
+  userContext?: FitnessUserContext,
+  conversationSummary?: string
+) {
+  const contextPrompt = userContext ? `
 User Context:
 - Fitness Level: ${userContext.fitnessLevel || 'Not specified'}
 - Goals: ${userContext.goals?.join(', ') || 'Not specified'}
@@ -162,12 +247,18 @@ User Context:
 Please use this context to provide more personalized advice.
 ` : '';
 
-    const systemMessage = {
-      role: "system",
-      content: `${ENHANCED_FITNESS_SYSTEM_MESSAGE}
+  // Turns that no longer fit the history window arrive folded into a summary
+  const summaryPrompt = conversationSummary ? `
+Summary of the earlier conversation:
+${conversationSummary}
+` : '';
 
-${contextPrompt}
+  const systemMessage = {
+    role: "system",
+    content: `${ENHANCED_FITNESS_SYSTEM_MESSAGE}
 
+${contextPrompt}
+${summaryPrompt}
 Please structure your response to include:
 1. A helpful, personalized answer to the user's question
 2. 3-5 specific action items they can implement
@@ -176,17 +267,143 @@ Please structure your response to include:
 5. Your confidence level (0-1) in the advice given
 
 Respond in a conversational, encouraging tone while being specific and actionable.`
-    };
+  };
+
+  return [
+    systemMessage,
+    ...previousMessages,
+    { role: "user", content: userMessage }
+  ];
+}
 
-    const messages = [
-      systemMessage,
-      ...previousMessages,
-      { role: "user", content: userMessage }
+function parseFitnessResponse(content: string, userMessage: string): FitnessResponse {
+  // Parse the response to extract structured information
+  const lines = content.split('\n');
+  let mainResponse = '';
+  let actionItems: string[] = [];
+  let followUpQuestions: string[] = [];
+  let category = 'general';
+  let confidence = 0.8;
+
+  let currentSection = 'response';
+  
+  for (const line of lines) {
+    const trimmedLine = line.trim();
+    
+    if (trimmedLine.toLowerCase().includes('action items:') || trimmedLine.toLowerCase().includes('steps:')) {
+      currentSection = 'actionItems';
+      continue;
+    } else if (trimmedLine.toLowerCase().includes('follow-up questions:') || trimmedLine.toLowerCase().includes('next steps:')) {
+      currentSection = 'followUp';
+      continue;
+    } else if (trimmedLine.toLowerCase().includes('category:') || trimmedLine.toLowerCase().includes('type:')) {
+      const categoryMatch = trimmedLine.match(/category:\s*(.+)/i) || trimmedLine.match(/type:\s*(.+)/i);
+      if (categoryMatch) {
+        category = categoryMatch[1].toLowerCase();
+      }
+      continue;
+    } else if (trimmedLine.toLowerCase().includes('confidence:')) {
+      const confidenceMatch = trimmedLine.match(/confidence:\s*([0-9.]+)/i);
+      if (confidenceMatch) {
+        confidence = parseFloat(confidenceMatch[1]);
+      }
+      continue;
+    }
+
+    if (trimmedLine && !trimmedLine.startsWith('---')) {
+      if (currentSection === 'response') {
+        mainResponse += (mainResponse ? '\n' : '') + trimmedLine;
+      } else if (currentSection === 'actionItems' && (trimmedLine.startsWith('•') || trimmedLine.startsWith('-') || trimmedLine.match(/^\d+\./))) {
+        const item = trimmedLine.replace(/^[•\-\d\.\s]+/, '').trim();
+        if (item) actionItems.push(item);
+      } else if (currentSection === 'followUp' && (trimmedLine.startsWith('•') || trimmedLine.startsWith('-') || trimmedLine.match(/^\d+\./))) {
+        const question = trimmedLine.replace(/^[•\-\d\.\s]+/, '').trim();
+        if (question) followUpQuestions.push(question);
+      }
+    }
+  }
+
+  // Fallback action items and questions if not found in response
+  if (actionItems.length === 0) {
+    actionItems = [
+      "Start with small, manageable changes",
+      "Track your progress consistently",
+      "Stay consistent with your routine"
+    ];
+  }
+
+  if (followUpQuestions.length === 0) {
+    followUpQuestions = [
+      "What specific goals would you like to focus on?",
+      "What challenges are you currently facing?"
     ];
+  }
+
+  // Determine category if not specified
+  if (category === 'general') {
+    const input = userMessage.toLowerCase();
+    if (input.includes('workout') || input.includes('exercise') || input.includes('training')) {
+      category = 'workout';
+    } else if (input.includes('nutrition') || input.includes('diet') || input.includes('meal') || input.includes('protein')) {
+      category = 'nutrition';
+    } else if (input.includes('sleep') || input.includes('recovery') || input.includes('rest')) {
+      category = 'lifestyle';
+    } else if (input.includes('goal') || input.includes('plan')) {
+      category = 'planning';
+    }
+  }
 
-    const response = await openai.chat.completions.create({
+  return {
+    response: mainResponse || content,
+    actionItems: actionItems.slice(0, 5),
+    followUpQuestions: followUpQuestions.slice(0, 3),
+    category,
+    confidence
+  };
+}
+
+function fitnessFallback(error: unknown): FitnessResponse {
+  // Handle specific error types
+  let fallbackMessage = "I'd love to help you with that! To provide the most personalized advice, could you tell me more about your specific goals and current situation?";
+  
+  if (error && typeof error === 'object' && 'status' in error) {
+    const status = (error as any).status;
+    if (status === 429) {
+      fallbackMessage = "I'm experiencing high demand right now. Let me provide some general guidance while I get back to full capacity. What specific fitness or nutrition question do you have?";
+    } else if (status >= 500) {
+      fallbackMessage = "I'm having technical difficulties at the moment. Let me give you some general advice while I work on getting back to full functionality.";
+    }
+  }
+  
+  // Fallback response
+  return {
+    response: fallbackMessage,
+    actionItems: [
+      "Share your fitness goals",
+      "Describe your current routine",
+      "Mention any challenges you're facing"
+    ],
+    followUpQuestions: [
+      "What are your main fitness goals?",
+      "What's your current fitness level?",
+      "How much time can you dedicate to fitness?"
+    ],
+    category: 'general',
+    confidence: 0.5
+  };
+}
+
+// Enhanced chat with AI about fitness and nutrition
+export async function getFitnessResponse(
+  userMessage: string,
+  previousMessages: ChatTurnMessage[] = [],
+  userContext?: FitnessUserContext,
+  conversationSummary?: string
+): Promise<FitnessResponse> {
+  try {
+    const response = await complete('chat', {
       model: "gpt-3.5-turbo",
-      messages: messages as any,
+      messages: fitnessMessages(userMessage, previousMessages, userContext, conversationSummary) as any,
       max_tokens: 800,
       temperature: 0.7
     });
@@ -195,146 +412,135 @@ Respond in a conversational, encouraging tone while being specific and actionabl
     if (!content) {
       throw new Error('No content in OpenAI response');
     }
+    return parseFitnessResponse(content, userMessage);
+  } catch (error) {
+    console.error("Error getting fitness response:", error);
+    return fitnessFallback(error);
+  }
+}
 
-    // Parse the response to extract structured information
-    const lines = content.split('\n');
-    let mainResponse = '';
-    let actionItems: string[] = [];
-    let followUpQuestions: string[] = [];
-    let category = 'general';
-    let confidence = 0.8;
-
-    let currentSection = 'response';
-    
-    for (const line of lines) {
-      const trimmedLine = line.trim();
-      
-      if (trimmedLine.toLowerCase().includes('action items:') || trimmedLine.toLowerCase().includes('steps:')) {
-        currentSection = 'actionItems';
-        continue;
-      } else if (trimmedLine.toLowerCase().includes('follow-up questions:') || trimmedLine.toLowerCase().includes('next steps:')) {
-        currentSection = 'followUp';
-        continue;
-      } else if (trimmedLine.toLowerCase().includes('category:') || trimmedLine.toLowerCase().includes('type:')) {
-        const categoryMatch = trimmedLine.match(/category:\s*(.+)/i) || trimmedLine.match(/type:\s*(.+)/i);
-        if (categoryMatch) {
-          category = categoryMatch[1].toLowerCase();
-        }
-        continue;
-      } else if (trimmedLine.toLowerCase().includes('confidence:')) {
-        const confidenceMatch = trimmedLine.match(/confidence:\s*([0-9.]+)/i);
-        if (confidenceMatch) {
-          confidence = parseFloat(confidenceMatch[1]);
-        }
-        continue;
-      }
-
-      if (trimmedLine && !trimmedLine.startsWith('---')) {
-        if (currentSection === 'response') {
-          mainResponse += (mainResponse ? '\n' : '') + trimmedLine;
-        } else if (currentSection === 'actionItems' && (trimmedLine.startsWith('•') || trimmedLine.startsWith('-') || trimmedLine.match(/^\d+\./))) {
-          const item = trimmedLine.replace(/^[•\-\d\.\s]+/, '').trim();
-          if (item) actionItems.push(item);
-        } else if (currentSection === 'followUp' && (trimmedLine.startsWith('•') || trimmedLine.startsWith('-') || trimmedLine.match(/^\d+\./))) {
-          const question = trimmedLine.replace(/^[•\-\d\.\s]+/, '').trim();
-          if (question) followUpQuestions.push(question);
+// getFitnessResponse, streamed: each piece of the reply goes to onDelta as it
+// arrives, and the parsed reply is returned at the end. If the call fails
+// before anything was sent, the fallback reply is sent and returned instead;
+// once part of the reply is out (or `signal` aborts) the error is thrown.
+export async function streamFitnessResponse(
+  userMessage: string,
+  previousMessages: ChatTurnMessage[],
+  userContext: FitnessUserContext | undefined,
+  conversationSummary: string | undefined,
+  onDelta: (text: string) => void,
+  signal?: AbortSignal
+): Promise<FitnessResponse> {
+  let content = '';
+  try {
+    const messages = fitnessMessages(userMessage, previousMessages, userContext, conversationSummary);
+    // The request holds its scheduler slot until the stream ends, and is only
+    // retried while nothing has been relayed yet
+    await upstream.run('chat', async () => {
+      const stream = await openai.chat.completions.create({
+        model: "gpt-3.5-turbo",
+        messages: messages as any,
+        max_tokens: 800,
+        temperature: 0.7,
+        stream: true
+      }, { signal });
+
+      for await (const chunk of stream) {
+        const delta = chunk.choices[0]?.delta?.content;
+        if (delta) {
+          content += delta;
+          onDelta(delta);
         }
       }
-    }
+    }, { estimatedTokens: estimateRequestTokens(messages, 800), signal, canRetry: () => !content });
 
-    // Fallback action items and questions if not found in response
-    if (actionItems.length === 0) {
-      actionItems = [
-        "Start with small, manageable changes",
-        "Track your progress consistently",
-        "Stay consistent with your routine"
-      ];
-    }
-
-    if (followUpQuestions.length === 0) {
-      followUpQuestions = [
-        "What specific goals would you like to focus on?",
-        "What challenges are you currently facing?"
-      ];
-    }
-
-    // Determine category if not specified
-    if (category === 'general') {
-      const input = userMessage.toLowerCase();
-      if (input.includes('workout') || input.includes('exercise') || input.includes('training')) {
-        category = 'workout';
-      } else if (input.includes('nutrition') || input.includes('diet') || input.includes('meal') || input.includes('protein')) {
-        category = 'nutrition';
-      } else if (input.includes('sleep') || input.includes('recovery') || input.includes('rest')) {
-        category = 'lifestyle';
-      } else if (input.includes('goal') || input.includes('plan')) {
-        category = 'planning';
-      }
+    if (!content) {
+      throw new Error('No content in OpenAI response');
     }
-
-    return {
-      response: mainResponse || content,
-      actionItems: actionItems.slice(0, 5),
-      followUpQuestions: followUpQuestions.slice(0, 3),
-      category,
-      confidence
-    };
+    return parseFitnessResponse(content, userMessage);
   } catch (error) {
-    console.error("Error getting fitness response:", error);
-    
-    // Handle specific error types
-    let fallbackMessage = "I'd love to help you with that! To provide the most personalized advice, could you tell me more about your specific goals and current situation?";
-    
-    if (error && typeof error === 'object' && 'status' in error) {
-      const status = (error as any).status;
-      if (status === 429) {
-        fallbackMessage = "I'm experiencing high demand right now. Let me provide some general guidance while I get back to full capacity. What specific fitness or nutrition question do you have?";
-      } else if (status >= 500) {
-        fallbackMessage = "I'm having technical difficulties at the moment. Let me give you some general advice while I work on getting back to full functionality.";
-      }
+    if (content || signal?.aborted) {
+      throw error;
     }
-    
-    // Fallback response
-    return {
-      response: fallbackMessage,
-      actionItems: [
-        "Share your fitness goals",
-        "Describe your current routine",
-        "Mention any challenges you're facing"
-      ],
-      followUpQuestions: [
-        "What are your main fitness goals?",
-        "What's your current fitness level?",
-        "How much time can you dedicate to fitness?"
-      ],
-      category: 'general',
-      confidence: 0.5
-    };
+    console.error("Error streaming fitness response:", error);
+    const fallback = fitnessFallback(error);
+    onDelta(fallback.response);
+    return fallback;
   }
 }
 
-// Enhanced nutrition recommendations based on user's food entries
-export async function getNutritionRecommendations(
-  recentEntries: Array<{
-    name: string;
-    calories: number;
-    protein: number;
-    carbs: number;
-    fat: number;
-  }>,
-  nutritionGoals: {
-    calorieGoal: number;
-    proteinGoal: number;
-    carbGoal: number;
-    fatGoal: number;
+// Fold chat turns into a running conversation summary (see chat-history.ts).
+// Throws on failure; the caller keeps the previous summary.
+export async function summarizeConversation(
+  previousSummary: string | null,
+  turns: Array<{ message: string; response?: string }>
+): Promise<string> {
+  const transcript = turns
+    .map(turn => `User: ${turn.message}\nCoach: ${turn.response || '(no reply)'}`)
+    .join('\n\n');
+
+  const response = await complete('background', {
+    model: "gpt-3.5-turbo",
+    messages: [
+      {
+        role: "system",
+        content: "You maintain a running summary of a conversation between a user and their fitness and nutrition coach. Keep the user's goals, constraints, preferences, reported progress and the advice already given. Write at most 150 words of plain prose."
+      },
+      {
+        role: "user",
+        content: `${previousSummary ? `Current summary:\n${previousSummary}\n\n` : ''}Fold in these turns:\n\n${transcript}`
+      }
+    ],
+    max_tokens: 300,
+    temperature: 0.2
+  });
+
+  const summary = response.choices[0].message.content?.trim();
+  if (!summary) {
+    throw new Error('No content in OpenAI response');
   }
-): Promise<Array<{ 
-  title: string; 
+  return summary;
+}
+
+type RecommendationEntry = {
+  name: string;
+  calories: number;
+  protein: number;
+  carbs: number;
+  fat: number;
+};
+
+type RecommendationGoals = {
+  calorieGoal: number;
+  proteinGoal: number;
+  carbGoal: number;
+  fatGoal: number;
+};
+
+export interface NutritionRecommendation {
+  title: string;
   description: string;
   actionItems: string[];
   priority: 'high' | 'medium' | 'low';
   category: string;
-}>> {
+}
+
+// Enhanced nutrition recommendations based on user's food entries
+export function getNutritionRecommendations(
+  recentEntries: RecommendationEntry[],
+  nutritionGoals: RecommendationGoals
+): Promise<NutritionRecommendation[]> {
+  // Only the fields that go into the prompt make up the key
+  const promptEntries = recentEntries.map(({ name, calories, protein, carbs, fat }) => [name, calories, protein, carbs, fat]);
+  const { calorieGoal, proteinGoal, carbGoal, fatGoal } = nutritionGoals;
+  return singleFlight('getNutritionRecommendations', [promptEntries, [calorieGoal, proteinGoal, carbGoal, fatGoal]],
+    () => requestNutritionRecommendations(recentEntries, nutritionGoals));
+}
+
+async function requestNutritionRecommendations(
+  recentEntries: RecommendationEntry[],
+  nutritionGoals: RecommendationGoals
+): Promise<NutritionRecommendation[]> {
   try {
     const prompt = `
       Based on the user's recent food entries and nutrition goals, provide 4 personalized recommendations for improving their diet.
@@ -358,7 +564,7 @@ export async function getNutritionRecommendations(
       Focus on practical, implementable advice that addresses specific gaps in their current nutrition.
     `;
 
-    const response = await openai.chat.completions.create({
+    const response = await complete('analysis', {
       model: "gpt-3.5-turbo",
       messages: [{ role: "user", content: prompt }],
       response_format: { type: "json_object" },
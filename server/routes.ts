@@ -1,13 +1,19 @@
 import type { Express, NextFunction, Request, Response } from "express";
 import { createServer, type Server } from "http";
-import storage, { type UserDocument, type FoodEntryInput, type NutritionGoalInput } from "./storage";
-import { ZodError } from "zod";
+import storage, { decodeFoodEntryCursor, type UserDocument, type FoodEntryInput, type NutritionGoalInput } from "./storage";
+import { z, ZodError } from "zod";
 import { fromZodError } from "zod-validation-error";
 import { setupAuth } from "./auth";
-import { analyzeFoodEntry, getFitnessResponse, getNutritionRecommendations } from "./openai";
+import { getFitnessResponse, getNutritionRecommendations } from "./openai";
+import { analyzeFoodEntryCached } from "./analysis-cache";
 import foodEntriesRouter from './routes/food-entries';
 import nutritionGoalsRouter from './routes/nutrition-goals';
 import dashboardRouter from './routes/dashboard';
+import dataRouter from './routes/data';
+import foodsRouter from './routes/foods';
+import { metricsHandler } from './metrics';
+import { buildChatContext, foldChatHistory } from './chat-history';
+import { streamChatHandler } from './chat-stream';
 
 // Extend Express.Request to include user
 declare global {
@@ -33,6 +39,17 @@ export const ensureAuthenticated = (req: Request, res: Response, next: NextFunct
   return res.status(401).json({ message: "Not authenticated" });
 };
 
+const DEFAULT_PAGE_SIZE = 50;
+
+const foodEntryQuerySchema = z.object({
+  from: z.coerce.date().optional(),
+  to: z.coerce.date().optional(),
+  mealType: z.string().min(1).optional(),
+  name: z.string().trim().min(1).max(100).optional(),
+  limit: z.coerce.number().int().min(1).max(200).optional(),
+  cursor: z.string().min(1).optional(),
+});
+
 export async function registerRoutes(app: Express): Promise<Server> {
   // Set up authentication
   setupAuth(app);
@@ -42,13 +59,19 @@ export async function registerRoutes(app: Express): Promise<Server> {
   // Food Entries API
   app.post("/api/food-entries", ensureAuthenticated, async (req, res) => {
     try {
-      const { name, servingSize, mealType, description, calories, protein, carbs, fat, imageUrl } = req.body;
+      const { name, servingSize, mealType, description, calories, protein, carbs, fat, imageUrl, entryDate } = req.body;
       
       // Ensure we have a valid user ID
       if (!req.user?.id) {
         return res.status(401).json({ error: "User not authenticated" });
       }
 
+      // Accept a backdated entryDate (imports, seeded history); default to now
+      const parsedEntryDate = entryDate ? new Date(entryDate) : new Date();
+      if (isNaN(parsedEntryDate.getTime())) {
+        return res.status(400).json({ error: "Invalid entryDate" });
+      }
+
       // Use the user's numeric ID directly
       const foodEntryData: FoodEntryInput = {
         userId: req.user.id, // Use the numeric ID
@@ -61,7 +84,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
         carbs: Number(carbs),
         fat: Number(fat),
         imageUrl,
-        entryDate: new Date()
+        entryDate: parsedEntryDate
       };
       
       // Analyze food entry with OpenAI if not provided
@@ -70,7 +93,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
           // Check if image is provided
           const imageBase64 = foodEntryData.imageUrl as string;
           
-          const analysis = await analyzeFoodEntry(
+          const analysis = await analyzeFoodEntryCached(
             foodEntryData.name,
             foodEntryData.description || "",
             foodEntryData.servingSize,
@@ -155,42 +178,39 @@ Possible Allergens: ${analysis.possibleAllergens?.join(', ') || 'None detected'}
     }
   });
 
+  // ?from=&to= (ISO dates, `to` exclusive), ?mealType=, ?name= (prefix), ?limit=, ?cursor=
+  // With limit or cursor the response is one page, { entries, nextCursor }, newest
+  // first; pass nextCursor back to get the next one. Without either, every
+  // matching entry is returned as a bare array, as before.
   app.get("/api/food-entries", ensureAuthenticated, async (req, res) => {
     try {
       if (!req.user) {
         return res.status(401).json({ message: "User not authenticated" });
       }
 
-      const foodEntries = await storage.getFoodEntriesByUserId(req.user.id);
-      res.json(foodEntries || []);
-    } catch (error) {
-      console.error("Error fetching food entries:", error);
-      res.status(500).json({ 
-        message: "Failed to fetch food entries", 
-        error: error instanceof Error ? error.message : "Unknown error" 
-      });
-    }
-  });
-
-  app.get("/api/food-entries/daily", ensureAuthenticated, async (req, res) => {
-    try {
-      if (!req.user) {
-        return res.status(401).json({ message: "User not authenticated" });
+      const query = foodEntryQuerySchema.parse(req.query);
+      const after = query.cursor ? decodeFoodEntryCursor(query.cursor) : undefined;
+      if (after === null) {
+        return res.status(400).json({ message: "Invalid cursor" });
       }
 
-      const dateString = req.query.date as string;
-      const date = dateString ? new Date(dateString) : new Date();
-      
-      if (isNaN(date.getTime())) {
-        return res.status(400).json({ message: "Invalid date format" });
-      }
-
-      const dailyEntries = await storage.getDailyFoodEntries(req.user.id, date);
-      res.json(dailyEntries || []);
+      const paged = query.limit !== undefined || query.cursor !== undefined;
+      const page = await storage.pageFoodEntries(req.user.id, {
+        from: query.from,
+        to: query.to,
+        mealType: query.mealType,
+        namePrefix: query.name,
+        after,
+        limit: paged ? query.limit ?? DEFAULT_PAGE_SIZE : undefined
+      });
+      res.json(paged ? page : page.entries);
     } catch (error) {
-      console.error("Error fetching daily food entries:", error);
+      if (error instanceof ZodError) {
+        return res.status(400).json({ message: fromZodError(error).message });
+      }
+      console.error("Error fetching food entries:", error);
       res.status(500).json({ 
-        message: "Failed to fetch daily food entries", 
+        message: "Failed to fetch food entries", 
         error: error instanceof Error ? error.message : "Unknown error" 
       });
     }
@@ -208,21 +228,14 @@ Possible Allergens: ${analysis.possibleAllergens?.join(', ') || 'None detected'}
       // Handle both authenticated and anonymous users
       const userId = req.isAuthenticated() && req.user?.id ? req.user.id : 0; // Use 0 for anonymous users
       
-      // Get previous messages for context
-      const previousMessages = await storage.getChatMessagesByConversationId(conversationId);
-      
-      // Format messages for OpenAI
-      const formattedPreviousMessages = previousMessages.map(msg => ({
-        role: msg.userId.toString() === userId.toString() ? "user" as const : "assistant" as const,
-        content: msg.message
-      }));
+      // Recent turns within the token budget, plus a summary of the older ones
+      const history = await buildChatContext(conversationId);
 
       // Get enhanced AI response with user context
-      const aiResponse = await getFitnessResponse(message, formattedPreviousMessages, userContext);
+      const aiResponse = await getFitnessResponse(message, history.messages, userContext, history.summary);
       
-      // Create chat message with generated ID
+      // Storage assigns the id from the chatmessages sequence
       const chatMessage = await storage.createChatMessage({
-        id: Date.now(), // Simple ID generation
         userId,
         message,
         response: aiResponse.response,
@@ -240,12 +253,18 @@ Possible Allergens: ${analysis.possibleAllergens?.join(', ') || 'None detected'}
         category: aiResponse.category,
         confidence: aiResponse.confidence
       });
+
+      // Summarize turns that left the window once the reply is on its way
+      void foldChatHistory(conversationId, history);
     } catch (error) {
       console.error('Error in chat route:', error);
       res.status(500).json({ message: "Failed to process chat message" });
     }
   });
 
+  // Same as /api/chat, with the reply streamed as Server-Sent Events (see chat-stream.ts)
+  app.post("/api/chat/stream", streamChatHandler);
+
   app.get("/api/chat/conversations", ensureAuthenticated, async (req, res) => {
     try {
       if (!req.user) {
@@ -347,7 +366,7 @@ Possible Allergens: ${analysis.possibleAllergens?.join(', ') || 'None detected'}
       }
 
       // Get user's food entries and nutrition goals
-      const recentEntries = await storage.getRecentFoodEntries(req.user.id, 10);
+      const recentEntries = await storage.listFoodEntries(req.user.id, { limit: 10, newestFirst: true });
       const nutritionGoal = await storage.getNutritionGoalByUserId(req.user.id);
       
       if (!nutritionGoal) {
@@ -420,11 +439,20 @@ Possible Allergens: ${analysis.possibleAllergens?.join(', ') || 'None detected'}
   // Dashboard routes
   app.use('/api/dashboard', dashboardRouter);
 
+  // NDJSON export and import of the signed-in user's data
+  app.use('/api/data', dataRouter);
+
+  // Local nutrition index search
+  app.use('/api/foods', foodsRouter);
+
   // Health check route
   app.get('/health', (_req, res) => {
     res.json({ status: 'ok' });
   });
 
+  // Cache and queue counters (see metrics.ts)
+  app.get('/api/metrics', metricsHandler);
+
   const httpServer = createServer(app);
   return httpServer;
 }
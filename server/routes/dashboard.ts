@@ -1,5 +1,5 @@
 import express from 'express';
-import storage from '../storage';
+import storage, { localDayKey } from '../storage';
 
 const router = express.Router();
 
@@ -8,25 +8,17 @@ router.get('/:userId', async (req, res) => {
   try {
     const { userId } = req.params;
     const today = new Date();
+    today.setHours(0, 0, 0, 0);
+    const tomorrow = new Date(today);
+    tomorrow.setDate(tomorrow.getDate() + 1);
 
-    // Get today's food entries using MongoDB
-    const todaysEntries = await storage.getDailyFoodEntries(
-      Number(userId),
-      today
-    );
-
-    // Calculate daily totals
-    const dailyTotals = todaysEntries.reduce(
-      (acc: any, entry: any) => ({
-        calories: acc.calories + (entry.calories || 0),
-        protein: acc.protein + (entry.protein || 0),
-        carbs: acc.carbs + (entry.carbs || 0),
-        fat: acc.fat + (entry.fat || 0),
-        fiber: acc.fiber + (entry.fiber || 0),
-        sugar: acc.sugar + (entry.sugar || 0),
-      }),
-      { calories: 0, protein: 0, carbs: 0, fat: 0, fiber: 0, sugar: 0 }
-    );
+    // Get today's food entries and their totals from the daily rollup
+    const [todaysEntries, todaysRollup] = await Promise.all([
+      storage.listFoodEntries(Number(userId), { from: today, to: tomorrow }),
+      storage.getRollupTotals(Number(userId), localDayKey(today), localDayKey(tomorrow))
+    ]);
+
+    const { entries: _entries, ...dailyTotals } = todaysRollup;
 
     // Get user's nutrition goals
     const userGoals = await storage.getNutritionGoalByUserId(Number(userId));
@@ -60,10 +52,7 @@ router.get('/:userId', async (req, res) => {
     };
 
     // Get recent entries (last 10 entries)
-    const recentEntries = await storage.getRecentFoodEntries(
-      Number(userId),
-      10
-    );
+    const recentEntries = await storage.listFoodEntries(Number(userId), { limit: 10, newestFirst: true });
 
     // Generate AI recommendations based on data
     const recommendations = generateRecommendations(goals, progress);
@@ -0,0 +1,269 @@
+import { Router, type Response } from 'express';
+import { z } from 'zod';
+import { ensureAuthenticated } from '../middleware';
+import storage, { type BulkInsertOutcome, type ChatMessageInput, type ExportCursor, type FoodEntryInput } from '../storage';
+import { foodEntrySchema } from './food-entries';
+import { nutritionGoalsSchema } from './nutrition-goals';
+
+// Backup and restore of the signed-in user's data as NDJSON.
+//
+// GET /api/data/export streams one JSON object per line: a header, then every
+// food entry, chat message and nutrition goal as {"type": ..., "data": {...}},
+// then an "end" line with the counts (a file without it was cut short). Rows
+// come from Mongo cursors and are written only as fast as the client reads, so
+// memory stays flat however much a user has logged.
+//
+// POST /api/data/import (Content-Type: application/x-ndjson) reads such a file
+// back line by line and writes it in batches; documents get new ids and belong
+// to the importing user.
+
+const router = Router();
+
+const EXPORT_VERSION = 1;
+const WRITE_BUFFER_BYTES = 64 * 1024;
+const IMPORT_BATCH_SIZE = 1000;
+const MAX_LINE_BYTES = 8 * 1024 * 1024;  // an entry with a base64 photo is the largest line
+const MAX_REPORTED_ERRORS = 20;
+
+const importedFoodEntrySchema = foodEntrySchema.extend({
+  aiAnalysis: z.string().optional()
+});
+
+const importedChatMessageSchema = z.object({
+  message: z.string(),
+  response: z.string().optional(),
+  conversationId: z.string(),
+  timestamp: z.coerce.date().optional()
+});
+
+// Resolves once the response can take more data, or the client has gone
+function drained(res: Response): Promise<void> {
+  return new Promise(resolve => {
+    const done = () => {
+      res.off('drain', done);
+      res.off('close', done);
+      resolve();
+    };
+    res.on('drain', done);
+    res.on('close', done);
+  });
+}
+
+router.get('/export', ensureAuthenticated, async (req, res) => {
+  const userId = req.user?.id;
+  if (!userId) {
+    return res.status(401).json({ error: 'Not authenticated' });
+  }
+
+  let cursor: ExportCursor | null = null;
+  let clientGone = false;
+  res.on('close', () => {
+    if (!res.writableFinished) {
+      clientGone = true;
+      cursor?.close().catch(() => {});
+    }
+  });
+
+  // Lines are gathered into ~64 KB writes; a full socket buffer pauses the cursor
+  let buffer = '';
+  const flush = async () => {
+    const chunk = buffer;
+    buffer = '';
+    if (chunk && !res.write(chunk) && !clientGone) {
+      await drained(res);
+    }
+  };
+  const writeLine = async (record: object) => {
+    buffer += JSON.stringify(record) + '\n';
+    if (buffer.length >= WRITE_BUFFER_BYTES) {
+      await flush();
+    }
+  };
+
+  const sections: Array<[string, () => ExportCursor]> = [
+    ['foodEntry', () => storage.cursorFoodEntries(userId)],
+    ['chatMessage', () => storage.cursorChatMessages(userId)],
+    ['nutritionGoal', () => storage.cursorNutritionGoals(userId)],
+  ];
+  const counts: Record<string, number> = {};
+
+  try {
+    res.status(200).set({
+      'Content-Type': 'application/x-ndjson; charset=utf-8',
+      'Content-Disposition': `attachment; filename="nutritrack-${userId}-${new Date().toISOString().slice(0, 10)}.ndjson"`,
+      'Cache-Control': 'no-store'
+    });
+    await writeLine({ type: 'header', version: EXPORT_VERSION, userId, exportedAt: new Date().toISOString() });
+
+    for (const [type, open] of sections) {
+      counts[type] = 0;
+      cursor = open();
+      for await (const data of cursor) {
+        if (clientGone) {
+          break;
+        }
+        await writeLine({ type, data });
+        counts[type]++;
+      }
+      cursor = null;
+      if (clientGone) {
+        return;
+      }
+    }
+
+    await writeLine({ type: 'end', counts });
+    await flush();
+    res.end();
+  } catch (error) {
+    console.error('Error exporting user data:', error);
+    if (res.headersSent) {
+      res.destroy();  // the missing "end" line tells the client the file is incomplete
+    } else {
+      res.status(500).json({ error: 'Failed to export data' });
+    }
+  }
+});
+
+router.post('/import', ensureAuthenticated, async (req, res) => {
+  try {
+    const userId = req.user?.id;
+    if (!userId) {
+      return res.status(401).json({ error: 'Not authenticated' });
+    }
+    if (!req.is('application/x-ndjson')) {
+      return res.status(415).json({ error: 'Expected an application/x-ndjson body' });
+    }
+
+    const summary = {
+      foodEntries: { created: 0, failed: 0 },
+      chatMessages: { created: 0, failed: 0 },
+      nutritionGoal: false,
+      invalid: 0,
+      errors: [] as string[]
+    };
+    const report = (line: number, message: string) => {
+      if (summary.errors.length < MAX_REPORTED_ERRORS) {
+        summary.errors.push(`line ${line}: ${message}`);
+      }
+    };
+    const tally = (counts: { created: number; failed: number }, outcomes: BulkInsertOutcome[]) => {
+      for (const outcome of outcomes) {
+        if (outcome.ok) {
+          counts.created++;
+        } else {
+          counts.failed++;
+        }
+      }
+    };
+
+    let foodEntries: FoodEntryInput[] = [];
+    let chatMessages: ChatMessageInput[] = [];
+    let nutritionGoal = null as z.infer<typeof nutritionGoalsSchema> | null;
+
+    const flushFoodEntries = async () => {
+      const batch = foodEntries;
+      foodEntries = [];
+      tally(summary.foodEntries, await storage.createFoodEntries(batch));
+    };
+    const flushChatMessages = async () => {
+      const batch = chatMessages;
+      chatMessages = [];
+      tally(summary.chatMessages, await storage.createChatMessages(batch));
+    };
+
+    let lineNumber = 0;
+    const handleLine = async (line: string) => {
+      lineNumber++;
+      if (!line.trim()) {
+        return;
+      }
+      let record: { type?: string; version?: number; data?: unknown };
+      try {
+        record = JSON.parse(line);
+      } catch {
+        summary.invalid++;
+        report(lineNumber, 'not valid JSON');
+        return;
+      }
+
+      switch (record?.type) {
+        case 'header':
+          if (record.version !== EXPORT_VERSION) {
+            report(lineNumber, `export version ${record.version} is not ${EXPORT_VERSION}; importing what validates`);
+          }
+          return;
+        case 'end':
+          return;
+        case 'foodEntry': {
+          const parsed = importedFoodEntrySchema.safeParse(record.data);
+          if (!parsed.success) {
+            summary.invalid++;
+            report(lineNumber, parsed.error.errors[0]?.message ?? 'invalid food entry');
+            return;
+          }
+          foodEntries.push({ ...parsed.data, userId, entryDate: parsed.data.entryDate ?? new Date() });
+          if (foodEntries.length >= IMPORT_BATCH_SIZE) {
+            await flushFoodEntries();
+          }
+          return;
+        }
+        case 'chatMessage': {
+          const parsed = importedChatMessageSchema.safeParse(record.data);
+          if (!parsed.success) {
+            summary.invalid++;
+            report(lineNumber, parsed.error.errors[0]?.message ?? 'invalid chat message');
+            return;
+          }
+          const timestamp = parsed.data.timestamp ?? new Date();
+          chatMessages.push({ ...parsed.data, userId, timestamp, createdAt: timestamp, updatedAt: timestamp });
+          if (chatMessages.length >= IMPORT_BATCH_SIZE) {
+            await flushChatMessages();
+          }
+          return;
+        }
+        case 'nutritionGoal': {
+          const parsed = nutritionGoalsSchema.safeParse(record.data);
+          if (!parsed.success) {
+            summary.invalid++;
+            report(lineNumber, parsed.error.errors[0]?.message ?? 'invalid nutrition goal');
+            return;
+          }
+          nutritionGoal = parsed.data;  // a user has one goal; the last line wins
+          return;
+        }
+        default:
+          summary.invalid++;
+          report(lineNumber, `unknown record type ${JSON.stringify(record?.type)}`);
+      }
+    };
+
+    // Reading the body one chunk at a time, and awaiting each batch write before
+    // the next chunk, leaves the rest of the upload in the socket
+    req.setEncoding('utf8');
+    let pending = '';
+    for await (const chunk of req) {
+      const lines = (pending + chunk).split('\n');
+      pending = lines.pop() ?? '';
+      if (pending.length > MAX_LINE_BYTES) {
+        return res.status(413).json({ error: `Line ${lineNumber + 1} is longer than ${MAX_LINE_BYTES} bytes`, ...summary });
+      }
+      for (const line of lines) {
+        await handleLine(line);
+      }
+    }
+    await handleLine(pending);
+    await flushFoodEntries();
+    await flushChatMessages();
+    if (nutritionGoal) {
+      await storage.setNutritionGoal({ ...nutritionGoal, userId });
+      summary.nutritionGoal = true;
+    }
+
+    res.json(summary);
+  } catch (error) {
+    console.error('Error importing user data:', error);
+    res.status(500).json({ error: 'Failed to import data' });
+  }
+});
+
+export default router;
@@ -1,12 +1,13 @@
-import { Router } from 'express';
+import express, { Router } from 'express';
 import { ensureAuthenticated } from '../middleware';
 import storage from '../storage';
 import { z } from 'zod';
-import { FoodEntryDocument } from '../storage';
+import { analyzeFoodEntryCached } from '../analysis-cache';
+import { localDayKey } from '../storage';
 
 const router = Router();
 
-// Get daily food entries summary
+// Get daily food entries summary (?date= picks another day, default today)
 router.get('/daily', ensureAuthenticated, async (req, res) => {
   try {
     const userId = req.user?.id;
@@ -14,25 +15,25 @@ router.get('/daily', ensureAuthenticated, async (req, res) => {
       return res.status(401).json({ error: 'Not authenticated' });
     }
 
-    const today = new Date();
-    today.setHours(0, 0, 0, 0);
-    const tomorrow = new Date(today);
-    tomorrow.setDate(tomorrow.getDate() + 1);
-
-    const entries = await storage.getFoodEntriesByUserId(userId);
-    const todaysEntries = entries.filter((entry: FoodEntryDocument) => {
-      const entryDate = new Date(entry.entryDate);
-      return entryDate >= today && entryDate < tomorrow;
-    });
+    const day = typeof req.query.date === 'string' ? new Date(req.query.date) : new Date();
+    if (isNaN(day.getTime())) {
+      return res.status(400).json({ error: 'Invalid date format' });
+    }
+    day.setHours(0, 0, 0, 0);
+    const nextDay = new Date(day);
+    nextDay.setDate(nextDay.getDate() + 1);
 
-    const nutritionGoal = await storage.getNutritionGoalByUserId(userId);
+    const [totals, nutritionGoal] = await Promise.all([
+      storage.getRollupTotals(userId, localDayKey(day), localDayKey(nextDay)),
+      storage.getNutritionGoalByUserId(userId)
+    ]);
 
     const summary = {
-      totalCalories: todaysEntries.reduce((sum: number, entry: FoodEntryDocument) => sum + (entry.calories || 0), 0),
-      protein: todaysEntries.reduce((sum: number, entry: FoodEntryDocument) => sum + (entry.protein || 0), 0),
-      carbs: todaysEntries.reduce((sum: number, entry: FoodEntryDocument) => sum + (entry.carbs || 0), 0),
-      fat: todaysEntries.reduce((sum: number, entry: FoodEntryDocument) => sum + (entry.fat || 0), 0),
-      remainingCalories: (nutritionGoal?.calorieGoal || 0) - todaysEntries.reduce((sum: number, entry: FoodEntryDocument) => sum + (entry.calories || 0), 0)
+      totalCalories: totals.calories,
+      protein: totals.protein,
+      carbs: totals.carbs,
+      fat: totals.fat,
+      remainingCalories: (nutritionGoal?.calorieGoal || 0) - totals.calories
     };
 
     res.json(summary);
@@ -55,28 +56,20 @@ router.get('/weekly', ensureAuthenticated, async (req, res) => {
     startOfWeek.setDate(today.getDate() - 6); // Last 7 days
     startOfWeek.setHours(0, 0, 0, 0);
 
-    const entries = await storage.getFoodEntriesByUserId(userId);
-    const weeklyEntries = entries.filter((entry: FoodEntryDocument) => {
-      const entryDate = new Date(entry.entryDate);
-      return entryDate >= startOfWeek;
-    });
+    const endOfToday = new Date(today);
+    endOfToday.setHours(0, 0, 0, 0);
+    endOfToday.setDate(endOfToday.getDate() + 1);
 
-    // Group entries by date
-    const dailyCalories = new Array(7).fill(0);
-    weeklyEntries.forEach((entry: FoodEntryDocument) => {
-      const entryDate = new Date(entry.entryDate);
-      const dayIndex = 6 - Math.floor((today.getTime() - entryDate.getTime()) / (24 * 60 * 60 * 1000));
-      if (dayIndex >= 0 && dayIndex < 7) {
-        dailyCalories[dayIndex] += entry.calories || 0;
-      }
-    });
+    // One rollup document per day that has entries; the rest are filled with 0
+    const dailyTotals = await storage.getDailyRollups(userId, localDayKey(startOfWeek), localDayKey(endOfToday));
+    const caloriesByDay = new Map(dailyTotals.map(day => [day.day, day.calories]));
 
-    const weeklyData = dailyCalories.map((calories, index) => {
+    const weeklyData = Array.from({ length: 7 }, (_, index) => {
       const date = new Date(today);
       date.setDate(today.getDate() - (6 - index));
       return {
         date: date.toISOString(),
-        calories
+        calories: caloriesByDay.get(localDayKey(date)) ?? 0
       };
     });
 
@@ -87,7 +80,7 @@ router.get('/weekly', ensureAuthenticated, async (req, res) => {
   }
 });
 
-// Get recent food entries
+// Get recent food entries (sorted and limited in the database through the {userId, entryDate} index)
 router.get('/recent', ensureAuthenticated, async (req, res) => {
   try {
     const userId = req.user?.id;
@@ -95,16 +88,7 @@ router.get('/recent', ensureAuthenticated, async (req, res) => {
       return res.status(401).json({ error: 'Not authenticated' });
     }
 
-    const entries = await storage.getFoodEntriesByUserId(userId);
-    const recentEntries = entries
-      .sort((a: FoodEntryDocument, b: FoodEntryDocument) => new Date(b.entryDate).getTime() - new Date(a.entryDate).getTime())
-      .slice(0, 5)
-      .map((entry: FoodEntryDocument) => ({
-        id: entry.id,
-        name: entry.name,
-        calories: entry.calories,
-        entryDate: entry.entryDate
-      }));
+    const recentEntries = await storage.listRecentFoodEntries(userId, 5);
 
     res.json(recentEntries);
   } catch (error) {
@@ -113,8 +97,8 @@ router.get('/recent', ensureAuthenticated, async (req, res) => {
   }
 });
 
-// Add new food entry
-const foodEntrySchema = z.object({
+// Shape of one food entry in a bulk import or a data import
+export const foodEntrySchema = z.object({
   name: z.string(),
   servingSize: z.string(),
   mealType: z.string(),
@@ -125,30 +109,132 @@ const foodEntrySchema = z.object({
   fiber: z.number().optional(),
   sugar: z.number().optional(),
   description: z.string().optional(),
-  imageUrl: z.string().optional()
+  imageUrl: z.string().optional(),
+  entryDate: z.coerce.date().optional()
 });
 
-router.post('/', ensureAuthenticated, async (req, res) => {
+// Bulk import: a JSON array of entries, or one entry per line with
+// Content-Type: application/x-ndjson (use that for bodies over the 100 KB
+// JSON parser limit). Each item is validated with foodEntrySchema and the
+// valid ones are inserted together; the response has one result per item, in
+// input order. With ?analyze=true, items missing macros are run through
+// the cached food analysis first, each distinct food once, a few at a time.
+const BULK_MAX_ENTRIES = 5000;
+const BULK_ANALYZE_CONCURRENCY = 4;
+
+type BulkItemResult =
+  | { index: number; status: 'created'; id: number; analysisError?: string }
+  | { index: number; status: 'invalid'; errors: unknown }
+  | { index: number; status: 'failed'; error: string };
+
+type FoodEntryData = z.infer<typeof foodEntrySchema>;
+
+function bulkItems(body: unknown): Array<{ value?: unknown; error?: string }> | null {
+  if (Array.isArray(body)) {
+    return body.map(value => ({ value }));
+  }
+  if (typeof body !== 'string') {
+    return null;
+  }
+  return body.split('\n').filter(line => line.trim()).map(line => {
+    try {
+      return { value: JSON.parse(line) };
+    } catch {
+      return { error: 'Line is not valid JSON' };
+    }
+  });
+}
+
+function missingMacros(entry: FoodEntryData): boolean {
+  return !entry.calories || !entry.protein || !entry.carbs || !entry.fat;
+}
+
+// Fill in missing macros in place; returns the error per entry that could not be analyzed
+async function analyzeMissingMacros(entries: FoodEntryData[]): Promise<Map<FoodEntryData, string>> {
+  const groups = new Map<string, FoodEntryData[]>();
+  for (const entry of entries.filter(missingMacros)) {
+    const key = JSON.stringify([entry.name.toLowerCase(), entry.description ?? '', entry.servingSize]);
+    groups.set(key, [...(groups.get(key) ?? []), entry]);
+  }
+
+  const failures = new Map<FoodEntryData, string>();
+  const pending = Array.from(groups.values());
+  const worker = async () => {
+    for (let group = pending.shift(); group; group = pending.shift()) {
+      const [first] = group;
+      try {
+        const analysis = await analyzeFoodEntryCached(first.name, first.description || '', first.servingSize);
+        for (const entry of group) {
+          entry.calories = entry.calories || analysis.calories;
+          entry.protein = entry.protein || analysis.protein;
+          entry.carbs = entry.carbs || analysis.carbs;
+          entry.fat = entry.fat || analysis.fat;
+        }
+      } catch (error) {
+        group.forEach(entry => failures.set(entry, error instanceof Error ? error.message : 'Analysis failed'));
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: BULK_ANALYZE_CONCURRENCY }, worker));
+  return failures;
+}
+
+router.post('/bulk', ensureAuthenticated, express.text({ type: 'application/x-ndjson', limit: '10mb' }), async (req, res) => {
   try {
     const userId = req.user?.id;
     if (!userId) {
       return res.status(401).json({ error: 'Not authenticated' });
     }
 
-    const validatedData = foodEntrySchema.parse(req.body);
-    const entry = await storage.createFoodEntry({
-      ...validatedData,
-      userId: userId,
-      entryDate: new Date()
+    const items = bulkItems(req.body);
+    if (!items) {
+      return res.status(400).json({ error: 'Expected a JSON array or an application/x-ndjson body' });
+    }
+    if (items.length > BULK_MAX_ENTRIES) {
+      return res.status(413).json({ error: `At most ${BULK_MAX_ENTRIES} entries per request` });
+    }
+
+    const results: BulkItemResult[] = new Array(items.length);
+    const valid: Array<{ index: number; data: FoodEntryData }> = [];
+    items.forEach((item, index) => {
+      if (item.error) {
+        results[index] = { index, status: 'invalid', errors: [{ message: item.error }] };
+        return;
+      }
+      const parsed = foodEntrySchema.safeParse(item.value);
+      if (parsed.success) {
+        valid.push({ index, data: parsed.data });
+      } else {
+        results[index] = { index, status: 'invalid', errors: parsed.error.errors };
+      }
+    });
+
+    const analysisErrors = req.query.analyze === 'true'
+      ? await analyzeMissingMacros(valid.map(item => item.data))
+      : new Map<FoodEntryData, string>();
+
+    const outcomes = await storage.createFoodEntries(valid.map(({ data }) => ({
+      ...data,
+      userId,
+      entryDate: data.entryDate ?? new Date()
+    })));
+    outcomes.forEach((outcome, i) => {
+      const { index, data } = valid[i];
+      const analysisError = analysisErrors.get(data);
+      results[index] = outcome.ok
+        ? { index, status: 'created', id: outcome.id, ...(analysisError && { analysisError }) }
+        : { index, status: 'failed', error: outcome.error };
     });
 
-    res.status(201).json(entry);
+    const created = results.filter(result => result.status === 'created').length;
+    res.status(created === items.length ? 201 : 207).json({
+      created,
+      failed: items.length - created,
+      results
+    });
   } catch (error) {
-    if (error instanceof z.ZodError) {
-      return res.status(400).json({ error: 'Invalid food entry data', details: error.errors });
-    }
-    console.error('Error adding food entry:', error);
-    res.status(500).json({ error: 'Failed to add food entry' });
+    console.error('Error importing food entries:', error);
+    res.status(500).json({ error: 'Failed to import food entries' });
   }
 });
 
@@ -0,0 +1,41 @@
+import { Router } from 'express';
+import { ensureAuthenticated } from '../middleware';
+import { z } from 'zod';
+import { searchFoods } from '../nutrition-index';
+
+const router = Router();
+
+const searchQuerySchema = z.object({
+  q: z.string().trim().min(1).max(100),
+  limit: z.coerce.number().int().min(1).max(50).default(10)
+});
+
+// Search the local nutrition index: ?q= (the last word may be partial), ?limit=
+// Values are per the returned servingSize
+router.get('/search', ensureAuthenticated, (req, res) => {
+  try {
+    const { q, limit } = searchQuerySchema.parse(req.query);
+    const foods = searchFoods(q, limit).map(({ food, matched, score }) => ({
+      name: food.name,
+      matched,
+      servingSize: food.servingSize,
+      grams: food.grams,
+      calories: food.calories,
+      protein: food.protein,
+      carbs: food.carbs,
+      fat: food.fat,
+      fiber: food.fiber ?? 0,
+      sugar: food.sugar ?? 0,
+      score: Math.round(score * 100) / 100
+    }));
+    res.json({ foods });
+  } catch (error) {
+    if (error instanceof z.ZodError) {
+      return res.status(400).json({ error: 'Invalid search query', details: error.errors });
+    }
+    console.error('Error searching foods:', error);
+    res.status(500).json({ error: 'Failed to search foods' });
+  }
+});
+
+export default router;
@@ -32,7 +32,7 @@ router.get('/', ensureAuthenticated, async (req, res) => {
 });
 
 // Update nutrition goals
-const nutritionGoalsSchema = z.object({
+export const nutritionGoalsSchema = z.object({
   calorieGoal: z.number().min(0),
   proteinGoal: z.number().min(0),
   carbGoal: z.number().min(0),
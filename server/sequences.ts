@@ -0,0 +1,105 @@
+import mongoose from 'mongoose';
+
+// Numeric ids for the User, FoodEntry, ChatMessage and NutritionGoal collections.
+//
+// Each sequence is one document in the `counters` collection, advanced with an
+// atomic $inc, so concurrent writers (or several server processes) can never
+// be handed the same id. With ID_BLOCK_SIZE > 1 a process claims ids in blocks
+// and serves them from memory, trading gaps after a restart for one round trip
+// per block instead of per insert. reserve() claims a contiguous range for bulk
+// inserts regardless of the block size.
+
+export type SequenceName = 'users' | 'foodentries' | 'chatmessages' | 'nutritiongoals';
+
+interface CounterDocument {
+  _id: string;
+  seq: number;
+}
+
+const counterSchema = new mongoose.Schema<CounterDocument>({
+  _id: { type: String, required: true },
+  seq: { type: Number, required: true, default: 0 },
+}, { versionKey: false });
+
+const Counter = mongoose.model<CounterDocument>('Counter', counterSchema);
+
+interface IdBlock {
+  next: number;
+  end: number;  // last id in the block, inclusive
+}
+
+class SequenceAllocator {
+  private models = new Map<SequenceName, mongoose.Model<any>>();
+  private seeded = new Map<SequenceName, Promise<void>>();
+  private blocks = new Map<SequenceName, IdBlock>();
+  private refills = new Map<SequenceName, Promise<void>>();
+
+  constructor(private blockSize: number = Math.max(1, Number(process.env.ID_BLOCK_SIZE) || 1)) {}
+
+  // The collection whose existing ids the sequence has to start above
+  register(name: SequenceName, model: mongoose.Model<any>): void {
+    this.models.set(name, model);
+  }
+
+  // Collections that predate the counters (or used Date.now() ids) already hold
+  // ids; move the counter past the highest one, once per process. $max keeps
+  // this safe when several processes start at the same time.
+  private ensureSeeded(name: SequenceName): Promise<void> {
+    let seeded = this.seeded.get(name);
+    if (!seeded) {
+      seeded = (async () => {
+        const model = this.models.get(name);
+        const last = model ? await model.findOne({}, { id: 1 }).sort({ id: -1 }).lean<{ id?: number }>() : null;
+        await Counter.updateOne({ _id: name }, { $max: { seq: last?.id ?? 0 } }, { upsert: true });
+      })();
+      seeded.catch(() => this.seeded.delete(name));
+      this.seeded.set(name, seeded);
+    }
+    return seeded;
+  }
+
+  // Atomically advance the counter by `count`; returns the first id claimed
+  private async claim(name: SequenceName, count: number): Promise<number> {
+    await this.ensureSeeded(name);
+    const counter = await Counter.findOneAndUpdate(
+      { _id: name },
+      { $inc: { seq: count } },
+      { new: true, upsert: true }
+    ).lean<CounterDocument>();
+    return counter!.seq - count + 1;
+  }
+
+  async next(name: SequenceName): Promise<number> {
+    if (this.blockSize === 1) {
+      return this.claim(name, 1);
+    }
+
+    const block = this.blocks.get(name);
+    if (block && block.next <= block.end) {
+      return block.next++;
+    }
+
+    // One refill per sequence at a time; concurrent callers share it
+    let refill = this.refills.get(name);
+    if (!refill) {
+      refill = this.claim(name, this.blockSize)
+        .then(start => {
+          this.blocks.set(name, { next: start, end: start + this.blockSize - 1 });
+        })
+        .finally(() => this.refills.delete(name));
+      this.refills.set(name, refill);
+    }
+    await refill;
+    return this.next(name);
+  }
+
+  // Claim `count` consecutive ids in one round trip; returns the first
+  async reserve(name: SequenceName, count: number): Promise<number> {
+    if (count < 1) {
+      throw new Error('Cannot reserve fewer than one id');
+    }
+    return this.claim(name, count);
+  }
+}
+
+export const sequences = new SequenceAllocator();
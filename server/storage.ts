@@ -1,5 +1,8 @@
 import mongoose from 'mongoose';
 import bcrypt from 'bcrypt';
+import { sequences, type SequenceName } from './sequences';
+import { LruCache } from './cache';
+import { registerMetrics } from './metrics';
 
 // Document interfaces
 export interface UserDocument extends mongoose.Document {
@@ -56,6 +59,42 @@ export interface NutritionGoalDocument extends mongoose.Document {
   updatedAt: Date;
 }
 
+// One document per user and calendar day, kept in step with the food entries
+// of that day by createFoodEntry/updateFoodEntry/deleteFoodEntry
+export interface DailyRollupDocument extends mongoose.Document {
+  userId: number;
+  day: string;  // YYYY-MM-DD in the server's time zone (see localDayKey)
+  calories: number;
+  protein: number;
+  carbs: number;
+  fat: number;
+  fiber: number;
+  sugar: number;
+  entries: number;
+}
+
+// Rolling summary of the turns of a conversation that no longer fit the
+// prompt window (see chat-history.ts); `through` is the newest folded turn
+export interface ChatSummaryDocument extends mongoose.Document {
+  conversationId: string;
+  summary: string;
+  throughTimestamp: Date;
+  throughId: number;
+  foldedTurns: number;
+  updatedAt: Date;
+}
+
+// analyzeFoodEntry results by content hash (see analysis-cache.ts); a TTL
+// index on createdAt expires them after ANALYSIS_CACHE_TTL_DAYS
+export interface FoodAnalysisDocument extends mongoose.Document {
+  key: string;
+  foodName: string;
+  analysis: Record<string, unknown>;
+  createdAt: Date;
+}
+
+const ANALYSIS_CACHE_TTL_SECONDS = (Number(process.env.ANALYSIS_CACHE_TTL_DAYS) || 30) * 24 * 60 * 60;
+
 // Input types for creating/updating documents
 export type UserInput = Omit<UserDocument, keyof mongoose.Document | 'id'> & {
   id?: number;  // Make id optional
@@ -64,7 +103,7 @@ export type FoodEntryInput = Omit<FoodEntryDocument, keyof mongoose.Document | '
   id?: number;  // Make id optional
 };
 export type ChatMessageInput = {
-  id: number;
+  id?: number;  // Assigned from the chatmessages sequence when omitted
   userId: number;
   message: string;
   response?: string;
@@ -73,7 +112,172 @@ export type ChatMessageInput = {
   createdAt: Date;
   updatedAt: Date;
 };
-export type NutritionGoalInput = Omit<NutritionGoalDocument, keyof mongoose.Document | 'createdAt' | 'updatedAt'>;
+export type ChatSummaryInput = Pick<ChatSummaryDocument, 'summary' | 'throughTimestamp' | 'throughId' | 'foldedTurns'>;
+export type NutritionGoalInput = Omit<NutritionGoalDocument, keyof mongoose.Document | 'createdAt' | 'updatedAt' | 'id'> & {
+  id?: number;  // Make id optional
+};
+
+// Read models: plain objects with only the fields a use case needs. List and
+// summary endpoints use these instead of hydrated documents, and never carry
+// aiAnalysis or imageUrl (which can hold a base64 photo).
+export interface FoodEntryListItem {
+  id: number;
+  userId: number;
+  name: string;
+  description?: string;
+  servingSize: string;
+  mealType: string;
+  calories?: number;
+  protein?: number;
+  carbs?: number;
+  fat?: number;
+  fiber?: number;
+  sugar?: number;
+  entryDate: Date;
+  createdAt: Date;
+}
+
+export type RecentFoodEntry = Pick<FoodEntryListItem, 'id' | 'name' | 'calories' | 'entryDate'>;
+
+export interface FoodEntryListOptions {
+  from?: Date;        // entryDate >= from
+  to?: Date;          // entryDate < to
+  limit?: number;
+  newestFirst?: boolean;
+}
+
+// Outcome of createFoodEntries for each input, in input order
+export type BulkInsertOutcome =
+  | { ok: true; id: number }
+  | { ok: false; error: string };
+
+const BULK_INSERT_CHUNK = 500;
+
+// Plain objects (lean), fetched from the server one batch at a time
+export type ExportCursor = AsyncIterable<object> & { close(): Promise<void> };
+
+const EXPORT_EXCLUDED_FIELDS = { _id: 0, __v: 0 };
+const EXPORT_BATCH_SIZE = 1000;
+
+// One stored chat message is one turn: the user's message and the reply to it
+export type ChatTurn = Pick<ChatMessageDocument, 'id' | 'message' | 'response' | 'timestamp'>;
+
+const CHAT_TURN_FIELDS = { _id: 0, id: 1, message: 1, response: 1, timestamp: 1 };
+
+// Position after the last entry of a page, in the (entryDate desc, id desc) order
+export interface FoodEntryCursor {
+  entryDate: Date;
+  id: number;
+}
+
+export interface FoodEntryPageOptions {
+  from?: Date;
+  to?: Date;
+  mealType?: string;
+  namePrefix?: string;  // case-insensitive
+  after?: FoodEntryCursor;
+  limit?: number;       // every matching entry when omitted
+}
+
+export interface FoodEntryPage {
+  entries: FoodEntryListItem[];
+  nextCursor: string | null;  // null on the last page
+}
+
+const FOOD_ENTRY_LIST_FIELDS = {
+  _id: 0, id: 1, userId: 1, name: 1, description: 1, servingSize: 1, mealType: 1,
+  calories: 1, protein: 1, carbs: 1, fat: 1, fiber: 1, sugar: 1, entryDate: 1, createdAt: 1,
+};
+const RECENT_FOOD_ENTRY_FIELDS = { _id: 0, id: 1, name: 1, calories: 1, entryDate: 1 };
+
+// Sums computed in the database for a window of a user's entries
+export interface NutritionTotals {
+  calories: number;
+  protein: number;
+  carbs: number;
+  fat: number;
+  fiber: number;
+  sugar: number;
+  entries: number;
+}
+
+export interface DailyNutritionTotals extends NutritionTotals {
+  day: string;  // YYYY-MM-DD in the server's time zone
+}
+
+const EMPTY_TOTALS: NutritionTotals = { calories: 0, protein: 0, carbs: 0, fat: 0, fiber: 0, sugar: 0, entries: 0 };
+
+const TOTALS_GROUP = {
+  calories: { $sum: '$calories' },
+  protein: { $sum: '$protein' },
+  carbs: { $sum: '$carbs' },
+  fat: { $sum: '$fat' },
+  fiber: { $sum: '$fiber' },
+  sugar: { $sum: '$sugar' },
+  entries: { $sum: 1 },
+};
+
+// Day boundaries follow the server's local time, like the setHours(0, 0, 0, 0) windows in the routes
+export const SERVER_TIME_ZONE = Intl.DateTimeFormat().resolvedOptions().timeZone;
+
+export function localDayKey(date: Date): string {
+  const month = String(date.getMonth() + 1).padStart(2, '0');
+  const day = String(date.getDate()).padStart(2, '0');
+  return `${date.getFullYear()}-${month}-${day}`;
+}
+
+const ROLLUP_FIELDS = { _id: 0, day: 1, calories: 1, protein: 1, carbs: 1, fat: 1, fiber: 1, sugar: 1, entries: 1 };
+
+type RollupSource = Pick<FoodEntryDocument, 'userId' | 'entryDate' | 'calories' | 'protein' | 'carbs' | 'fat' | 'fiber' | 'sugar'>;
+
+// Net change to apply to each (userId, day) rollup; sign is 1 for an entry
+// coming into a day and -1 for one leaving it
+function rollupChanges(changes: Array<[RollupSource, 1 | -1]>) {
+  const byDay = new Map<string, { userId: number; day: string; inc: NutritionTotals }>();
+  for (const [entry, sign] of changes) {
+    const day = localDayKey(new Date(entry.entryDate));
+    const key = `${entry.userId}:${day}`;
+    const change = byDay.get(key) ?? { userId: entry.userId, day, inc: { ...EMPTY_TOTALS } };
+    change.inc.calories += sign * (entry.calories || 0);
+    change.inc.protein += sign * (entry.protein || 0);
+    change.inc.carbs += sign * (entry.carbs || 0);
+    change.inc.fat += sign * (entry.fat || 0);
+    change.inc.fiber += sign * (entry.fiber || 0);
+    change.inc.sugar += sign * (entry.sugar || 0);
+    change.inc.entries += sign;
+    byDay.set(key, change);
+  }
+  return Array.from(byDay.values());
+}
+
+// Cursors are opaque to clients: base64url JSON of the last entry's sort key
+export function encodeFoodEntryCursor(cursor: FoodEntryCursor): string {
+  return Buffer.from(JSON.stringify([cursor.entryDate.getTime(), cursor.id])).toString('base64url');
+}
+
+export function decodeFoodEntryCursor(value: string): FoodEntryCursor | null {
+  try {
+    const [time, id] = JSON.parse(Buffer.from(value, 'base64url').toString('utf8'));
+    if (!Number.isFinite(time) || !Number.isInteger(id)) {
+      return null;
+    }
+    return { entryDate: new Date(time), id };
+  } catch {
+    return null;
+  }
+}
+
+function escapeRegExp(text: string): string {
+  return text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+}
+
+function entryDateFilter(userId: number, from?: Date, to?: Date): mongoose.FilterQuery<FoodEntryDocument> {
+  const filter: mongoose.FilterQuery<FoodEntryDocument> = { userId };
+  if (from || to) {
+    filter.entryDate = { ...(from && { $gte: from }), ...(to && { $lt: to }) };
+  }
+  return filter;
+}
 
 // Schemas
 const userSchema = new mongoose.Schema<UserDocument>({
@@ -88,7 +292,7 @@ const userSchema = new mongoose.Schema<UserDocument>({
     sparse: true  // This allows multiple null values
   },
   profilePicture: { type: String },
-}, { timestamps: true });
+}, { timestamps: true, autoIndex: false });
 
 const foodEntrySchema = new mongoose.Schema<FoodEntryDocument>({
   id: { type: Number, required: true, unique: true },
@@ -106,7 +310,7 @@ const foodEntrySchema = new mongoose.Schema<FoodEntryDocument>({
   imageUrl: { type: String },
   entryDate: { type: Date, default: Date.now },
   aiAnalysis: { type: String },
-}, { timestamps: true });
+}, { timestamps: true, autoIndex: false });
 
 const chatMessageSchema = new mongoose.Schema<ChatMessageDocument>({
   id: { type: Number, required: true, unique: true },
@@ -117,7 +321,7 @@ const chatMessageSchema = new mongoose.Schema<ChatMessageDocument>({
   conversationId: { type: String, required: true },
   createdAt: { type: Date, default: Date.now },
   updatedAt: { type: Date, default: Date.now }
-});
+}, { autoIndex: false });
 
 const nutritionGoalSchema = new mongoose.Schema<NutritionGoalDocument>({
   id: { type: Number, required: true, unique: true },
@@ -126,13 +330,94 @@ const nutritionGoalSchema = new mongoose.Schema<NutritionGoalDocument>({
   proteinGoal: { type: Number, required: true },
   carbGoal: { type: Number, required: true },
   fatGoal: { type: Number, required: true },
-}, { timestamps: true });
+}, { timestamps: true, autoIndex: false });
+
+const chatSummarySchema = new mongoose.Schema<ChatSummaryDocument>({
+  conversationId: { type: String, required: true },
+  summary: { type: String, required: true },
+  throughTimestamp: { type: Date, required: true },
+  throughId: { type: Number, required: true },
+  foldedTurns: { type: Number, default: 0 },
+  updatedAt: { type: Date, default: Date.now },
+}, { versionKey: false, autoIndex: false });
+
+const foodAnalysisSchema = new mongoose.Schema<FoodAnalysisDocument>({
+  key: { type: String, required: true },
+  foodName: { type: String, required: true },
+  analysis: { type: mongoose.Schema.Types.Mixed, required: true },
+  createdAt: { type: Date, default: Date.now },
+}, { versionKey: false, autoIndex: false });
+
+const dailyRollupSchema = new mongoose.Schema<DailyRollupDocument>({
+  userId: { type: Number, required: true },
+  day: { type: String, required: true },
+  calories: { type: Number, default: 0 },
+  protein: { type: Number, default: 0 },
+  carbs: { type: Number, default: 0 },
+  fat: { type: Number, default: 0 },
+  fiber: { type: Number, default: 0 },
+  sugar: { type: Number, default: 0 },
+  entries: { type: Number, default: 0 },
+}, { versionKey: false, autoIndex: false });
+
+// Compound indexes for the hot query shapes. autoIndex is off on every schema:
+// migrateIndexes() in migrations.ts builds these at startup and reports progress.
+foodEntrySchema.index({ userId: 1, entryDate: -1, id: -1 });
+chatMessageSchema.index({ conversationId: 1, timestamp: 1 });
+chatMessageSchema.index({ userId: 1, conversationId: 1 });
+nutritionGoalSchema.index({ userId: 1 });
+dailyRollupSchema.index({ userId: 1, day: 1 }, { unique: true });
+chatSummarySchema.index({ conversationId: 1 }, { unique: true });
+foodAnalysisSchema.index({ key: 1 }, { unique: true });
+foodAnalysisSchema.index({ createdAt: 1 }, { expireAfterSeconds: ANALYSIS_CACHE_TTL_SECONDS });
 
 // Models
 const User = mongoose.model<UserDocument>('User', userSchema);
 const FoodEntry = mongoose.model<FoodEntryDocument>('FoodEntry', foodEntrySchema);
 const ChatMessage = mongoose.model<ChatMessageDocument>('ChatMessage', chatMessageSchema);
 const NutritionGoal = mongoose.model<NutritionGoalDocument>('NutritionGoal', nutritionGoalSchema);
+const DailyRollup = mongoose.model<DailyRollupDocument>('DailyRollup', dailyRollupSchema);
+const ChatSummary = mongoose.model<ChatSummaryDocument>('ChatSummary', chatSummarySchema);
+const FoodAnalysis = mongoose.model<FoodAnalysisDocument>('FoodAnalysis', foodAnalysisSchema);
+
+export const models = { User, FoodEntry, ChatMessage, NutritionGoal, DailyRollup, ChatSummary, FoodAnalysis };
+
+// Standalone servers reject transactions; remember that after the first
+// refusal and run the same work without a session from then on
+let transactionsSupported = true;
+
+function isTransactionUnsupported(error: unknown): boolean {
+  const message = error instanceof Error ? error.message : String(error);
+  return (error as { code?: number })?.code === 20 || /Transaction numbers are only allowed/i.test(message);
+}
+
+async function withTransaction<T>(work: (session: mongoose.ClientSession | null) => Promise<T>): Promise<T> {
+  if (!transactionsSupported) {
+    return work(null);
+  }
+  const session = await mongoose.startSession();
+  try {
+    let result!: T;
+    await session.withTransaction(async () => {
+      result = await work(session);
+    });
+    return result;
+  } catch (error) {
+    if (!isTransactionUnsupported(error)) {
+      throw error;
+    }
+    console.warn('MongoDB does not support transactions here; daily rollups are updated without one');
+    transactionsSupported = false;
+    return work(null);
+  } finally {
+    await session.endSession();
+  }
+}
+
+sequences.register('users', User);
+sequences.register('foodentries', FoodEntry);
+sequences.register('chatmessages', ChatMessage);
+sequences.register('nutritiongoals', NutritionGoal);
 
 // Storage interface
 interface IStorage {
@@ -144,6 +429,7 @@ interface IStorage {
   updateUser(id: number, userData: Partial<UserInput>): Promise<UserDocument | null>;
   deleteUser(id: number): Promise<boolean>;
   getUser(id: number): Promise<UserDocument | null>;
+  getSessionUser(id: number): Promise<UserDocument | null>;
 
   // Food entry operations
   createFoodEntry(foodData: FoodEntryInput): Promise<FoodEntryDocument>;
@@ -151,13 +437,28 @@ interface IStorage {
   getFoodEntriesByUserId(userId: number): Promise<FoodEntryDocument[]>;
   getDailyFoodEntries(userId: number, date: Date): Promise<FoodEntryDocument[]>;
   getRecentFoodEntries(userId: number, limit: number): Promise<FoodEntryDocument[]>;
+  createFoodEntries(entries: FoodEntryInput[]): Promise<BulkInsertOutcome[]>;
   updateFoodEntry(id: number, foodData: Partial<FoodEntryInput>): Promise<FoodEntryDocument | null>;
   deleteFoodEntry(id: number): Promise<boolean>;
 
+  // Food entry read models (lean, projected)
+  listFoodEntries(userId: number, options?: FoodEntryListOptions): Promise<FoodEntryListItem[]>;
+  listRecentFoodEntries(userId: number, limit: number): Promise<RecentFoodEntry[]>;
+  pageFoodEntries(userId: number, options: FoodEntryPageOptions): Promise<FoodEntryPage>;
+
+  // Daily rollups (days are YYYY-MM-DD, `toDay` exclusive)
+  getDailyRollups(userId: number, fromDay: string, toDay: string): Promise<DailyNutritionTotals[]>;
+  getRollupTotals(userId: number, fromDay: string, toDay: string): Promise<NutritionTotals>;
+  rebuildDailyRollups(userId?: number): Promise<number>;
+
   // Chat message operations
   createChatMessage(messageData: ChatMessageInput): Promise<ChatMessageDocument>;
+  createChatMessages(messages: ChatMessageInput[]): Promise<BulkInsertOutcome[]>;
   getChatMessagesByUserId(userId: number): Promise<ChatMessageDocument[]>;
   getChatMessagesByConversationId(conversationId: string): Promise<ChatMessageDocument[]>;
+  getRecentChatTurns(conversationId: string, limit: number): Promise<ChatTurn[]>;
+  getChatSummary(conversationId: string): Promise<ChatSummaryDocument | null>;
+  saveChatSummary(conversationId: string, summary: ChatSummaryInput, previousThroughId: number | null): Promise<boolean>;
   deleteChatMessage(id: number): Promise<boolean>;
 
   // Nutrition goal operations
@@ -171,6 +472,15 @@ interface IStorage {
 
   // Additional operations
   getUserConversations(userId: number): Promise<string[]>;
+
+  // Food analysis cache (second tier; see analysis-cache.ts)
+  getCachedFoodAnalysis(key: string): Promise<object | null>;
+  saveCachedFoodAnalysis(key: string, foodName: string, analysis: object): Promise<void>;
+
+  // Export cursors: lean documents one batch at a time, for streaming a user's data out
+  cursorFoodEntries(userId: number): ExportCursor;
+  cursorChatMessages(userId: number): ExportCursor;
+  cursorNutritionGoals(userId: number): ExportCursor;
 }
 
 // Storage implementation
@@ -179,12 +489,25 @@ class Storage implements IStorage {
   private foodEntryModel = FoodEntry;
   private chatMessageModel = ChatMessage;
   private nutritionGoalModel = NutritionGoal;
+  private dailyRollupModel = DailyRollup;
+  private chatSummaryModel = ChatSummary;
+  private foodAnalysisModel = FoodAnalysis;
+
+  // Users looked up by passport on every authenticated request. Records are
+  // stored lean and hydrated per request, so handlers never share a document.
+  // The TTL bounds staleness from writes made by other server processes.
+  private userCache = new LruCache<number, object>(
+    Number(process.env.USER_CACHE_SIZE ?? 10_000),
+    Number(process.env.USER_CACHE_TTL_MS ?? 60_000)
+  );
+
+  constructor() {
+    registerMetrics('userCache', () => this.userCache.stats());
+  }
 
   // User operations
   async createUser(userData: UserInput): Promise<UserDocument> {
-    // Get the highest existing ID
-    const lastUser = await this.userModel.findOne().sort({ id: -1 });
-    const newId = lastUser ? lastUser.id + 1 : 1;
+    const newId = await sequences.next('users');
 
     // Password is already hashed in auth.ts, so we don't hash it again here
     // Ensure firebaseId is set to avoid null values
@@ -214,11 +537,14 @@ class Storage implements IStorage {
     if (userData.password) {
       userData.password = await bcrypt.hash(userData.password, 10);
     }
-    return await this.userModel.findOneAndUpdate({ id }, userData, { new: true });
+    const user = await this.userModel.findOneAndUpdate({ id }, userData, { new: true });
+    this.userCache.delete(id);
+    return user;
   }
 
   async deleteUser(id: number): Promise<boolean> {
     const result = await this.userModel.findOneAndDelete({ id });
+    this.userCache.delete(id);
     return result !== null;
   }
 
@@ -226,18 +552,95 @@ class Storage implements IStorage {
     return await this.userModel.findOne({ id });
   }
 
+  // getUser through the user cache, for passport's deserializeUser
+  async getSessionUser(id: number): Promise<UserDocument | null> {
+    let record = this.userCache.get(id);
+    if (!record) {
+      const found = await this.userModel.findOne({ id }).lean<object>();
+      if (!found) {
+        return null;
+      }
+      record = found;
+      this.userCache.set(id, record);
+    }
+    return this.userModel.hydrate(record);
+  }
+
   // Food entry operations
   async createFoodEntry(foodData: FoodEntryInput): Promise<FoodEntryDocument> {
-    // Get the highest existing ID
-    const lastEntry = await this.foodEntryModel.findOne().sort({ id: -1 });
-    const newId = lastEntry ? lastEntry.id + 1 : 1;
-
-    const foodEntry = new this.foodEntryModel({
-      ...foodData,
-      id: newId,
-      entryDate: foodData.entryDate || new Date()  // Ensure entryDate is set
+    const newId = await sequences.next('foodentries');
+
+    return await withTransaction(async session => {
+      const foodEntry = new this.foodEntryModel({
+        ...foodData,
+        id: newId,
+        entryDate: foodData.entryDate || new Date()  // Ensure entryDate is set
+      });
+      const saved = await foodEntry.save({ session });
+      await this.applyRollupChanges([[saved, 1]], session);
+      return saved;
     });
-    return await foodEntry.save();
+  }
+
+  // Bulk insert: one id reservation for the whole batch, then unordered
+  // insertMany in chunks so one bad document doesn't stop the rest. Rollups are
+  // credited per chunk for the documents that landed; if the process dies in
+  // between, `npm run db:rollups` brings them back in line.
+  async createFoodEntries(entries: FoodEntryInput[]): Promise<BulkInsertOutcome[]> {
+    return await this.insertWithIds(this.foodEntryModel, 'foodentries', entries.map(entry => ({
+      ...entry,
+      entryDate: entry.entryDate || new Date()
+    })), inserted => this.applyRollupChanges(inserted.map(entry => [entry, 1] as [RollupSource, 1]), null));
+  }
+
+  private async insertWithIds<T extends object>(
+    model: mongoose.Model<any>,
+    sequence: SequenceName,
+    docs: T[],
+    afterChunk?: (inserted: Array<T & { id: number }>) => Promise<void>
+  ): Promise<BulkInsertOutcome[]> {
+    if (docs.length === 0) {
+      return [];
+    }
+    const firstId = await sequences.reserve(sequence, docs.length);
+    const outcomes: BulkInsertOutcome[] = new Array(docs.length);
+
+    for (let start = 0; start < docs.length; start += BULK_INSERT_CHUNK) {
+      const chunk = docs.slice(start, start + BULK_INSERT_CHUNK).map((doc, offset) => ({
+        ...doc,
+        id: firstId + start + offset
+      }));
+
+      const errors = new Map<number, string>();  // id -> message
+      try {
+        await model.insertMany(chunk, { ordered: false });
+      } catch (error: any) {
+        if (!Array.isArray(error?.writeErrors)) {
+          throw error;
+        }
+        for (const writeError of error.writeErrors) {
+          const failed = chunk[writeError.index];
+          if (failed) {
+            errors.set(failed.id, writeError.errmsg ?? writeError.err?.errmsg ?? 'Write failed');
+          }
+        }
+      }
+
+      // insertMany can also drop documents that fail schema validation without
+      // reporting them; read back which ids exist rather than trusting the call
+      const stored = await model
+        .find({ id: { $in: chunk.map(doc => doc.id) } }, { _id: 0, id: 1 })
+        .lean<Array<{ id: number }>>();
+      const storedIds = new Set(stored.map(doc => doc.id));
+
+      chunk.forEach((doc, offset) => {
+        outcomes[start + offset] = storedIds.has(doc.id)
+          ? { ok: true, id: doc.id }
+          : { ok: false, error: errors.get(doc.id) ?? 'Failed schema validation' };
+      });
+      await afterChunk?.(chunk.filter(doc => storedIds.has(doc.id)));
+    }
+    return outcomes;
   }
 
   async getFoodEntryById(id: number): Promise<FoodEntryDocument | null> {
@@ -271,20 +674,150 @@ class Storage implements IStorage {
   }
   
   async updateFoodEntry(id: number, foodData: Partial<FoodEntryInput>): Promise<FoodEntryDocument | null> {
-    return await this.foodEntryModel.findOneAndUpdate({ id }, foodData, { new: true });
+    return await withTransaction(async session => {
+      const before = await this.foodEntryModel.findOne({ id }).session(session);
+      if (!before) {
+        return null;
+      }
+      const after = await this.foodEntryModel.findOneAndUpdate({ id }, foodData, { new: true, session: session ?? undefined });
+      if (after) {
+        await this.applyRollupChanges([[before, -1], [after, 1]], session);
+      }
+      return after;
+    });
   }
 
   async deleteFoodEntry(id: number): Promise<boolean> {
-    const result = await this.foodEntryModel.findOneAndDelete({ id });
-    return result !== null;
+    return await withTransaction(async session => {
+      const result = await this.foodEntryModel.findOneAndDelete({ id }, { session: session ?? undefined });
+      if (result) {
+        await this.applyRollupChanges([[result, -1]], session);
+      }
+      return result !== null;
+    });
+  }
+
+  private async applyRollupChanges(changes: Array<[RollupSource, 1 | -1]>, session: mongoose.ClientSession | null): Promise<void> {
+    const options = { session: session ?? undefined };
+    for (const { userId, day, inc } of rollupChanges(changes)) {
+      if (Object.values(inc).every(value => value === 0)) {
+        continue;  // e.g. an update that changed neither the day nor the macros
+      }
+      await this.dailyRollupModel.updateOne({ userId, day }, { $inc: inc }, { ...options, upsert: true });
+      if (inc.entries < 0) {
+        await this.dailyRollupModel.deleteOne({ userId, day, entries: { $lte: 0 } }, options);
+      }
+    }
+  }
+
+  // Food entry read models
+  async listFoodEntries(userId: number, options: FoodEntryListOptions = {}): Promise<FoodEntryListItem[]> {
+    let query = this.foodEntryModel.find(entryDateFilter(userId, options.from, options.to), FOOD_ENTRY_LIST_FIELDS);
+    if (options.newestFirst) {
+      query = query.sort({ entryDate: -1, id: -1 });
+    }
+    if (options.limit) {
+      query = query.limit(options.limit);
+    }
+    return await query.lean<FoodEntryListItem[]>();
+  }
+
+  async listRecentFoodEntries(userId: number, limit: number): Promise<RecentFoodEntry[]> {
+    return await this.foodEntryModel
+      .find({ userId }, RECENT_FOOD_ENTRY_FIELDS)
+      .sort({ entryDate: -1, id: -1 })
+      .limit(limit)
+      .lean<RecentFoodEntry[]>();
+  }
+
+  // Keyset pagination, newest first. The {userId, entryDate, id} index bounds
+  // the scan to the date window and the cursor position; mealType and the name
+  // prefix are checked on the entries inside that range.
+  async pageFoodEntries(userId: number, options: FoodEntryPageOptions): Promise<FoodEntryPage> {
+    const filter = entryDateFilter(userId, options.from, options.to);
+    if (options.mealType) {
+      filter.mealType = options.mealType;
+    }
+    if (options.namePrefix) {
+      filter.name = { $regex: `^${escapeRegExp(options.namePrefix)}`, $options: 'i' };
+    }
+    if (options.after) {
+      const { entryDate, id } = options.after;
+      filter.$or = [{ entryDate: { $lt: entryDate } }, { entryDate, id: { $lt: id } }];
+    }
+
+    let query = this.foodEntryModel.find(filter, FOOD_ENTRY_LIST_FIELDS).sort({ entryDate: -1, id: -1 });
+    if (!options.limit) {
+      return { entries: await query.lean<FoodEntryListItem[]>(), nextCursor: null };
+    }
+
+    // One extra row tells us whether another page exists
+    const rows = await query.limit(options.limit + 1).lean<FoodEntryListItem[]>();
+    const entries = rows.slice(0, options.limit);
+    const last = entries[entries.length - 1];
+    return {
+      entries,
+      nextCursor: rows.length > options.limit ? encodeFoodEntryCursor({ entryDate: new Date(last.entryDate), id: last.id }) : null,
+    };
+  }
+
+  // Daily rollups: one document per day, so a range costs O(days) however many entries it holds
+  async getDailyRollups(userId: number, fromDay: string, toDay: string): Promise<DailyNutritionTotals[]> {
+    return await this.dailyRollupModel
+      .find({ userId, day: { $gte: fromDay, $lt: toDay } }, ROLLUP_FIELDS)
+      .sort({ day: 1 })
+      .lean<DailyNutritionTotals[]>();
+  }
+
+  async getRollupTotals(userId: number, fromDay: string, toDay: string): Promise<NutritionTotals> {
+    const days = await this.getDailyRollups(userId, fromDay, toDay);
+    return days.reduce((totals, day) => ({
+      calories: totals.calories + day.calories,
+      protein: totals.protein + day.protein,
+      carbs: totals.carbs + day.carbs,
+      fat: totals.fat + day.fat,
+      fiber: totals.fiber + day.fiber,
+      sugar: totals.sugar + day.sugar,
+      entries: totals.entries + day.entries,
+    }), { ...EMPTY_TOTALS });
+  }
+
+  // Regenerate the rollups (of one user, or everyone) from the raw entries.
+  // Writes that land while this runs can be lost, so run it when the app is
+  // quiet. Returns the number of rollup documents written.
+  async rebuildDailyRollups(userId?: number): Promise<number> {
+    const scope = userId === undefined ? {} : { userId };
+    await this.dailyRollupModel.deleteMany(scope);
+    await this.foodEntryModel.aggregate([
+      { $match: scope },
+      {
+        $group: {
+          _id: {
+            userId: '$userId',
+            day: { $dateToString: { format: '%Y-%m-%d', date: '$entryDate', timezone: SERVER_TIME_ZONE } },
+          },
+          ...TOTALS_GROUP,
+        },
+      },
+      { $project: { _id: 0, userId: '$_id.userId', day: '$_id.day', calories: 1, protein: 1, carbs: 1, fat: 1, fiber: 1, sugar: 1, entries: 1 } },
+      { $merge: { into: this.dailyRollupModel.collection.collectionName, on: ['userId', 'day'], whenMatched: 'replace', whenNotMatched: 'insert' } },
+    ]);
+    return await this.dailyRollupModel.countDocuments(scope);
   }
 
   // Chat message operations
   async createChatMessage(messageData: ChatMessageInput): Promise<ChatMessageDocument> {
-    const chatMessage = new this.chatMessageModel(messageData);
+    const chatMessage = new this.chatMessageModel({
+      ...messageData,
+      id: messageData.id ?? await sequences.next('chatmessages')
+    });
     return await chatMessage.save();
   }
 
+  async createChatMessages(messages: ChatMessageInput[]): Promise<BulkInsertOutcome[]> {
+    return await this.insertWithIds(this.chatMessageModel, 'chatmessages', messages);
+  }
+
   async getChatMessagesByUserId(userId: number): Promise<ChatMessageDocument[]> {
     return await this.chatMessageModel.find({ userId });
   }
@@ -293,6 +826,42 @@ class Storage implements IStorage {
     return await this.chatMessageModel.find({ conversationId }).sort({ timestamp: 1 });
   }
 
+  // Newest first, read backwards along the {conversationId, timestamp} index
+  async getRecentChatTurns(conversationId: string, limit: number): Promise<ChatTurn[]> {
+    return await this.chatMessageModel
+      .find({ conversationId }, CHAT_TURN_FIELDS)
+      .sort({ timestamp: -1 })
+      .limit(limit)
+      .lean<ChatTurn[]>();
+  }
+
+  async getChatSummary(conversationId: string): Promise<ChatSummaryDocument | null> {
+    return await this.chatSummaryModel.findOne({ conversationId }).lean<ChatSummaryDocument>();
+  }
+
+  // Compare-and-set on the last folded turn, so two requests folding the same
+  // conversation can't overwrite each other; returns false if another won
+  async saveChatSummary(
+    conversationId: string,
+    summary: ChatSummaryInput,
+    previousThroughId: number | null
+  ): Promise<boolean> {
+    const { foldedTurns, ...fields } = summary;  // foldedTurns: turns added by this fold
+    try {
+      const saved = await this.chatSummaryModel.findOneAndUpdate(
+        { conversationId, throughId: previousThroughId ?? { $exists: false } },
+        { $set: { ...fields, updatedAt: new Date() }, $inc: { foldedTurns } },
+        { upsert: previousThroughId === null, new: true }
+      );
+      return saved !== null;
+    } catch (error: any) {
+      if (error?.code === 11000) {
+        return false;  // a concurrent first summary for the same conversation
+      }
+      throw error;
+    }
+  }
+
   async deleteChatMessage(id: number): Promise<boolean> {
     const result = await this.chatMessageModel.findOneAndDelete({ id });
     return result !== null;
@@ -300,8 +869,7 @@ class Storage implements IStorage {
 
   // Nutrition goal operations
   async createNutritionGoal(goalData: NutritionGoalInput): Promise<NutritionGoalDocument> {
-    const lastGoal = await this.nutritionGoalModel.findOne().sort({ id: -1 });
-    const newId = lastGoal ? lastGoal.id + 1 : 1;
+    const newId = await sequences.next('nutritiongoals');
     const nutritionGoal = new this.nutritionGoalModel({ ...goalData, id: newId });
     return await nutritionGoal.save();
   }
@@ -340,8 +908,7 @@ class Storage implements IStorage {
       ) as NutritionGoalDocument;
     } else {
       // Create new goal
-      const nutritionGoal = new this.nutritionGoalModel(goalData);
-      return await nutritionGoal.save();
+      return await this.createNutritionGoal(goalData);
     }
   }
 
@@ -350,6 +917,47 @@ class Storage implements IStorage {
     const messages = await this.chatMessageModel.find({ userId }).distinct('conversationId');
     return messages;
   }
+
+  // Food analysis cache
+  async getCachedFoodAnalysis(key: string): Promise<object | null> {
+    const cached = await this.foodAnalysisModel
+      .findOne({ key }, { _id: 0, analysis: 1 })
+      .lean<{ analysis: object }>();
+    return cached?.analysis ?? null;
+  }
+
+  async saveCachedFoodAnalysis(key: string, foodName: string, analysis: object): Promise<void> {
+    // Replacing refreshes createdAt, so a re-analysed food gets a full TTL again
+    await this.foodAnalysisModel.replaceOne(
+      { key },
+      { key, foodName, analysis, createdAt: new Date() },
+      { upsert: true }
+    );
+  }
+
+  // Export cursors. Every field except _id and __v, so an import can recreate
+  // the documents; entries come oldest first through the {userId, entryDate} index.
+  cursorFoodEntries(userId: number): ExportCursor {
+    return this.foodEntryModel
+      .find({ userId }, EXPORT_EXCLUDED_FIELDS)
+      .sort({ entryDate: 1, id: 1 })
+      .lean()
+      .cursor({ batchSize: EXPORT_BATCH_SIZE });
+  }
+
+  cursorChatMessages(userId: number): ExportCursor {
+    return this.chatMessageModel
+      .find({ userId }, EXPORT_EXCLUDED_FIELDS)
+      .lean()
+      .cursor({ batchSize: EXPORT_BATCH_SIZE });
+  }
+
+  cursorNutritionGoals(userId: number): ExportCursor {
+    return this.nutritionGoalModel
+      .find({ userId }, EXPORT_EXCLUDED_FIELDS)
+      .lean()
+      .cursor({ batchSize: EXPORT_BATCH_SIZE });
+  }
 }
 
 // Export the storage instance
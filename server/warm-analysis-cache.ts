@@ -0,0 +1,60 @@
+import 'dotenv/config';
+import fs from 'fs';
+import path from 'path';
+import { fileURLToPath } from 'url';
+import mongoose from 'mongoose';
+import { connectDB } from './db';
+import { migrateIndexes } from './migrations';
+import { warmAnalysisCache, type WarmFood } from './analysis-cache';
+
+// Fill the food analysis cache ahead of traffic.
+//
+//   npm run cache:warm                          # the bundled server/data/common-foods.json
+//   npm run cache:warm -- foods.json            # [{ "name", "servingSize", "description"? }, ...]
+//   npm run cache:warm -- foods.txt             # one "name" or "name | serving size" per line
+//   npm run cache:warm -- foods.json --concurrency 8
+//
+// Foods already cached are skipped, so re-running only pays for new ones.
+
+const DEFAULT_LIST = path.join(path.dirname(fileURLToPath(import.meta.url)), 'data', 'common-foods.json');
+
+function loadFoods(file: string): WarmFood[] {
+  const text = fs.readFileSync(file, 'utf8');
+  if (file.endsWith('.json')) {
+    return JSON.parse(text);
+  }
+  return text
+    .split('\n')
+    .map(line => line.trim())
+    .filter(line => line && !line.startsWith('#'))
+    .map(line => {
+      const [name, servingSize] = line.split('|').map(part => part.trim());
+      return { name, servingSize: servingSize || '1 serving' };
+    });
+}
+
+(async () => {
+  let exitCode = 0;
+  try {
+    const args = process.argv.slice(2);
+    const concurrencyIndex = args.indexOf('--concurrency');
+    const concurrency = concurrencyIndex >= 0 ? Number(args.splice(concurrencyIndex, 2)[1]) : 4;
+    const foods = loadFoods(args[0] ?? DEFAULT_LIST);
+
+    await connectDB();
+    await migrateIndexes();
+    const started = Date.now();
+    const report = await warmAnalysisCache(foods, concurrency);
+    console.log(`Warmed ${foods.length} foods in ${Date.now() - started}ms: ${report.analyzed} analyzed, ${report.cached} already cached, ${report.local} in the nutrition index, ${report.failed.length} failed`);
+    if (report.failed.length > 0) {
+      console.error(`Failed: ${report.failed.join(', ')}`);
+      exitCode = 1;
+    }
+  } catch (error) {
+    console.error('Cache warm-up failed:', error);
+    exitCode = 1;
+  } finally {
+    await mongoose.disconnect();
+  }
+  process.exit(exitCode);
+})();
@@ -1,125 +1,97 @@
 import asyncio
 from playwright import async_api
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from harness import LOGIN_PASSWORD, LOGIN_USER, run_standalone, settle
+
+
+async def run_test(context):
+    # Open a new page in the browser context
+    page = await context.new_page()
     
+    # Navigate to your target URL and wait until the network request is committed
+    await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
+    
+    # Wait for the main page to reach DOMContentLoaded state (optional for stability)
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+        await page.wait_for_load_state("domcontentloaded", timeout=3000)
+    except async_api.Error:
+        pass
+    
+    # Iterate through all iframes and wait for them to load as well
+    for frame in page.frames:
         try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
+            await frame.wait_for_load_state("domcontentloaded", timeout=3000)
         except async_api.Error:
             pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click the Sign In button to navigate to the login page.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Enter username and password, then click the Sign In button.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('srajalpuri11')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test123')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Refresh the page to verify session management maintains login status.
-        await page.goto('http://localhost:5173/dashboard', timeout=10000)
-        
-
-        # Refresh the dashboard page to verify session management maintains login status.
-        await page.goto('http://localhost:5173/dashboard', timeout=10000)
-        
-
-        # Refresh the page to verify session management maintains login status.
-        await page.goto('http://localhost:5173/dashboard', timeout=10000)
-        
-
-        # Refresh the page to verify session management maintains login status.
-        await page.goto('http://localhost:5173/dashboard', timeout=10000)
-        
-
-        # Refresh the page to verify session management maintains login status.
-        await page.goto('http://localhost:5173/dashboard', timeout=10000)
-        
-
-        # Click the 'Accept All' button on the cookie consent popup to dismiss it and avoid interference with further interactions.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[3]/div/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Refresh the dashboard page to verify session management maintains login status.
-        await page.goto('http://localhost:5173/dashboard', timeout=10000)
-        
-
-        # Assertion: Verify user is authenticated and redirected to the dashboard by checking the presence of dashboard elements.
-        dashboard_header = frame.locator('text=NutriTrackAI - Smart Calorie Tracker')
-        assert await dashboard_header.is_visible(), 'Dashboard header not visible, login might have failed.'
-        # Verify navigation links are present
-        for link_text in ['NutriTrack', 'Tracker', 'AI Coach', 'Stats']:
-    nav_link = frame.locator(f'text={link_text}')
-    assert await nav_link.is_visible(), f'Navigation link {link_text} not visible on dashboard.'
-        # Verify user actions like 'Log Out' are available indicating user is logged in
-        logout_button = frame.locator('text=Log Out')
-        assert await logout_button.is_visible(), 'Log Out button not visible, user might not be logged in.'
-        # Assertion: Verify session management maintains login status across page refresh by checking dashboard elements again after refresh
-        await page.reload()
-        assert await dashboard_header.is_visible(), 'Dashboard header not visible after page refresh, session might not be maintained.'
-        assert await logout_button.is_visible(), 'Log Out button not visible after page refresh, session might not be maintained.'
-        await asyncio.sleep(5)
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+    # Interact with the page elements to simulate user flow
+    # Click the Sign In button to navigate to the login page.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/a/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Enter username and password, then click the Sign In button.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
+    await settle(page, elem); await elem.fill(LOGIN_USER)
+    
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
+    await settle(page, elem); await elem.fill(LOGIN_PASSWORD)
+    
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Refresh the page to verify session management maintains login status.
+    await page.goto('http://localhost:5173/dashboard', timeout=10000)
+    
+
+    # Refresh the dashboard page to verify session management maintains login status.
+    await page.goto('http://localhost:5173/dashboard', timeout=10000)
+    
+
+    # Refresh the page to verify session management maintains login status.
+    await page.goto('http://localhost:5173/dashboard', timeout=10000)
+    
+
+    # Refresh the page to verify session management maintains login status.
+    await page.goto('http://localhost:5173/dashboard', timeout=10000)
+    
+
+    # Refresh the page to verify session management maintains login status.
+    await page.goto('http://localhost:5173/dashboard', timeout=10000)
+    
+
+    # Click the 'Accept All' button on the cookie consent popup to dismiss it and avoid interference with further interactions.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div[3]/div/div[3]/button[2]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Refresh the dashboard page to verify session management maintains login status.
+    await page.goto('http://localhost:5173/dashboard', timeout=10000)
+    
+
+    # Assertion: Verify user is authenticated and redirected to the dashboard by checking the presence of dashboard elements.
+    dashboard_header = frame.locator('text=NutriTrackAI - Smart Calorie Tracker')
+    assert await dashboard_header.is_visible(), 'Dashboard header not visible, login might have failed.'
+    # Verify navigation links are present
+    for link_text in ['NutriTrack', 'Tracker', 'AI Coach', 'Stats']:
+        nav_link = frame.locator(f'text={link_text}')
+        assert await nav_link.is_visible(), f'Navigation link {link_text} not visible on dashboard.'
+    # Verify user actions like 'Log Out' are available indicating user is logged in
+    logout_button = frame.locator('text=Log Out')
+    assert await logout_button.is_visible(), 'Log Out button not visible, user might not be logged in.'
+    # Assertion: Verify session management maintains login status across page refresh by checking dashboard elements again after refresh
+    await page.reload()
+    assert await dashboard_header.is_visible(), 'Dashboard header not visible after page refresh, session might not be maintained.'
+    assert await logout_button.is_visible(), 'Log Out button not visible after page refresh, session might not be maintained.'
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
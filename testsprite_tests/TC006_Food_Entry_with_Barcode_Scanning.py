@@ -1,102 +1,50 @@
 import asyncio
 from playwright import async_api
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from harness import run_standalone, settle, signed_in
+
+
+@signed_in
+async def run_test(context):
+    # Open a new page in the browser context
+    page = await context.new_page()
+    
+    # Navigate to your target URL and wait until the network request is committed
+    await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
     
+    # Wait for the main page to reach DOMContentLoaded state (optional for stability)
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+        await page.wait_for_load_state("domcontentloaded", timeout=3000)
+    except async_api.Error:
+        pass
+    
+    # Iterate through all iframes and wait for them to load as well
+    for frame in page.frames:
         try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
+            await frame.wait_for_load_state("domcontentloaded", timeout=3000)
         except async_api.Error:
             pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Find and click login or navigation element to access login or food entry form.
-        await page.mouse.wheel(0, window.innerHeight)
-        
-
-        # Try to reload the page or open login page directly to proceed.
-        await page.goto('http://localhost:5173/login', timeout=10000)
-        
-
-        # Click the 'Sign In' button to open the login form and authenticate with provided credentials.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input username and password, then click the Sign In button to authenticate.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('srajalpuri11')
-        
+    
+    # Interact with the page elements to simulate user flow
+    # Start on the dashboard; the session comes from the cached storage state.
+    await page.goto('http://localhost:5173/dashboard', timeout=10000)
+    await settle(page)
+    
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test123')
-        
+    # Navigate to the Tracker page to access the food entry form and barcode scanning feature.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/header/div/div/a').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    # Click the 'Scan Barcode' button to open the barcode scanner interface.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[3]/div/div[2]/button[2]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
 
-        # Navigate to the Tracker page to access the food entry form and barcode scanning feature.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/header/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    assert False, 'Test plan execution failed: generic failure assertion.'
 
-        # Click the 'Scan Barcode' button to open the barcode scanner interface.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[3]/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
@@ -1,158 +1,114 @@
 import asyncio
 from playwright import async_api
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from harness import LOGIN_PASSWORD, LOGIN_USER, run_standalone, settle, signed_in
+
+
+@signed_in
+async def run_test(context):
+    # Open a new page in the browser context
+    page = await context.new_page()
+    
+    # Navigate to your target URL and wait until the network request is committed
+    await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
     
+    # Wait for the main page to reach DOMContentLoaded state (optional for stability)
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+        await page.wait_for_load_state("domcontentloaded", timeout=3000)
+    except async_api.Error:
+        pass
+    
+    # Iterate through all iframes and wait for them to load as well
+    for frame in page.frames:
         try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
+            await frame.wait_for_load_state("domcontentloaded", timeout=3000)
         except async_api.Error:
             pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click on 'Sign In' button to start login process.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input username and password, then click Sign In button.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('srajalpuri11')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test123')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Click on the profile or settings navigation element to go to profile management page.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/header/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input username and password, then click Sign In button to login.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('srajalpuri11')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test123')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Look for a navigation element or button that leads to profile management or settings page.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/header/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Try clicking the 'NutriTrack' logo or other top navigation links to find profile management or settings page.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/header/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Click on 'Sign In' button to login again and try to find profile management from dashboard or other navigation.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Try clicking on the 'Overview' button (index 10) to check if profile management or settings options are nested there.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Try clicking the 'Nutrition' tab (index 11) to check if profile management or settings options are nested there.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Try clicking the 'Goals' tab (index 12) to check if profile management or settings options are nested there.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Try clicking the 'AI Assistant' tab (index 13) to check if profile management or settings options are nested there.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div/button[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Try clicking the 'AI Coach' link (index 3) in the top navigation to check if profile management or settings options are nested there.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/header/div/div/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Click the 'Back' button (index 1) to try returning to the previous page and check for profile management or settings options there.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        assert False, 'Test plan execution failed: expected result unknown, forcing failure.'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+    
+    # Interact with the page elements to simulate user flow
+    # Start on the dashboard; the session comes from the cached storage state.
+    await page.goto('http://localhost:5173/dashboard', timeout=10000)
+    await settle(page)
+    
+
+    # Click on the profile or settings navigation element to go to profile management page.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/header/div[2]/button[2]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Input username and password, then click Sign In button to login.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
+    await settle(page, elem); await elem.fill(LOGIN_USER)
+    
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
+    await settle(page, elem); await elem.fill(LOGIN_PASSWORD)
+    
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Look for a navigation element or button that leads to profile management or settings page.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/header/div[2]/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Try clicking the 'NutriTrack' logo or other top navigation links to find profile management or settings page.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/header/div/a').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Click on 'Sign In' button to login again and try to find profile management from dashboard or other navigation.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/a/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Try clicking on the 'Overview' button (index 10) to check if profile management or settings options are nested there.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Try clicking the 'Nutrition' tab (index 11) to check if profile management or settings options are nested there.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div/button[2]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Try clicking the 'Goals' tab (index 12) to check if profile management or settings options are nested there.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div/button[3]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Try clicking the 'AI Assistant' tab (index 13) to check if profile management or settings options are nested there.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div/button[4]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Try clicking the 'AI Coach' link (index 3) in the top navigation to check if profile management or settings options are nested there.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/header/div/div/a[2]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Click the 'Back' button (index 1) to try returning to the previous page and check for profile management or settings options there.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div/div/div/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    assert False, 'Test plan execution failed: expected result unknown, forcing failure.'
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
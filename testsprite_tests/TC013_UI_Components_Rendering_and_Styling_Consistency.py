@@ -1,100 +1,72 @@
 import asyncio
 from playwright import async_api
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from harness import LOGIN_PASSWORD, LOGIN_USER, run_standalone, settle
+
+
+async def run_test(context):
+    # Open a new page in the browser context
+    page = await context.new_page()
     
+    # Navigate to your target URL and wait until the network request is committed
+    await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
+    
+    # Wait for the main page to reach DOMContentLoaded state (optional for stability)
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+        await page.wait_for_load_state("domcontentloaded", timeout=3000)
+    except async_api.Error:
+        pass
+    
+    # Iterate through all iframes and wait for them to load as well
+    for frame in page.frames:
         try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
+            await frame.wait_for_load_state("domcontentloaded", timeout=3000)
         except async_api.Error:
             pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Navigate to Tracker page to verify shared UI components and DaisyUI styling.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/header/div/nav/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Test interaction on the login form: input username and password, verify button states and styles, then test tab switching between Login and Register.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('srajalpuri11')
-        
+    
+    # Interact with the page elements to simulate user flow
+    # Navigate to Tracker page to verify shared UI components and DaisyUI styling.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/header/div/nav/a[2]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test123')
-        
+    # Test interaction on the login form: input username and password, verify button states and styles, then test tab switching between Login and Register.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
+    await settle(page, elem); await elem.fill(LOGIN_USER)
+    
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
+    await settle(page, elem); await elem.fill(LOGIN_PASSWORD)
+    
 
-        # Toggle theme to dark mode and verify UI components adapt styling accordingly.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[3]/div/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
 
-        # Navigate to the Home page to verify reusable UI components and test theme toggle functionality.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    # Toggle theme to dark mode and verify UI components adapt styling accordingly.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div[3]/div/div[3]/button[2]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
 
-        # Click the theme toggle button to switch theme and verify UI components adapt styling accordingly.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    # Navigate to the Home page to verify reusable UI components and test theme toggle functionality.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div/div/button[2]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
 
-        assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
+    # Click the theme toggle button to switch theme and verify UI components adapt styling accordingly.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
     
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+    assert False, 'Test plan execution failed: generic failure assertion.'
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
@@ -1,184 +1,156 @@
 import asyncio
 from playwright import async_api
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from harness import LOGIN_PASSWORD, LOGIN_USER, run_standalone, settle
+
+
+async def run_test(context):
+    # Open a new page in the browser context
+    page = await context.new_page()
+    
+    # Navigate to your target URL and wait until the network request is committed
+    await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
     
+    # Wait for the main page to reach DOMContentLoaded state (optional for stability)
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+        await page.wait_for_load_state("domcontentloaded", timeout=3000)
+    except async_api.Error:
+        pass
+    
+    # Iterate through all iframes and wait for them to load as well
+    for frame in page.frames:
         try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
+            await frame.wait_for_load_state("domcontentloaded", timeout=3000)
         except async_api.Error:
             pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Resize or emulate tablet viewport to verify UI responsiveness and functionality.
-        await page.goto('http://localhost:5173/', timeout=10000)
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Resize or emulate mobile viewport to verify UI responsiveness and functionality.
-        await page.goto('http://localhost:5173/', timeout=10000)
-        
-
-        # Emulate mobile viewport and verify UI responsiveness and functionality, including menu and UI components for mobile usability.
-        await page.goto('http://localhost:5173/', timeout=10000)
-        
-
-        # Emulate mobile viewport and verify UI responsiveness and functionality, including menu and UI components for mobile usability and accessibility.
-        await page.goto('http://localhost:5173/', timeout=10000)
-        
-
-        # Emulate or resize viewport to mobile size and verify UI responsiveness and functionality, including menu and UI components for mobile usability and accessibility.
-        await page.goto('http://localhost:5173/', timeout=10000)
-        
-
-        # Emulate or resize viewport to mobile size and verify UI responsiveness and functionality, including menu and UI components for mobile usability and accessibility.
-        await page.mouse.wheel(0, 500)
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Fill in username and password fields and test the authentication flow on mobile viewport.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('srajalpuri11')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test123')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Test interactive elements on the dashboard such as Quick Add buttons, navigation tabs, AI Assistant, and cookie consent buttons for proper functionality on mobile viewport.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Continue testing other Quick Add buttons (Lunch, Dinner, Snack) and then test AI Assistant and cookie consent buttons for functionality on mobile viewport.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Continue testing Quick Add buttons for Dinner and Snack, then test AI Assistant and cookie consent buttons for functionality on mobile viewport.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Test Quick Add Snack button, AI Assistant button, and cookie consent buttons for functionality on mobile viewport.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Test the AI Assistant button and cookie consent buttons (Reject and Accept All) for proper functionality on mobile viewport.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div/button[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Test the cookie consent buttons 'Reject' and 'Accept All' for proper functionality on mobile viewport.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[3]/div/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Test the chat input functionality by sending a query to the AI Assistant and verify the response on mobile viewport.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/div/div[2]/div[2]/form/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('What are some healthy protein sources?')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/div/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Assert desktop viewport UI elements are visible and correctly displayed
-        assert await page.locator('text=NutriTrackAI - Smart Calorie Tracker').is_visible()
-        assert await page.locator('text=1850 kcal').is_visible()
-        assert await page.locator('text=2200 kcal').is_visible()
-        assert await page.locator('text=85 g').is_visible()
-        assert await page.locator('text=120 g').is_visible()
-        assert await page.locator('text=1800 ml').is_visible()
-        assert await page.locator('text=2500 ml').is_visible()
-        assert await page.locator('text=8500 steps').is_visible()
-        assert await page.locator('text=3 in progress').is_visible()
-        assert await page.locator('text=NutriTrack').is_visible()
-        assert await page.locator('text=Tracker').is_visible()
-        assert await page.locator('text=AI Coach').is_visible()
-        assert await page.locator('text=Stats').is_visible()
-        assert await page.locator('text=Toggle theme').is_visible()
-        assert await page.locator('text=Log Out').is_visible()
-        # Assert tablet viewport UI adapts correctly
-        await page.set_viewport_size({'width': 768, 'height': 1024})
-        assert await page.locator('text=NutriTrackAI - Smart Calorie Tracker').is_visible()
-        assert await page.locator('text=AI Coach').is_visible()
-        assert await page.locator('text=Add more food entries to get personalized AI recommendations for your nutrition.').is_visible()
-        # Assert mobile viewport UI adapts correctly
-        await page.set_viewport_size({'width': 375, 'height': 667})
-        assert await page.locator('button:has-text("Toggle theme")').is_visible()
-        assert await page.locator('button:has-text("Log Out")').is_visible()
-        assert await page.locator('text=Hi there! I\'m your AI fitness coach. How can I help you with your nutrition and fitness goals today?').is_visible()
-        assert await page.locator('input[placeholder="Type your message..."]').is_visible()
-        assert await page.locator('button:has-text("AI")').is_enabled()
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+    
+    # Interact with the page elements to simulate user flow
+    # Resize or emulate tablet viewport to verify UI responsiveness and functionality.
+    await page.goto('http://localhost:5173/', timeout=10000)
+    
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Resize or emulate mobile viewport to verify UI responsiveness and functionality.
+    await page.goto('http://localhost:5173/', timeout=10000)
+    
+
+    # Emulate mobile viewport and verify UI responsiveness and functionality, including menu and UI components for mobile usability.
+    await page.goto('http://localhost:5173/', timeout=10000)
+    
+
+    # Emulate mobile viewport and verify UI responsiveness and functionality, including menu and UI components for mobile usability and accessibility.
+    await page.goto('http://localhost:5173/', timeout=10000)
+    
+
+    # Emulate or resize viewport to mobile size and verify UI responsiveness and functionality, including menu and UI components for mobile usability and accessibility.
+    await page.goto('http://localhost:5173/', timeout=10000)
+    
+
+    # Emulate or resize viewport to mobile size and verify UI responsiveness and functionality, including menu and UI components for mobile usability and accessibility.
+    await page.mouse.wheel(0, 500)
+    
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/a/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Fill in username and password fields and test the authentication flow on mobile viewport.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
+    await settle(page, elem); await elem.fill(LOGIN_USER)
+    
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
+    await settle(page, elem); await elem.fill(LOGIN_PASSWORD)
+    
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Test interactive elements on the dashboard such as Quick Add buttons, navigation tabs, AI Assistant, and cookie consent buttons for proper functionality on mobile viewport.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Continue testing other Quick Add buttons (Lunch, Dinner, Snack) and then test AI Assistant and cookie consent buttons for functionality on mobile viewport.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button[2]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Continue testing Quick Add buttons for Dinner and Snack, then test AI Assistant and cookie consent buttons for functionality on mobile viewport.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button[3]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Test Quick Add Snack button, AI Assistant button, and cookie consent buttons for functionality on mobile viewport.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button[4]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Test the AI Assistant button and cookie consent buttons (Reject and Accept All) for proper functionality on mobile viewport.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div/button[4]').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Test the cookie consent buttons 'Reject' and 'Accept All' for proper functionality on mobile viewport.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div[3]/div/div[3]/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Test the chat input functionality by sending a query to the AI Assistant and verify the response on mobile viewport.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/div/div[2]/div[2]/form/input').nth(0)
+    await settle(page, elem); await elem.fill('What are some healthy protein sources?')
+    
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/div/div[2]/div[2]/form/button').nth(0)
+    await settle(page, elem); await elem.click(timeout=5000)
+    
+
+    # Assert desktop viewport UI elements are visible and correctly displayed
+    assert await page.locator('text=NutriTrackAI - Smart Calorie Tracker').is_visible()
+    assert await page.locator('text=1850 kcal').is_visible()
+    assert await page.locator('text=2200 kcal').is_visible()
+    assert await page.locator('text=85 g').is_visible()
+    assert await page.locator('text=120 g').is_visible()
+    assert await page.locator('text=1800 ml').is_visible()
+    assert await page.locator('text=2500 ml').is_visible()
+    assert await page.locator('text=8500 steps').is_visible()
+    assert await page.locator('text=3 in progress').is_visible()
+    assert await page.locator('text=NutriTrack').is_visible()
+    assert await page.locator('text=Tracker').is_visible()
+    assert await page.locator('text=AI Coach').is_visible()
+    assert await page.locator('text=Stats').is_visible()
+    assert await page.locator('text=Toggle theme').is_visible()
+    assert await page.locator('text=Log Out').is_visible()
+    # Assert tablet viewport UI adapts correctly
+    await page.set_viewport_size({'width': 768, 'height': 1024})
+    assert await page.locator('text=NutriTrackAI - Smart Calorie Tracker').is_visible()
+    assert await page.locator('text=AI Coach').is_visible()
+    assert await page.locator('text=Add more food entries to get personalized AI recommendations for your nutrition.').is_visible()
+    # Assert mobile viewport UI adapts correctly
+    await page.set_viewport_size({'width': 375, 'height': 667})
+    assert await page.locator('button:has-text("Toggle theme")').is_visible()
+    assert await page.locator('button:has-text("Log Out")').is_visible()
+    assert await page.locator('text=Hi there! I\'m your AI fitness coach. How can I help you with your nutrition and fitness goals today?').is_visible()
+    assert await page.locator('input[placeholder="Type your message..."]').is_visible()
+    assert await page.locator('button:has-text("AI")').is_enabled()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
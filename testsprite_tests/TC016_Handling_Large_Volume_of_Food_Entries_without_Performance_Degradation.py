@@ -1,146 +1,80 @@
 import asyncio
+import os
+import time
 from playwright import async_api
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
+from harness import BASE_URL, run_standalone, settle
+from harness.api import api_client, ensure_account, session_cookies
+from harness.seed import SeedProfile, seed_food_entries
+
+# Dedicated account so the seeded volume never leaks into the shared test user
+VOLUME_USER = os.environ.get("TC016_USER", "tc016_volume")
+VOLUME_PASSWORD = os.environ.get("TC016_PASSWORD", "tc016-volume")
+VOLUME_ENTRIES = int(os.environ.get("TC016_ENTRIES", "1000"))
+
+# Render budgets against the seeded volume, in milliseconds
+DASHBOARD_BUDGET_MS = 5000
+TRACKER_BUDGET_MS = 5000
+# Typing to the filtered page on screen, including the Tracker's 300 ms input debounce
+FILTER_BUDGET_MS = 1000
+
+NEXT_PAINT = "() => new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)))"
+
+
+async def timed_visit(page, url):
+    started = time.perf_counter()
+    await page.goto(url, timeout=10000)
+    await settle(page)
+    await page.evaluate(NEXT_PAINT)
+    return (time.perf_counter() - started) * 1000
+
+
+async def run_test(context):
+    # Seed the volume account through the API (topping up to the target size) and reuse its session
+    async with api_client() as client:
+        await ensure_account(client, VOLUME_USER, VOLUME_PASSWORD)
+        report = await seed_food_entries(SeedProfile(count=VOLUME_ENTRIES, days=30), client=client, top_up=True)
+        assert report.failed == 0, f'Seeding failed for {report.failed} entries: {report.errors[:3]}'
+        await context.add_cookies(session_cookies(client, BASE_URL))
+
+    # Open a new page in the browser context
+    page = await context.new_page()
+
+    # Measure the dashboard render with the seeded history
+    dashboard_ms = await timed_visit(page, 'http://localhost:5173/dashboard')
+
+
+    # Dismiss the cookie consent popup if it is shown so it doesn't cover the tracker controls.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div/div[3]/div/div[3]/button[2]').nth(0)
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click on 'Sign In' button to start login process.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input username and password, then click Sign In button.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('srajalpuri11')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test123')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Dismiss cookie consent popup and start adding food entries via UI or API.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[3]/div/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Start adding a large volume of food entries using Quick Add buttons, beginning with Breakfast.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Continue adding food entries using Quick Add buttons to reach 1000+ entries efficiently.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Continue adding food entries using Quick Add buttons to reach 1000+ entries efficiently.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Continue adding food entries using Quick Add buttons to reach 1000+ entries efficiently.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Add a large volume of food entries efficiently. Since UI addition is slow, switch to API method or simulate bulk addition if possible. Then verify dashboard and charts load performance and filtering functionality.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Continue adding food entries using Quick Add buttons to reach 1000+ entries efficiently or switch to API for bulk addition to save time.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Continue adding food entries using Quick Add buttons to reach 1000+ entries efficiently or switch to API for bulk addition to save time.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Return to the NutriTrackAI dashboard and continue adding food entries manually or explore UI options for bulk import if available.
-        await page.goto('http://localhost:5173/dashboard', timeout=10000)
-        
-
-        # Continue adding food entries manually using Quick Add buttons to increase volume and monitor UI performance. After sufficient entries, test filtering and searching functionality.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Continue adding food entries manually using Quick Add buttons to increase volume and monitor UI performance. After sufficient entries, test filtering and searching functionality.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/main/div/div[2]/div[2]/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+        await elem.click(timeout=1000)
+    except async_api.Error:
+        pass
+
+
+    # Measure the tracker render, which loads the first page of today's entries
+    tracker_ms = await timed_visit(page, 'http://localhost:5173/tracker')
+
+
+    # Measure the name filter: the debounced ?name= prefix query and the re-render of its results
+    search = page.get_by_placeholder('Search foods...')
+    await settle(page, search)
+    started = time.perf_counter()
+    async with page.expect_response(
+        lambda response: '/api/food-entries?' in response.url and 'name=Banana' in response.url,
+        timeout=10000,
+    ):
+        await search.fill('Banana')
+    await settle(page, api='/api/food-entries')
+    await page.evaluate(NEXT_PAINT)
+    filter_ms = (time.perf_counter() - started) * 1000
+
+    print(f'TC016 with {VOLUME_ENTRIES} entries: dashboard {dashboard_ms:.0f} ms, tracker {tracker_ms:.0f} ms, filter {filter_ms:.0f} ms')
+    assert dashboard_ms <= DASHBOARD_BUDGET_MS, f'Dashboard took {dashboard_ms:.0f} ms with {VOLUME_ENTRIES} entries (budget {DASHBOARD_BUDGET_MS} ms)'
+    assert tracker_ms <= TRACKER_BUDGET_MS, f'Tracker took {tracker_ms:.0f} ms with {VOLUME_ENTRIES} entries (budget {TRACKER_BUDGET_MS} ms)'
+    assert filter_ms <= FILTER_BUDGET_MS, f'Filtering took {filter_ms:.0f} ms with {VOLUME_ENTRIES} entries (budget {FILTER_BUDGET_MS} ms)'
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
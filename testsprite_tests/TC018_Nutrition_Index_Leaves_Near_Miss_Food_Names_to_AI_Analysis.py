@@ -0,0 +1,64 @@
+import asyncio
+import os
+
+from harness import run_standalone
+from harness.api import api_client, ensure_account
+
+# Dedicated account so the probe entries never show up in the shared test user's tracker
+INDEX_USER = os.environ.get("TC018_USER", "tc018_index")
+INDEX_PASSWORD = os.environ.get("TC018_PASSWORD", "tc018-index")
+
+# Part of the aiAnalysis text written when the local nutrition index answers
+INDEX_MARKER = "from the local food database"
+
+# One edit away from an indexed name ("chia", "milk", "toast", "peach") with a
+# serving the index could convert, so only the exact-match rule keeps them out
+NEAR_MISSES = [
+    ("Chai", "1 oz"),
+    ("Silk", "1"),
+    ("Roast", "1"),
+    ("Beach", "1"),
+]
+
+# Exact names, and a plural of one, still resolve locally
+INDEXED = [
+    ("Chia seeds", "1 oz", 136),
+    ("Pears", "1", None),
+]
+
+
+async def log_entry(client, name, serving_size):
+    response = await client.post("/api/food-entries", json={
+        "name": name,
+        "servingSize": serving_size,
+        "mealType": "snack",
+    })
+    assert response.status_code == 201, f'Logging "{name}" failed with {response.status_code}: {response.text[:200]}'
+    return response.json()
+
+
+async def run_test(context):
+    async with api_client() as client:
+        await ensure_account(client, INDEX_USER, INDEX_PASSWORD)
+
+        for name, serving_size in NEAR_MISSES:
+            entry = await log_entry(client, name, serving_size)
+            assert INDEX_MARKER not in (entry.get("aiAnalysis") or ""), \
+                f'"{name}" was answered by the nutrition index instead of the food analysis: {entry.get("aiAnalysis")}'
+
+        for name, serving_size, calories in INDEXED:
+            entry = await log_entry(client, name, serving_size)
+            assert INDEX_MARKER in (entry.get("aiAnalysis") or ""), \
+                f'"{name}" should come from the nutrition index: {entry.get("aiAnalysis")}'
+            if calories is not None:
+                assert entry["calories"] == calories, f'"{name}" logged {entry["calories"]} kcal, expected {calories}'
+
+        # Near misses are still offered as typeahead suggestions
+        response = await client.get("/api/foods/search", params={"q": "chai"})
+        assert response.status_code == 200, f'Food search failed with {response.status_code}'
+        suggestions = [food["name"] for food in response.json()["foods"]]
+        assert "Chia seeds" in suggestions, f'Expected "Chia seeds" among the suggestions for "chai": {suggestions}'
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test))
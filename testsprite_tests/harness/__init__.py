@@ -0,0 +1,19 @@
+"""Shared Playwright harness for the TestSprite-generated TC scripts."""
+from .auth import signed_in
+from .config import API_URL, BASE_URL, LOGIN_EMAIL, LOGIN_PASSWORD, LOGIN_USER
+from .fixtures import unique_name
+from .pool import BrowserPool, run_standalone
+from .waits import settle
+
+__all__ = [
+    "API_URL",
+    "BASE_URL",
+    "LOGIN_EMAIL",
+    "LOGIN_PASSWORD",
+    "LOGIN_USER",
+    "BrowserPool",
+    "run_standalone",
+    "settle",
+    "signed_in",
+    "unique_name",
+]
@@ -0,0 +1,48 @@
+"""Pooled async HTTP client for talking to the Express API directly.
+
+Used for work that doesn't need a browser: seeding data and provisioning
+accounts. Requires ``httpx``.
+"""
+import httpx
+
+from .config import API_URL, LOGIN_PASSWORD, LOGIN_USER
+
+SESSION_COOKIE = "foodfitness.sid"
+
+
+def _user_record(body):
+    # The auth handlers spread a Mongoose document, so fields land under _doc
+    user = body["user"]
+    return user.get("_doc", user)
+
+
+def api_client(base_url=API_URL, max_connections=100, timeout=30.0):
+    """Return an AsyncClient that keeps up to ``max_connections`` sockets warm."""
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout)
+
+
+async def login(client, username=LOGIN_USER, password=LOGIN_PASSWORD):
+    """Sign ``client`` in through /api/login and return the user record."""
+    response = await client.post("/api/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return _user_record(response.json())
+
+
+async def ensure_account(client, username, password, email=None):
+    """Sign in as ``username``, registering the account first if it is missing."""
+    response = await client.post("/api/login", json={"username": username, "password": password})
+    if response.status_code == 401:
+        response = await client.post("/api/register", json={
+            "username": username,
+            "password": password,
+            "email": email or f"{username}@nutritrack.test",
+        })
+    response.raise_for_status()
+    return _user_record(response.json())
+
+
+def session_cookies(client, url):
+    """Export the client's session cookie in BrowserContext.add_cookies() form."""
+    value = client.cookies.get(SESSION_COOKIE)
+    return [{"name": SESSION_COOKIE, "value": value, "url": url}] if value else []
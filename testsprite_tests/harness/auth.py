@@ -0,0 +1,90 @@
+"""Cached signed-in storage state for tests that don't cover authentication.
+
+Most TC scripts used to click through the sign-in form before doing anything
+useful, paying for the UI round trip and the bcrypt check in loginHandler
+every time. Scripts decorated with ``@signed_in`` instead start with the
+``foodfitness.sid`` session cookie already in their context.
+
+The state is produced by one POST /api/login per run and kept in
+tmp/storage_state.<user>.json (one file per account, so sharded workers never
+share a session). It is reused until the cookie nears the 24h maxAge set in
+setupAuth, or until the server stops recognising the session.
+"""
+import asyncio
+import json
+import time
+
+from .config import BASE_URL, LOGIN_PASSWORD, LOGIN_USER, TMP_DIR
+
+STATE_FILE = TMP_DIR / f"storage_state.{LOGIN_USER}.json"
+
+SESSION_COOKIE = "foodfitness.sid"
+
+# Log in again this long before the cached cookie would expire
+EXPIRY_MARGIN_SECONDS = 300
+
+
+def signed_in(run_test):
+    """Mark a TC script's ``run_test`` as needing a signed-in context."""
+    run_test.signed_in = True
+    return run_test
+
+
+def needs_session(run_test):
+    return getattr(run_test, "signed_in", False)
+
+
+def _read_cached_state():
+    try:
+        with open(STATE_FILE, encoding="utf-8") as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    for cookie in state.get("cookies", []):
+        if cookie.get("name") == SESSION_COOKIE:
+            if cookie.get("expires", -1) > time.time() + EXPIRY_MARGIN_SECONDS:
+                return state
+            return None
+    return None
+
+
+async def _session_valid(playwright, state):
+    request = await playwright.request.new_context(base_url=BASE_URL, storage_state=state)
+    try:
+        response = await request.get("/api/user")
+        return response.ok
+    finally:
+        await request.dispose()
+
+
+async def _login(playwright):
+    request = await playwright.request.new_context(base_url=BASE_URL)
+    try:
+        response = await request.post("/api/login", data={"username": LOGIN_USER, "password": LOGIN_PASSWORD})
+        if not response.ok:
+            raise RuntimeError(f"Login as {LOGIN_USER} failed: {response.status} {await response.text()}")
+        TMP_DIR.mkdir(exist_ok=True)
+        return await request.storage_state(path=STATE_FILE)
+    finally:
+        await request.dispose()
+
+
+async def storage_state(playwright):
+    """Return a signed-in storage state, logging in only if the cache is stale."""
+    state = _read_cached_state()
+    if state is not None and await _session_valid(playwright, state):
+        return state
+    return await _login(playwright)
+
+
+class SessionCache:
+    """Resolves the storage state at most once per suite run."""
+
+    def __init__(self, playwright):
+        self._playwright = playwright
+        self._state = None
+
+    async def get(self):
+        if self._state is None:
+            self._state = asyncio.ensure_future(storage_state(self._playwright))
+        return await self._state
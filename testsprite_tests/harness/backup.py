@@ -0,0 +1,122 @@
+"""Export or import a user's data as NDJSON through /api/data.
+
+Usage (from testsprite_tests/):
+
+    python -m harness.backup export tmp/backup.ndjson.gz
+    python -m harness.backup import tmp/backup.ndjson.gz --user restored_user --password secret
+    python -m harness.backup export - --base-url http://localhost:3001 | head
+
+``export`` streams GET /api/data/export to the file as it arrives, and
+``import`` uploads the file to POST /api/data/import in chunks read from disk,
+so neither side holds the data in memory. Paths ending in .gz are compressed
+or decompressed on the fly, and ``-`` is stdout/stdin. An export is checked for
+the closing "end" line, which the server only writes once every row is out.
+Import signs in as ``--user``, registering the account if it is missing, and
+the imported rows get new ids under that account.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+
+from .api import api_client, ensure_account, login
+from .config import API_URL, LOGIN_PASSWORD, LOGIN_USER
+
+CHUNK_BYTES = 256 * 1024
+
+
+class IncompleteExport(Exception):
+    """The export stream ended before the server's closing "end" line."""
+
+
+def _open(path, mode):
+    if path == "-":
+        return (sys.stdout if "w" in mode else sys.stdin).buffer
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+async def export_data(client, path):
+    """Stream the signed-in user's export into ``path``; return the per-type counts."""
+    tail = b""
+    out = _open(path, "wb")
+    try:
+        async with client.stream("GET", "/api/data/export") as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                out.write(chunk)
+                tail = (tail + chunk)[-4096:]
+    finally:
+        if path == "-":
+            out.flush()
+        else:
+            out.close()
+
+    last = tail.rstrip(b"\n").rsplit(b"\n", 1)[-1]
+    try:
+        end = json.loads(last)
+    except ValueError:
+        end = None
+    if not isinstance(end, dict) or end.get("type") != "end":
+        raise IncompleteExport(f"{path} has no end line; the export was cut short")
+    return end["counts"]
+
+
+async def _read_chunks(path):
+    source = _open(path, "rb")
+    try:
+        while chunk := source.read(CHUNK_BYTES):
+            yield chunk
+    finally:
+        if path != "-":
+            source.close()
+
+
+async def import_data(client, path):
+    """Upload ``path`` to the signed-in user's account; return the server's summary."""
+    response = await client.post("/api/data/import", content=_read_chunks(path),
+                                 headers={"Content-Type": "application/x-ndjson"})
+    response.raise_for_status()
+    return response.json()
+
+
+async def run(args):
+    # No timeout: a large import only answers once every batch is written
+    async with api_client(args.base_url, max_connections=1, timeout=None) as client:
+        if args.command == "export":
+            await login(client, args.user, args.password)
+            return await export_data(client, args.path)
+        await ensure_account(client, args.user, args.password)
+        return await import_data(client, args.path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.backup", description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="NDJSON file (.gz to compress), or - for stdout/stdin")
+    parser.add_argument("--user", default=LOGIN_USER, help="account to export from or import into")
+    parser.add_argument("--password", default=LOGIN_PASSWORD)
+    parser.add_argument("--base-url", default=API_URL, help="API server (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        result = asyncio.run(run(args))
+    except IncompleteExport as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if args.command == "export":
+        counts = ", ".join(f"{count} {kind}" for kind, count in result.items())
+        print(f"Exported {counts} to {args.path}", file=sys.stderr)
+        return 0
+    print(json.dumps(result, indent=2), file=sys.stderr)
+    failed = result["foodEntries"]["failed"] + result["chatMessages"]["failed"] + result["invalid"]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
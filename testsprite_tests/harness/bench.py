@@ -0,0 +1,263 @@
+"""HTTP latency/throughput benchmark for the Express API.
+
+Usage (from testsprite_tests/):
+
+    python -m harness.bench                                 # every scenario, 10 workers, 10 s each
+    python -m harness.bench -c 50 -d 30 daily weekly recent
+    python -m harness.bench --compare tmp/bench/<earlier run>.json
+
+Each scenario runs ``--concurrency`` workers in a closed loop for
+``--duration`` seconds after a short warm-up, over one pooled, signed-in
+client. Results (p50/p95/p99 latency, requests/sec, error rate) are written
+as JSON to tmp/bench/, tagged with the git commit, so runs can be compared
+across commits to spot regressions in server/routes.ts and server/storage.ts.
+
+The chat, analyze-entry(-cached) and recommendations scenarios go through
+server/openai.ts; point the server at harness.openai_stub (OPENAI_BASE_URL)
+to measure them, and their fallbacks, without network access.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+from .api import api_client, login
+from .config import API_URL, LOGIN_PASSWORD, LOGIN_USER, TESTS_DIR, TMP_DIR
+
+RESULTS_DIR = TMP_DIR / "bench"
+
+# Fully specified macros keep POST /api/food-entries off the OpenAI path
+BENCH_ENTRY = {
+    "name": "Benchmark Oatmeal",
+    "servingSize": "1 bowl",
+    "mealType": "breakfast",
+    "calories": 300,
+    "protein": 10,
+    "carbs": 54,
+    "fat": 5,
+}
+
+# No macros, so the server fills them in with analyzeFoodEntry. The name is
+# not in the local nutrition index; analyze-entry gives it a fresh suffix per
+# request so every call misses the analysis cache, analyze-entry-cached
+# repeats it as is so every call after the first is a cache hit.
+ANALYZE_ENTRY = {
+    "name": "Benchmark Burrito",
+    "servingSize": "1 burrito",
+    "mealType": "lunch",
+}
+
+
+async def _login(client, user):
+    return await client.post("/api/login", json={"username": LOGIN_USER, "password": LOGIN_PASSWORD})
+
+
+async def _create_entry(client, user):
+    return await client.post("/api/food-entries", json=BENCH_ENTRY)
+
+
+async def _analyze_entry(client, user):
+    entry = {**ANALYZE_ENTRY, "name": f"{ANALYZE_ENTRY['name']} {uuid.uuid4().hex[:12]}"}
+    return await client.post("/api/food-entries", json=entry)
+
+
+async def _analyze_entry_cached(client, user):
+    return await client.post("/api/food-entries", json=ANALYZE_ENTRY)
+
+
+async def _daily(client, user):
+    return await client.get("/api/food-entries/daily")
+
+
+async def _weekly(client, user):
+    return await client.get("/api/food-entries/weekly")
+
+
+async def _recent(client, user):
+    return await client.get("/api/food-entries/recent")
+
+
+async def _dashboard(client, user):
+    return await client.get(f"/api/dashboard/{user['id']}")
+
+
+async def _recommendations(client, user):
+    return await client.get("/api/recommendations")
+
+
+async def _chat(client, user):
+    # A fresh conversation per request keeps the prompt size constant between runs
+    return await client.post("/api/chat", json={
+        "message": "What is a good post-workout snack?",
+        "conversationId": f"bench-{uuid.uuid4().hex}",
+    })
+
+
+SCENARIOS = {
+    "login": _login,
+    "create-entry": _create_entry,
+    "analyze-entry": _analyze_entry,
+    "analyze-entry-cached": _analyze_entry_cached,
+    "daily": _daily,
+    "weekly": _weekly,
+    "recent": _recent,
+    "dashboard": _dashboard,
+    "chat": _chat,
+    "recommendations": _recommendations,
+}
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    requests: int
+    errors: int
+    seconds: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    rps: float
+    error_rate: float
+    status_codes: dict = field(default_factory=dict)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(scenario, samples, seconds):
+    latencies = sorted(ms for ms, _ in samples)
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(1 for _, status in samples if not (isinstance(status, int) and 200 <= status < 400))
+    return ScenarioResult(
+        scenario=scenario,
+        requests=len(samples),
+        errors=errors,
+        seconds=seconds,
+        p50_ms=round(percentile(latencies, 50), 2),
+        p95_ms=round(percentile(latencies, 95), 2),
+        p99_ms=round(percentile(latencies, 99), 2),
+        max_ms=round(latencies[-1], 2) if latencies else 0.0,
+        rps=round(len(samples) / seconds, 2) if seconds else 0.0,
+        error_rate=round(errors / len(samples), 4) if samples else 0.0,
+        status_codes=statuses,
+    )
+
+
+async def _drive(request, client, user, deadline, samples):
+    """Closed-loop worker: issue requests back to back until ``deadline``."""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await request(client, user)
+            status = response.status_code
+        except Exception as exc:
+            status = type(exc).__name__
+        if samples is not None:
+            samples.append(((time.perf_counter() - started) * 1000, status))
+
+
+async def run_scenario(name, concurrency, duration, warmup, base_url=API_URL):
+    request = SCENARIOS[name]
+    async with api_client(base_url, max_connections=concurrency) as client:
+        user = await login(client)
+        if warmup > 0:
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*(_drive(request, client, user, deadline, None) for _ in range(concurrency)))
+        samples = []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(_drive(request, client, user, deadline, samples) for _ in range(concurrency)))
+        return summarize(name, samples, time.perf_counter() - started)
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=TESTS_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(args):
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--", "../server")),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "warmup": args.warmup,
+    }
+
+
+def print_results(results, baseline=None):
+    previous = {r["scenario"]: r for r in (baseline or {}).get("scenarios", [])}
+    print(f"{'scenario':<14}{'req':>8}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>9}")
+    for r in results:
+        line = f"{r.scenario:<14}{r.requests:>8}{r.rps:>10.1f}{r.p50_ms:>10.1f}{r.p95_ms:>10.1f}{r.p99_ms:>10.1f}{r.error_rate:>9.1%}"
+        before = previous.get(r.scenario)
+        if before and before["p95_ms"]:
+            line += f"   p95 {(r.p95_ms - before['p95_ms']) / before['p95_ms']:+.0%} vs {before['p95_ms']:.1f} ms"
+        print(line)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("-c", "--concurrency", type=int, default=10, help="workers per scenario (default: 10)")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="measured seconds per scenario (default: 10)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each scenario (default: 2)")
+    parser.add_argument("--base-url", default=API_URL, help="API server (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="result file (default: tmp/bench/<commit>-<time>.json)")
+    parser.add_argument("--compare", metavar="PATH", help="earlier result file to diff p95 latency against")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+async def run_benchmark(args):
+    results = []
+    for name in args.scenarios or list(SCENARIOS):
+        results.append(await run_scenario(name, args.concurrency, args.duration, args.warmup, args.base_url))
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    metadata = run_metadata(args)
+    results = asyncio.run(run_benchmark(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    print_results(results, baseline)
+
+    output = args.output
+    if not output:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = RESULTS_DIR / f"{(metadata['commit'] or 'nocommit')[:12]}-{stamp}.json"
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump({**metadata, "scenarios": [asdict(r) for r in results]}, fh, indent=2)
+    print(f"\nWrote {output}")
+    return 1 if any(r.error_rate for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Endpoints and credentials shared by the harness.
+
+Defaults come from tmp/config.json (the file TestSprite writes when a plan is
+committed) and can be overridden with environment variables.
+"""
+import json
+import os
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parent.parent
+TMP_DIR = TESTS_DIR / "tmp"
+
+
+def _testsprite_config():
+    try:
+        with open(TMP_DIR / "config.json", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+_config = _testsprite_config()
+
+# Frontend served by Vite; /api is proxied through to the Express server
+BASE_URL = os.environ.get("NUTRITRACK_BASE_URL", _config.get("localEndpoint", "http://localhost:5173")).rstrip("/")
+
+# Express server, used directly by API clients to skip the Vite proxy hop
+API_URL = os.environ.get("NUTRITRACK_API_URL", "http://localhost:3001").rstrip("/")
+
+LOGIN_USER = os.environ.get("NUTRITRACK_USER", _config.get("loginUser", "srajalpuri11"))
+LOGIN_PASSWORD = os.environ.get("NUTRITRACK_PASSWORD", _config.get("loginPassword", "test123"))
+LOGIN_EMAIL = os.environ.get("NUTRITRACK_EMAIL", _config.get("loginEmail", f"{LOGIN_USER}@example.com"))
@@ -0,0 +1,60 @@
+"""Throwaway accounts for tests that must not share state.
+
+Every TC script signs in as LOGIN_USER, so two processes running tests that
+add food entries or change goals would see each other's data. A sharded run
+provisions one account per worker through the API, with a known set of
+nutrition goals, and points the worker at it through NUTRITRACK_USER,
+NUTRITRACK_PASSWORD and NUTRITRACK_EMAIL.
+"""
+import asyncio
+import secrets
+import uuid
+from dataclasses import dataclass
+
+from .api import api_client, ensure_account
+from .config import API_URL
+
+# Goals every worker account starts with (PUT /api/nutrition-goals)
+GOAL_FIXTURE = {
+    "calorieGoal": 2000,
+    "proteinGoal": 150,
+    "carbGoal": 200,
+    "fatGoal": 65,
+}
+
+
+def unique_name(prefix):
+    """A username nobody has registered yet, e.g. for registration tests."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class WorkerAccount:
+    username: str
+    password: str
+    email: str
+
+    def env(self):
+        return {
+            "NUTRITRACK_USER": self.username,
+            "NUTRITRACK_PASSWORD": self.password,
+            "NUTRITRACK_EMAIL": self.email,
+        }
+
+
+async def provision_account(client, username):
+    """Register ``username`` with a random password and the goal fixture."""
+    account = WorkerAccount(username, secrets.token_urlsafe(12), f"{username}@example.com")
+    await ensure_account(client, account.username, account.password, account.email)
+    response = await client.put("/api/nutrition-goals", json=GOAL_FIXTURE)
+    response.raise_for_status()
+    return account
+
+
+async def provision_accounts(prefix, count, base_url=API_URL):
+    """Create ``count`` accounts named ``<prefix>_w<n>``, one signed-in client each."""
+    async def provision(index):
+        async with api_client(base_url, max_connections=2) as client:
+            return await provision_account(client, f"{prefix}_w{index}")
+
+    return list(await asyncio.gather(*(provision(i) for i in range(count))))
@@ -0,0 +1,371 @@
+"""Local OpenAI-compatible chat-completions stub.
+
+Usage (from testsprite_tests/):
+
+    python -m harness.openai_stub                                   # port 8787, fixed 300 ms
+    python -m harness.openai_stub --latency lognormal:900,0.6 --rate-429 0.1 --rate-5xx 0.02
+    python -m harness.openai_stub --latency uniform:200,2000 --completion-tokens 600 --seed 7
+
+Start the Express server with ``OPENAI_BASE_URL=http://localhost:8787/v1``
+and every call in server/openai.ts lands here instead of api.openai.com, so
+TC007/TC017 and harness.bench exercise the real AI code paths offline.
+
+Replies are canned but shaped like what each caller parses:
+``response_format: json_object`` requests get the food-analysis JSON that
+analyzeFoodEntry expects, or ``{"recommendations": [...]}`` when the prompt
+asks for recommendations; plain requests get a coaching reply with the
+"Action Items:" / "Follow-up Questions:" / "Category:" / "Confidence:"
+sections getFitnessResponse looks for.
+
+Requests with ``"stream": true`` get the same reply as chat.completion.chunk
+Server-Sent Events, one word per chunk, ending with ``data: [DONE]``; the
+drawn latency comes before the first chunk and ``--per-token-ms`` between
+them, so time to first token can be measured against the stub.
+
+Latency is drawn per request from a distribution, plus ``--per-token-ms``
+for each completion token. ``--rate-429`` and ``--rate-5xx`` fail that share
+of requests with OpenAI-style error bodies (429s carry Retry-After).
+Counters are served at GET /stub/stats and reset by POST /stub/reset.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8787
+
+
+@dataclass
+class LatencyModel:
+    """Per-request delay in milliseconds: ``fixed:MS``, ``uniform:LO,HI``,
+    ``normal:MEAN,STDEV`` or ``lognormal:MEDIAN,SIGMA``."""
+    kind: str = "fixed"
+    params: tuple = (300.0,)
+
+    def sample(self, rng):
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(*self.params))
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma)
+
+    @classmethod
+    def parse(cls, spec):
+        kind, _, values = spec.partition(":")
+        if not values:
+            kind, values = "fixed", kind
+        params = tuple(float(v) for v in values.split(","))
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if expected.get(kind) != len(params):
+            raise ValueError(f"bad latency spec {spec!r}")
+        return cls(kind, params)
+
+
+@dataclass
+class StubConfig:
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    per_token_ms: float = 0.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after: float = 1.0
+    completion_tokens: int | None = None  # pad text replies to about this many tokens
+    seed: int | None = None
+
+
+def estimate_tokens(text):
+    """Rough BPE-sized count: about four characters per token."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def _prompt_text(messages):
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(part.get("text", "") for part in content if part.get("type") == "text")
+    return "\n".join(parts)
+
+
+def _food_name(prompt):
+    for line in prompt.splitlines():
+        line = line.strip()
+        if line.startswith("Food Name:"):
+            return line.split(":", 1)[1].strip()
+    return "food"
+
+
+def food_analysis(prompt):
+    # Stable per food name, so repeated entries get the same macros
+    digest = hashlib.sha256(_food_name(prompt).lower().encode()).digest()
+    protein, carbs, fat = 5 + digest[0] % 30, 10 + digest[1] % 60, 2 + digest[2] % 25
+    return {
+        "calories": protein * 4 + carbs * 4 + fat * 9,
+        "protein": protein,
+        "carbs": carbs,
+        "fat": fat,
+        "analysis": f"{_food_name(prompt)} provides a balanced mix of macronutrients.",
+        "ingredients": [_food_name(prompt)],
+        "healthBenefits": ["Provides energy"],
+        "possibleAllergens": [],
+    }
+
+
+RECOMMENDATIONS = {"recommendations": [
+    {
+        "title": "Add Protein to Breakfast",
+        "description": "Your mornings are light on protein; front-loading it helps satiety.",
+        "actionItems": ["Add eggs or Greek yogurt", "Aim for 25g protein", "Prepare options the night before"],
+        "priority": "high",
+        "category": "nutrition",
+    },
+    {
+        "title": "Plan Evening Snacks",
+        "description": "Late snacks push you over your calorie goal on most days.",
+        "actionItems": ["Pre-portion snacks", "Choose fruit or nuts", "Stop eating two hours before bed"],
+        "priority": "medium",
+        "category": "meal-planning",
+    },
+]}
+
+COACH_REPLY = """Great question! Consistency matters more than perfection, so let's build on what you already do.
+
+Action Items:
+- Eat a protein-rich meal within two hours after training
+- Keep a simple food log for the next seven days
+- Schedule three 30-minute workouts this week
+
+Follow-up Questions:
+- What does a typical training week look like for you?
+- Are there foods you avoid or can't eat?
+
+Category: nutrition
+Confidence: 0.85"""
+
+_FILLER = " Keep tracking your progress and adjust as you learn what works for you."
+
+
+def reply_content(body, config):
+    prompt = _prompt_text(body.get("messages", []))
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        payload = RECOMMENDATIONS if "recommendations" in prompt.lower() else food_analysis(prompt)
+        return json.dumps(payload), prompt
+    content = COACH_REPLY
+    if config.completion_tokens:
+        while estimate_tokens(content) < config.completion_tokens:
+            content = content.replace("\n\nAction Items:", _FILLER + "\n\nAction Items:", 1)
+    return content, prompt
+
+
+class StubStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {"requests": 0, "ok": 0, "429": 0, "5xx": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def add(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.counts[key] += value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "NutritrackOpenAIStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, error_type, headers=None):
+        self._send(status, {"error": {"message": message, "type": error_type, "param": None, "code": None}}, headers)
+
+    def do_GET(self):
+        if self.path == "/stub/stats":
+            self._send(200, self.server.stats.snapshot())
+        else:
+            self._error(404, f"Unknown path {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if self.path == "/stub/reset":
+            self.server.stats.reset()
+            self._send(200, {"ok": True})
+            return
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self._error(404, f"Unknown path {self.path}", "invalid_request_error")
+            return
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            self._error(400, "Request body is not valid JSON", "invalid_request_error")
+            return
+        self._complete(body)
+
+    def _complete(self, body):
+        config, rng, stats = self.server.config, self.server.rng, self.server.stats
+        with self.server.rng_lock:
+            delay_ms = config.latency.sample(rng)
+            roll = rng.random()
+            server_error = rng.choice([500, 502, 503])
+        stats.add(requests=1)
+
+        if roll < config.rate_429:
+            time.sleep(delay_ms / 1000)
+            stats.add(**{"429": 1})
+            self._error(429, "Rate limit reached for requests", "rate_limit_error",
+                        {"Retry-After": f"{config.retry_after:g}"})
+            return
+        if roll < config.rate_429 + config.rate_5xx:
+            time.sleep(delay_ms / 1000)
+            stats.add(**{"5xx": 1})
+            self._error(server_error, "The server had an error while processing your request", "server_error")
+            return
+
+        content, prompt = reply_content(body, config)
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        if body.get("stream"):
+            time.sleep(delay_ms / 1000)
+            self._stream(body, content)
+            stats.add(ok=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+            return
+        time.sleep((delay_ms + completion_tokens * config.per_token_ms) / 1000)
+        stats.add(ok=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        self._send(200, {
+            "id": f"chatcmpl-stub-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _stream(self, body, content):
+        """Send ``content`` as chat.completion.chunk events over chunked transfer encoding."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_event(data):
+            frame = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(frame):x}\r\n".encode() + frame + b"\r\n")
+            self.wfile.flush()
+
+        chunk = {
+            "id": f"chatcmpl-stub-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+        }
+        per_token_ms = self.server.config.per_token_ms
+        try:
+            write_event(json.dumps({**chunk, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]}))
+            for i, piece in enumerate(re.findall(r"\s*\S+", content)):
+                if i and per_token_ms:
+                    time.sleep(estimate_tokens(piece) * per_token_ms / 1000)
+                write_event(json.dumps({**chunk, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}))
+            write_event(json.dumps({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+            write_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # the client gave up mid-stream
+
+
+def make_server(config, host="127.0.0.1", port=DEFAULT_PORT, verbose=False):
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.config = config
+    server.rng = random.Random(config.seed)
+    server.rng_lock = threading.Lock()
+    server.stats = StubStats()
+    server.verbose = verbose
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.openai_stub", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="(default: %(default)s)")
+    parser.add_argument("--latency", default="fixed:300", help=LatencyModel.__doc__.replace("\n", " ") + " (default: %(default)s)")
+    parser.add_argument("--per-token-ms", type=float, default=0.0, help="extra delay per completion token (default: 0)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests answered 429 (default: 0)")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="share of requests answered 500/502/503 (default: 0)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429s (default: 1)")
+    parser.add_argument("--completion-tokens", type=int, help="pad coaching replies to about this many tokens")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible latency and failures")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+    try:
+        args.latency = LatencyModel.parse(args.latency)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.rate_429 + args.rate_5xx > 1:
+        parser.error("--rate-429 and --rate-5xx add up to more than 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = StubConfig(
+        latency=args.latency,
+        per_token_ms=args.per_token_ms,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        retry_after=args.retry_after,
+        completion_tokens=args.completion_tokens,
+        seed=args.seed,
+    )
+    server = make_server(config, args.host, args.port, args.verbose)
+    print(f"OpenAI stub listening on http://{args.host}:{args.port}/v1 (latency {args.latency.kind}{list(args.latency.params)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Warm Chromium pool shared by every test in a suite run.
+
+The generated scripts used to start Playwright and launch their own browser,
+so a full run paid browser startup once per test. The pool launches one or
+more browsers up front and hands each test a fresh BrowserContext, which is
+as isolated as the old per-test browser (separate cookies, storage and cache)
+but costs milliseconds instead of seconds.
+"""
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+
+from playwright import async_api
+
+from .auth import needs_session, storage_state
+from .vitals import collect, over_budget, record
+from .waits import track
+
+# Flags the generated scripts launched Chromium with, minus --single-process:
+# one renderer process per browser would serialize every context in the pool.
+LAUNCH_ARGS = [
+    "--window-size=1280,720",
+    "--disable-dev-shm-usage",
+    "--ipc=host",
+]
+
+# What a lone TC script ran with before the pool existed
+STANDALONE_ARGS = LAUNCH_ARGS + ["--single-process"]
+
+DEFAULT_TIMEOUT_MS = 5000
+
+
+class BrowserPool:
+    """Launches ``size`` browsers once and leases isolated contexts from them."""
+
+    def __init__(self, size=1, headless=True, args=None):
+        self.size = max(1, size)
+        self.headless = headless
+        self.args = list(args or LAUNCH_ARGS)
+        self.launch_seconds = 0.0
+        self._pw = None
+        self._browsers = []
+        self._next_browser = None
+
+    async def _launch(self):
+        started = time.perf_counter()
+        browser = await self._pw.chromium.launch(headless=self.headless, args=self.args)
+        return browser, time.perf_counter() - started
+
+    async def start(self):
+        self._pw = await async_api.async_playwright().start()
+        launched = await asyncio.gather(*(self._launch() for _ in range(self.size)))
+        self._browsers = [browser for browser, _ in launched]
+        # Mean cold-start cost of one browser, used to estimate the serial run
+        self.launch_seconds = sum(seconds for _, seconds in launched) / len(launched)
+        self._next_browser = itertools.cycle(self._browsers)
+        return self
+
+    async def stop(self):
+        for browser in self._browsers:
+            await browser.close()
+        self._browsers = []
+        if self._pw:
+            await self._pw.stop()
+            self._pw = None
+
+    @property
+    def playwright(self):
+        return self._pw
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    @asynccontextmanager
+    async def context(self, **options):
+        """Yield a new BrowserContext, spreading leases across the browsers."""
+        context = await next(self._next_browser).new_context(**options)
+        context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+        track(context)
+        await record(context)
+        try:
+            yield context
+        finally:
+            await context.close()
+
+
+async def run_standalone(run_test):
+    """Run one TC script on its own, the way it ran before the pool existed."""
+    async with BrowserPool(args=STANDALONE_ARGS) as pool:
+        options = {}
+        if needs_session(run_test):
+            options["storage_state"] = await storage_state(pool.playwright)
+        async with pool.context(**options) as context:
+            await run_test(context)
+            problems = over_budget(await collect(context))
+        assert not problems, "Performance budget exceeded: " + "; ".join(problems)
@@ -0,0 +1,139 @@
+"""Offline record/replay of /api traffic for the UI tests.
+
+Record mode runs a test against the live stack and lets Playwright write
+every /api request and response to recordings/<test id>.har. Replay mode
+serves those responses from the HAR through ``context.route`` so the
+frontend can be tested with only the Vite server running: no Express,
+MongoDB or OpenAI.
+
+Responses for the same method and URL are replayed in the order they were
+recorded, so a list fetched before and after an insert still comes back in
+both shapes. A request with no recording for its exact query string falls back
+to the same path with any query, then to a 404. Each recorded response is
+served once, whichever way it was looked up; when a URL's recordings are used
+up, the last one served for it repeats (for refetches and polling).
+
+Latency can be injected on replay, either a fixed delay or each entry's
+recorded time, optionally scaled, which reproduces slow-backend runs exactly.
+"""
+import asyncio
+import base64
+import json
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from .config import TESTS_DIR
+
+RECORDINGS_DIR = TESTS_DIR / "recordings"
+
+API_GLOB = "**/api/**"
+
+# Set by the server for the original transfer; wrong once the body is re-served
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def recording_path(test_id):
+    return RECORDINGS_DIR / f"{test_id}.har"
+
+
+def record_options(test_id):
+    """new_context() options that record the test's /api traffic to its HAR."""
+    RECORDINGS_DIR.mkdir(exist_ok=True)
+    return {
+        "record_har_path": str(recording_path(test_id)),
+        "record_har_url_filter": API_GLOB,
+        "record_har_content": "embed",
+    }
+
+
+@dataclass
+class Latency:
+    """Delay added to each replayed response."""
+    fixed_ms: float = 0.0
+    recorded: bool = False  # use each entry's recorded time instead of fixed_ms
+    scale: float = 1.0
+
+    def delay_ms(self, entry):
+        base = entry.get("time", 0.0) if self.recorded else self.fixed_ms
+        return max(0.0, base * self.scale)
+
+    @classmethod
+    def parse(cls, spec, scale=1.0):
+        """``"recorded"`` or a number of milliseconds."""
+        if spec in (None, ""):
+            return cls(scale=scale)
+        if spec == "recorded":
+            return cls(recorded=True, scale=scale)
+        return cls(fixed_ms=float(spec), scale=scale)
+
+
+def _split(url):
+    parts = urlsplit(url)
+    return parts.path, parts.query
+
+
+class ApiReplay:
+    """Serves recorded /api responses to one browser context."""
+
+    def __init__(self, har_path, latency=None):
+        with open(har_path, encoding="utf-8") as fh:
+            entries = json.load(fh)["log"]["entries"]
+        self.latency = latency or Latency()
+        self.misses = []
+        self._entries = entries
+        # Both maps queue indexes into _entries; _served is shared between them
+        self._exact = defaultdict(deque)
+        self._by_path = defaultdict(deque)
+        self._served = set()
+        self._last = {}
+        for index, entry in enumerate(entries):
+            method = entry["request"]["method"]
+            path, query = _split(entry["request"]["url"])
+            self._exact[(method, path, query)].append(index)
+            self._by_path[(method, path)].append(index)
+
+    def _take(self, queues, key):
+        """The next unserved entry under ``key``, else the last one served for it."""
+        queue = queues.get(key)
+        if queue is None:
+            return None
+        while queue and queue[0] in self._served:
+            queue.popleft()
+        if queue:
+            index = queue.popleft()
+            self._served.add(index)
+            self._last[key] = index
+        else:
+            index = self._last.get(key)
+        return None if index is None else self._entries[index]
+
+    def _lookup(self, method, url):
+        path, query = _split(url)
+        return self._take(self._exact, (method, path, query)) or self._take(self._by_path, (method, path))
+
+    async def handle(self, route):
+        request = route.request
+        entry = self._lookup(request.method, request.url)
+        if entry is None:
+            self.misses.append(f"{request.method} {request.url}")
+            await route.fulfill(status=404, json={"message": f"No recorded response for {request.method} {request.url}"})
+            return
+
+        delay = self.latency.delay_ms(entry)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        response = entry["response"]
+        content = response.get("content", {})
+        body = content.get("text", "")
+        body = base64.b64decode(body) if content.get("encoding") == "base64" else body.encode("utf-8")
+        headers = {h["name"]: h["value"] for h in response.get("headers", []) if h["name"].lower() not in _HOP_HEADERS}
+        await route.fulfill(status=response["status"], headers=headers, body=body)
+
+
+async def replay(context, test_id, latency=None):
+    """Answer every /api request in ``context`` from the test's recording."""
+    api = ApiReplay(recording_path(test_id), latency)
+    await context.route(API_GLOB, api.handle)
+    return api
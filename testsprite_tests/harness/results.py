@@ -0,0 +1,215 @@
+"""Append-only result store with a queryable history index.
+
+Usage (from testsprite_tests/):
+
+    python -m harness.results runs                 # most recent suite runs
+    python -m harness.results trend TC008 -n 30    # one test's duration over time
+    python -m harness.results flaky --runs 100     # flip and failure rates per test
+
+tmp/test_results.json is written by TestSprite as one document, with the test
+source and visualization blobs in every result, and is rewritten whole each
+run. The suite runner instead appends one compact JSON line per test to
+tmp/results/results.jsonl as soon as the test finishes:
+
+    {"run": ..., "ts": ..., "test": "TC008", "status": "PASSED",
+     "duration": 4.21, "error": "", "steps": [{"path": "/tracker", "wait_ms": 180.2, "ms": 412.9}, ...]}
+
+tmp/results/index.sqlite3 holds the same records minus the steps. It is
+brought up to date lazily by reading the log from the last offset it
+ingested, so queries never load the whole history into memory.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import uuid
+from contextlib import closing
+from datetime import datetime, timezone
+
+from .config import TMP_DIR
+
+RESULTS_DIR = TMP_DIR / "results"
+LOG_FILE = RESULTS_DIR / "results.jsonl"
+INDEX_FILE = RESULTS_DIR / "index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    run TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    test TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL NOT NULL,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS results_test_ts ON results (test, ts);
+CREATE INDEX IF NOT EXISTS results_run ON results (run);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def new_run_id():
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return f"{stamp}-{uuid.uuid4().hex[:6]}"
+
+
+class ResultLog:
+    """Appends one line per finished test to the JSONL log."""
+
+    def __init__(self, run_id=None, path=LOG_FILE):
+        self.run_id = run_id or new_run_id()
+        self.path = path
+
+    def append(self, result):
+        record = {
+            "run": self.run_id,
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "test": result.test_id,
+            "status": result.status,
+            "duration": round(result.duration, 3),
+            "error": result.error,
+            "steps": result.steps,
+        }
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One write per line in append mode, so concurrent writers never interleave records
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(line)
+        return record
+
+
+class ResultIndex:
+    """SQLite index over the log for trend and flakiness queries."""
+
+    def __init__(self, log_path=LOG_FILE, index_path=INDEX_FILE):
+        self.log_path = log_path
+        self.index_path = index_path
+
+    def _connect(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.index_path)
+        db.executescript(_SCHEMA)
+        return db
+
+    @staticmethod
+    def _offset(db):
+        row = db.execute("SELECT value FROM meta WHERE key = 'offset'").fetchone()
+        return int(row[0]) if row else 0
+
+    def refresh(self):
+        """Ingest log lines appended since the last refresh; return how many."""
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            size = 0
+        added = 0
+        with closing(self._connect()) as db, db:
+            offset = self._offset(db)
+            if offset > size:
+                # The log was truncated or replaced; rebuild from the start
+                db.execute("DELETE FROM results")
+                offset = 0
+            if offset == size:
+                return 0
+            with open(self.log_path, "rb") as fh:
+                fh.seek(offset)
+                for line in iter(fh.readline, b""):
+                    if not line.endswith(b"\n"):
+                        break  # a writer is mid-line; pick it up next time
+                    offset += len(line)
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    db.execute(
+                        "INSERT INTO results (run, ts, test, status, duration, error) VALUES (?, ?, ?, ?, ?, ?)",
+                        (record["run"], record["ts"], record["test"], record["status"],
+                         record["duration"], record.get("error", "")),
+                    )
+                    added += 1
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('offset', ?)", (str(offset),))
+        return added
+
+    def _query(self, sql, params=()):
+        self.refresh()
+        with closing(self._connect()) as db:
+            db.row_factory = sqlite3.Row
+            return [dict(row) for row in db.execute(sql, params)]
+
+    def runs(self, limit=20):
+        return self._query("""
+            SELECT run, MIN(ts) AS started, COUNT(*) AS tests,
+                   SUM(status = 'PASSED') AS passed, ROUND(SUM(duration), 1) AS test_seconds
+            FROM results GROUP BY run ORDER BY started DESC LIMIT ?
+        """, (limit,))
+
+    def trend(self, test, limit=50):
+        """The last ``limit`` results for ``test``, oldest first."""
+        rows = self._query("""
+            SELECT run, ts, status, duration, error FROM results
+            WHERE test = ? ORDER BY ts DESC LIMIT ?
+        """, (test.upper(), limit))
+        return rows[::-1]
+
+    def flaky(self, runs=100):
+        """Per-test failure and flip rates over the last ``runs`` suite runs.
+
+        A flip is a result whose status differs from the same test's previous
+        result; a stable failure has a high fail rate but few flips.
+        """
+        return self._query("""
+            WITH recent AS (
+                SELECT run FROM results GROUP BY run ORDER BY MIN(ts) DESC LIMIT ?
+            ), ordered AS (
+                SELECT test, status, duration,
+                       LAG(status) OVER (PARTITION BY test ORDER BY ts) AS previous
+                FROM results WHERE run IN (SELECT run FROM recent)
+            )
+            SELECT test, COUNT(*) AS results,
+                   ROUND(AVG(status != 'PASSED'), 3) AS fail_rate,
+                   ROUND(CAST(SUM(previous IS NOT NULL AND status != previous) AS REAL)
+                         / MAX(COUNT(*) - 1, 1), 3) AS flip_rate,
+                   ROUND(AVG(duration), 2) AS mean_seconds,
+                   ROUND(MAX(duration), 2) AS max_seconds
+            FROM ordered GROUP BY test
+            ORDER BY flip_rate DESC, fail_rate DESC, test
+        """, (runs,))
+
+
+def _print_table(rows, columns):
+    if not rows:
+        print("No results recorded yet")
+        return
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(f"{c:<{widths[c]}}" for c in columns))
+    for row in rows:
+        print("  ".join(f"{str(row[c]):<{widths[c]}}" for c in columns))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.results", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    runs = commands.add_parser("runs", help="list recent suite runs")
+    runs.add_argument("-n", "--limit", type=int, default=20, help="runs to show (default: 20)")
+    trend = commands.add_parser("trend", help="duration and status history of one test")
+    trend.add_argument("test", help="test id, e.g. TC008")
+    trend.add_argument("-n", "--limit", type=int, default=50, help="results to show (default: 50)")
+    flaky = commands.add_parser("flaky", help="fail and flip rates per test")
+    flaky.add_argument("--runs", type=int, default=100, help="suite runs to consider (default: 100)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    index = ResultIndex()
+    if args.command == "runs":
+        _print_table(index.runs(args.limit), ["run", "started", "tests", "passed", "test_seconds"])
+    elif args.command == "trend":
+        _print_table(index.trend(args.test, args.limit), ["ts", "status", "duration", "run"])
+    else:
+        _print_table(index.flaky(args.runs), ["test", "results", "fail_rate", "flip_rate", "mean_seconds", "max_seconds"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""Concurrent suite runner for the TC scripts.
+
+Usage (from testsprite_tests/):
+
+    python -m harness                      # every TC, one worker per core
+    python -m harness -w 4 -b 2 TC003 TC007
+    python -m harness --baseline           # also time today's serial run
+    python -m harness --record             # save /api traffic, then...
+    python -m harness --replay --latency recorded --latency-scale 3
+    python -m harness --shards             # one process and account per core
+
+Each test gets its own BrowserContext from a shared BrowserPool, and at most
+``--workers`` tests are in flight at once. The summary compares wall-clock
+time against a serial run: measured with ``--baseline`` (and remembered in
+tmp/serial_baseline.json), otherwise estimated from the per-test durations
+plus one browser launch per test.
+
+Every page visit is measured by harness.vitals; a test whose visits exceed
+perf_budgets.json fails unless ``--no-budgets`` is given.
+
+Each result is appended to tmp/results/results.jsonl as the test finishes;
+see harness.results for querying duration trends and flaky tests.
+
+``--shards`` spreads the tests over worker processes that each sign in as a
+freshly provisioned account; see harness.shard.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+
+from .auth import SessionCache, needs_session
+from .config import TESTS_DIR, TMP_DIR
+from .pool import BrowserPool
+from .replay import Latency, record_options, replay
+from .results import ResultLog, new_run_id
+from .shard import print_shards, run_shards
+from .vitals import collect, over_budget
+from .waits import step_timings
+
+BASELINE_FILE = TMP_DIR / "serial_baseline.json"
+
+
+@dataclass
+class TestResult:
+    test_id: str
+    status: str  # PASSED / FAILED, as in tmp/test_results.json
+    duration: float
+    error: str = ""
+    vitals: list = field(default_factory=list)
+    steps: list = field(default_factory=list)
+
+
+def test_id(path):
+    return path.stem.split("_", 1)[0]
+
+
+def discover(selected=None):
+    """Return the TC script paths, optionally filtered by id (``TC003``)."""
+    paths = sorted(TESTS_DIR.glob("TC*.py"))
+    if selected:
+        wanted = {s.upper() for s in selected}
+        paths = [p for p in paths if test_id(p) in wanted]
+    return paths
+
+
+def load_test(path):
+    """Import a TC script by path and return its ``run_test`` coroutine."""
+    spec = importlib.util.spec_from_file_location(f"testsprite_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.run_test
+
+
+def _describe(exc):
+    if isinstance(exc, AssertionError):
+        return str(exc) or "Assertion failed"
+    return "".join(traceback.format_exception_only(type(exc), exc)).strip()
+
+
+@dataclass
+class RunOptions:
+    budgets: bool = True
+    api_mode: str | None = None  # "record" or "replay" /api traffic, see harness.replay
+    latency: Latency | None = None
+
+
+async def run_one(pool, path, slots, sessions, run_options):
+    async with slots:
+        started = time.perf_counter()
+        visits = []
+        steps = []
+        api = None
+        try:
+            run_test = load_test(path)
+            options = {}
+            if run_options.api_mode == "record":
+                options.update(record_options(test_id(path)))
+            if needs_session(run_test) and run_options.api_mode != "replay":
+                options["storage_state"] = await sessions.get()
+            async with pool.context(**options) as context:
+                if run_options.api_mode == "replay":
+                    api = await replay(context, test_id(path), run_options.latency)
+                try:
+                    await run_test(context)
+                finally:
+                    steps = step_timings(context)
+                    visits = await collect(context)
+            problems = over_budget(visits) if run_options.budgets else []
+            assert not problems, "Performance budget exceeded: " + "; ".join(problems)
+        except Exception as exc:
+            error = _describe(exc)
+            if api and api.misses:
+                error += f" ({len(api.misses)} /api requests had no recording, first: {api.misses[0]})"
+            return TestResult(test_id(path), "FAILED", time.perf_counter() - started, error, visits, steps)
+        return TestResult(test_id(path), "PASSED", time.perf_counter() - started, vitals=visits, steps=steps)
+
+
+async def run_suite(paths, workers, browsers=1, headless=True, run_options=None, log=None):
+    """Run ``paths`` concurrently; return (results, wall seconds, launch seconds).
+
+    Each result is appended to ``log`` (a ResultLog) as soon as its test ends.
+    """
+    run_options = run_options or RunOptions()
+    started = time.perf_counter()
+
+    async def run_and_log(pool, path, slots, sessions):
+        result = await run_one(pool, path, slots, sessions, run_options)
+        if log is not None:
+            log.append(result)
+        return result
+
+    async with BrowserPool(browsers, headless=headless) as pool:
+        slots = asyncio.Semaphore(workers)
+        sessions = SessionCache(pool.playwright)
+        results = await asyncio.gather(*(run_and_log(pool, path, slots, sessions) for path in paths))
+        launch_seconds = pool.launch_seconds
+    return list(results), time.perf_counter() - started, launch_seconds
+
+
+def measure_serial(paths):
+    """Time today's behaviour: every script in its own interpreter and browser."""
+    started = time.perf_counter()
+    for path in paths:
+        subprocess.run([sys.executable, str(path)], cwd=TESTS_DIR,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def load_baseline(paths):
+    try:
+        with open(BASELINE_FILE, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if baseline.get("tests") != [test_id(p) for p in paths]:
+        return None
+    return baseline["seconds"]
+
+
+def save_baseline(paths, seconds):
+    TMP_DIR.mkdir(exist_ok=True)
+    with open(BASELINE_FILE, "w", encoding="utf-8") as fh:
+        json.dump({"tests": [test_id(p) for p in paths], "seconds": seconds}, fh, indent=2)
+
+
+def print_report(results, wall, serial, serial_source):
+    width = max(len(r.test_id) for r in results)
+    for r in results:
+        line = f"{r.test_id:<{width}}  {r.status:<6}  {r.duration:7.1f}s"
+        if r.error:
+            line += f"  {r.error.splitlines()[0][:100]}"
+        print(line)
+    passed = sum(r.status == "PASSED" for r in results)
+    print(f"\n{passed}/{len(results)} passed in {wall:.1f}s wall clock")
+    print(f"Serial run ({serial_source}): {serial:.1f}s -> speedup {serial / wall:.2f}x")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness", description=__doc__.splitlines()[0])
+    parser.add_argument("tests", nargs="*", help="test ids to run, e.g. TC003 (default: all)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="tests in flight at once (default: CPU count)")
+    parser.add_argument("-b", "--browsers", type=int, default=1,
+                        help="browsers in the pool; contexts are spread across them (default: 1)")
+    parser.add_argument("--headed", action="store_true", help="show the browser windows")
+    parser.add_argument("--baseline", action="store_true",
+                        help="first time the serial run and remember it for later comparisons")
+    parser.add_argument("--no-budgets", action="store_true",
+                        help="record page vitals but don't fail tests that exceed perf_budgets.json")
+    traffic = parser.add_mutually_exclusive_group()
+    traffic.add_argument("--record", action="store_true",
+                         help="save each test's /api traffic to recordings/<test id>.har")
+    traffic.add_argument("--replay", action="store_true",
+                         help="serve /api from the recordings instead of the backend")
+    parser.add_argument("--latency", metavar="MS|recorded",
+                        help="with --replay, delay each response by MS or by its recorded time")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="with --replay, multiply the injected latency (default: 1.0)")
+    parser.add_argument("--json", metavar="PATH", help="also write the results (with page vitals) as JSON")
+    parser.add_argument("--no-store", action="store_true",
+                        help="don't append the results to tmp/results/results.jsonl")
+    parser.add_argument("--shards", type=int, nargs="?", const=os.cpu_count() or 1, metavar="N",
+                        help="run in N worker processes, each with its own account (default N: CPU count)")
+    # Set by a sharded parent so every worker appends under the same run
+    parser.add_argument("--run-id", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def _worker_args(args):
+    """The options a sharded parent passes through to its workers."""
+    worker_args = ["--browsers", "1"]
+    if args.headed:
+        worker_args.append("--headed")
+    if args.no_budgets:
+        worker_args.append("--no-budgets")
+    if args.no_store:
+        worker_args.append("--no-store")
+    if args.record:
+        worker_args.append("--record")
+    if args.replay:
+        worker_args.append("--replay")
+    if args.latency:
+        worker_args += ["--latency", args.latency]
+    if args.latency_scale != 1.0:
+        worker_args += ["--latency-scale", str(args.latency_scale)]
+    return worker_args
+
+
+def run_sharded(paths, args, run_id):
+    """Run ``paths`` across ``args.shards`` processes; return (results, wall, launch seconds, shards)."""
+    started = time.perf_counter()
+    shards = asyncio.run(run_shards([test_id(p) for p in paths], args.shards, _worker_args(args), run_id))
+    wall = time.perf_counter() - started
+    by_id = {r["test_id"]: TestResult(**r) for shard in shards for r in shard.results}
+    results = [by_id[test_id(p)] for p in paths]
+    launch_seconds = sum(s.launch_seconds for s in shards) / len(shards)
+    return results, wall, launch_seconds, shards
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = discover(args.tests)
+    if not paths:
+        print("No matching TC scripts found", file=sys.stderr)
+        return 2
+
+    if args.baseline:
+        save_baseline(paths, measure_serial(paths))
+
+    run_options = RunOptions(
+        budgets=not args.no_budgets,
+        api_mode="record" if args.record else "replay" if args.replay else None,
+        latency=Latency.parse(args.latency, args.latency_scale),
+    )
+    run_id = args.run_id or new_run_id()
+    log = None if args.no_store else ResultLog(run_id)
+    shards = None
+    if args.shards:
+        results, wall, launch_seconds, shards = run_sharded(paths, args, run_id)
+    else:
+        results, wall, launch_seconds = asyncio.run(
+            run_suite(paths, max(1, args.workers), args.browsers, headless=not args.headed,
+                      run_options=run_options, log=log))
+
+    serial = load_baseline(paths)
+    serial_source = "measured"
+    if serial is None:
+        serial = sum(r.duration for r in results) + launch_seconds * len(results)
+        serial_source = "estimated"
+    if shards:
+        print_shards(shards)
+        print()
+    print_report(results, wall, serial, serial_source)
+    if log is not None:
+        print(f"Appended run {log.run_id} to {log.path}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({
+                "wall_seconds": wall,
+                "serial_seconds": serial,
+                "serial_source": serial_source,
+                "workers": args.workers,
+                "browsers": args.browsers,
+                "shards": [{"index": s.index, "user": s.account.username, "tests": s.tests,
+                            "returncode": s.returncode} for s in shards or []],
+                "launch_seconds": launch_seconds,
+                "results": [asdict(r) for r in results],
+            }, fh, indent=2)
+
+    return 0 if all(r.status == "PASSED" for r in results) else 1
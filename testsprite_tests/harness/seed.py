@@ -0,0 +1,236 @@
+"""Bulk-seed food entries through the API.
+
+Usage (from testsprite_tests/):
+
+    python -m harness.seed --count 5000 --days 90 --concurrency 50
+    python -m harness.seed --user tc016_volume --password secret --top-up
+    python -m harness.seed --count 500 --per-entry       # one POST per entry
+
+Entries are generated from a SeedProfile (meal-type weights, a date window
+and normal distributions for each macro) and sent over one pooled, signed-in
+client: as NDJSON batches to POST /api/food-entries/bulk by default, or one
+POST /api/food-entries per entry with ``--per-entry`` (to load-test the single
+entry path). Every macro is kept above zero so the server never routes a
+seeded entry through analyzeFoodEntry.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+
+from .api import api_client, ensure_account
+from .config import API_URL, LOGIN_PASSWORD, LOGIN_USER
+
+FOODS = [
+    "Apple", "Banana", "Chicken Breast", "Salmon", "Greek Yogurt", "Quinoa",
+    "Oatmeal", "Brown Rice", "Scrambled Eggs", "Turkey Sandwich", "Caesar Salad",
+    "Pasta Bolognese", "Protein Shake", "Almonds", "Broccoli", "Sweet Potato",
+]
+
+# Hour-of-day window each meal type is logged in
+MEAL_HOURS = {
+    "breakfast": (7, 10),
+    "lunch": (11, 14),
+    "dinner": (18, 21),
+    "snack": (9, 22),
+}
+
+
+@dataclass
+class Distribution:
+    """Normal distribution clipped at ``minimum``."""
+    mean: float
+    stdev: float
+    minimum: float = 0.1
+
+    def sample(self, rng):
+        return round(max(self.minimum, rng.gauss(self.mean, self.stdev)), 1)
+
+
+@dataclass
+class SeedProfile:
+    count: int = 1000
+    days: int = 30  # entries are spread over the last ``days`` days
+    meal_weights: dict = field(default_factory=lambda: {"breakfast": 3, "lunch": 3, "dinner": 3, "snack": 2})
+    calories: Distribution = field(default_factory=lambda: Distribution(450, 150, minimum=10))
+    protein: Distribution = field(default_factory=lambda: Distribution(25, 10))
+    carbs: Distribution = field(default_factory=lambda: Distribution(45, 20))
+    fat: Distribution = field(default_factory=lambda: Distribution(15, 8))
+    seed: int | None = None
+
+
+@dataclass
+class SeedReport:
+    created: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rate(self):
+        return self.created / self.seconds if self.seconds else 0.0
+
+
+def generate_entries(profile, now=None):
+    """Yield ``profile.count`` food-entry payloads for POST /api/food-entries."""
+    rng = random.Random(profile.seed)
+    now = now or datetime.now(timezone.utc)
+    meals = list(profile.meal_weights)
+    weights = [profile.meal_weights[m] for m in meals]
+    for _ in range(profile.count):
+        meal = rng.choices(meals, weights)[0]
+        first_hour, last_hour = MEAL_HOURS.get(meal, (0, 23))
+        day = now - timedelta(days=rng.randrange(max(1, profile.days)))
+        entry_date = day.replace(hour=rng.randint(first_hour, last_hour), minute=rng.randrange(60), second=0, microsecond=0)
+        if entry_date > now:
+            entry_date -= timedelta(days=1)
+        yield {
+            "name": rng.choice(FOODS),
+            "servingSize": "1 serving",
+            "mealType": meal,
+            "calories": profile.calories.sample(rng),
+            "protein": profile.protein.sample(rng),
+            "carbs": profile.carbs.sample(rng),
+            "fat": profile.fat.sample(rng),
+            "entryDate": entry_date.isoformat(),
+        }
+
+
+async def count_entries(client):
+    response = await client.get("/api/food-entries")
+    response.raise_for_status()
+    return len(response.json())
+
+
+async def post_entries(client, entries, concurrency=50):
+    """POST every entry with at most ``concurrency`` requests in flight."""
+    report = SeedReport()
+    slots = asyncio.Semaphore(concurrency)
+
+    async def post(entry):
+        async with slots:
+            try:
+                response = await client.post("/api/food-entries", json=entry)
+                response.raise_for_status()
+            except Exception as exc:
+                report.failed += 1
+                if len(report.errors) < 10:
+                    report.errors.append(str(exc))
+            else:
+                report.created += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(post(entry) for entry in entries))
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+async def post_entries_bulk(client, entries, batch_size=1000, concurrency=4):
+    """Send entries to the bulk endpoint in NDJSON batches of ``batch_size``."""
+    report = SeedReport()
+    slots = asyncio.Semaphore(concurrency)
+    entries = list(entries)
+
+    async def post(batch):
+        async with slots:
+            body = "\n".join(json.dumps(entry) for entry in batch)
+            try:
+                response = await client.post("/api/food-entries/bulk", content=body,
+                                             headers={"Content-Type": "application/x-ndjson"})
+                response.raise_for_status()
+                results = response.json()["results"]
+            except Exception as exc:
+                report.failed += len(batch)
+                if len(report.errors) < 10:
+                    report.errors.append(str(exc))
+                return
+            for result in results:
+                if result["status"] == "created":
+                    report.created += 1
+                    continue
+                report.failed += 1
+                if len(report.errors) < 10:
+                    report.errors.append(f"{result['status']}: {result.get('error') or result.get('errors')}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(post(entries[i:i + batch_size]) for i in range(0, len(entries), batch_size)))
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+async def seed_food_entries(profile, username=LOGIN_USER, password=LOGIN_PASSWORD,
+                            base_url=API_URL, concurrency=50, top_up=False, client=None, bulk=True):
+    """Seed ``profile.count`` entries for ``username``.
+
+    With ``top_up`` only the shortfall between the user's current entry count
+    and ``profile.count`` is created, so repeated runs stay at the target size.
+    Pass ``client`` to reuse an already signed-in client, and ``bulk=False``
+    to create the entries one request at a time.
+    """
+    own_client = client is None
+    client = client or api_client(base_url, max_connections=concurrency)
+    try:
+        if own_client:
+            await ensure_account(client, username, password)
+        if top_up:
+            missing = max(0, profile.count - await count_entries(client))
+            profile = replace(profile, count=missing)
+        if bulk:
+            return await post_entries_bulk(client, generate_entries(profile))
+        return await post_entries(client, generate_entries(profile), concurrency)
+    finally:
+        if own_client:
+            await client.aclose()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m harness.seed", description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="entries to create (default: 1000)")
+    parser.add_argument("--days", type=int, default=30, help="spread entries over the last N days (default: 30)")
+    parser.add_argument("--meals", default="breakfast=3,lunch=3,dinner=3,snack=2",
+                        help="meal-type weights (default: %(default)s)")
+    parser.add_argument("--calories", default="450,150", help="mean,stdev of calories (default: %(default)s)")
+    parser.add_argument("--protein", default="25,10", help="mean,stdev of protein g (default: %(default)s)")
+    parser.add_argument("--carbs", default="45,20", help="mean,stdev of carbs g (default: %(default)s)")
+    parser.add_argument("--fat", default="15,8", help="mean,stdev of fat g (default: %(default)s)")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible data")
+    parser.add_argument("--concurrency", type=int, default=50, help="requests in flight with --per-entry (default: 50)")
+    parser.add_argument("--per-entry", action="store_true", help="POST entries one at a time instead of in bulk batches")
+    parser.add_argument("--user", default=LOGIN_USER, help="account to seed; registered if missing")
+    parser.add_argument("--password", default=LOGIN_PASSWORD)
+    parser.add_argument("--base-url", default=API_URL, help="API server (default: %(default)s)")
+    parser.add_argument("--top-up", action="store_true", help="only create entries the user is short of --count")
+    return parser.parse_args(argv)
+
+
+def _distribution(spec, minimum=0.1):
+    mean, stdev = (float(part) for part in spec.split(","))
+    return Distribution(mean, stdev, minimum)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profile = SeedProfile(
+        count=args.count,
+        days=args.days,
+        meal_weights={meal: float(weight) for meal, weight in (pair.split("=") for pair in args.meals.split(","))},
+        calories=_distribution(args.calories, minimum=10),
+        protein=_distribution(args.protein),
+        carbs=_distribution(args.carbs),
+        fat=_distribution(args.fat),
+        seed=args.seed,
+    )
+    report = asyncio.run(seed_food_entries(profile, args.user, args.password, args.base_url,
+                                           args.concurrency, top_up=args.top_up, bulk=not args.per_entry))
+    print(f"Created {report.created} entries in {report.seconds:.1f}s ({report.rate:.0f}/s), {report.failed} failed")
+    for error in report.errors:
+        print(f"  {error}", file=sys.stderr)
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
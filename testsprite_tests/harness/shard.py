@@ -0,0 +1,106 @@
+"""Split a suite run across worker processes with isolated accounts.
+
+``python -m harness --shards [N]`` provisions N fresh accounts (see
+harness.fixtures), assigns the tests to N shards, and runs each shard as a
+``python -m harness`` child process signed in as its own account. Tests run
+one at a time inside a shard, so nothing ever shares an account with a test
+running concurrently, while the shards together use every core.
+
+Tests are assigned longest-first using their mean duration from the result
+history, so shards finish at about the same time. Each child writes its
+results to tmp/shards/<run id>/w<n>.json (its output goes to w<n>.log next to
+it) and appends to the shared result log under the parent's run id; the
+parent merges the JSON files into one report.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+from .config import API_URL, TESTS_DIR, TMP_DIR
+from .fixtures import WorkerAccount, provision_accounts
+from .results import ResultIndex
+
+SHARDS_DIR = TMP_DIR / "shards"
+
+# Assumed duration of a test with no history yet
+DEFAULT_SECONDS = 10.0
+
+
+@dataclass
+class Shard:
+    index: int
+    tests: list
+    account: WorkerAccount | None = None
+    returncode: int | None = None
+    launch_seconds: float = 0.0
+    results: list = field(default_factory=list)  # TestResult dicts from the child's --json
+
+
+def expected_durations(runs=20):
+    """Mean duration per test id over the last ``runs`` recorded suite runs."""
+    return {row["test"]: row["mean_seconds"] for row in ResultIndex().flaky(runs)}
+
+
+def balance(ids, shards, durations=None):
+    """Assign ``ids`` to at most ``shards`` groups with similar total duration."""
+    durations = durations or {}
+    groups = [[] for _ in range(max(1, min(shards, len(ids))))]
+    loads = [0.0] * len(groups)
+    for tid in sorted(ids, key=lambda t: durations.get(t, DEFAULT_SECONDS), reverse=True):
+        slot = loads.index(min(loads))
+        groups[slot].append(tid)
+        loads[slot] += durations.get(tid, DEFAULT_SECONDS)
+    return [sorted(group) for group in groups]
+
+
+def _missing(shard, log_path):
+    reported = {r["test_id"] for r in shard.results}
+    error = f"Shard w{shard.index} exited with code {shard.returncode} before reporting; see {log_path}"
+    return [
+        {"test_id": tid, "status": "FAILED", "duration": 0.0, "error": error, "vitals": [], "steps": []}
+        for tid in shard.tests if tid not in reported
+    ]
+
+
+async def _run_shard(shard, worker_args, run_id, directory):
+    json_path = directory / f"w{shard.index}.json"
+    log_path = directory / f"w{shard.index}.log"
+    env = {**os.environ, **shard.account.env()}
+    with open(log_path, "w", encoding="utf-8") as log:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "harness", *shard.tests,
+            "--workers", "1", "--json", str(json_path), "--run-id", run_id, *worker_args,
+            cwd=TESTS_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        shard.returncode = await process.wait()
+    try:
+        with open(json_path, encoding="utf-8") as fh:
+            report = json.load(fh)
+        shard.results = report["results"]
+        shard.launch_seconds = report.get("launch_seconds", 0.0)
+    except (OSError, ValueError, KeyError):
+        shard.results = []
+    shard.results += _missing(shard, log_path)
+    return shard
+
+
+async def run_shards(ids, shards, worker_args, run_id, base_url=API_URL):
+    """Run ``ids`` in up to ``shards`` child processes; return the finished Shards."""
+    groups = balance(ids, shards, expected_durations())
+    accounts = await provision_accounts(f"shard_{run_id.rsplit('-', 1)[-1]}", len(groups), base_url)
+    directory = SHARDS_DIR / run_id
+    directory.mkdir(parents=True, exist_ok=True)
+    return list(await asyncio.gather(*(
+        _run_shard(Shard(i, group, account), worker_args, run_id, directory)
+        for i, (group, account) in enumerate(zip(groups, accounts))
+    )))
+
+
+def print_shards(shards):
+    for shard in shards:
+        passed = sum(r["status"] == "PASSED" for r in shard.results)
+        print(f"w{shard.index}  {shard.account.username:<24}  {passed}/{len(shard.tests)} passed  "
+              f"exit {shard.returncode}  {' '.join(shard.tests)}")
@@ -0,0 +1,185 @@
+"""Web-vitals and runtime metrics for every page visit in a test.
+
+An init script installs PerformanceObservers in each document and streams
+entries back through an exposed binding, tagged with the document and the
+current path, so client-side route changes count as separate visits. For
+each visit we keep:
+
+* ttfb_ms, dom_content_loaded_ms, load_ms  (navigation timing, full loads only)
+* lcp_ms                                   (largest contentful paint)
+* cls                                      (sum of layout shifts without recent input)
+* long_tasks, long_task_ms                 (count and total duration of >50 ms tasks)
+* js_transferred_kb                        (bytes transferred for script resources)
+* js_heap_mb                               (peak JSHeapUsedSize from CDP Performance.getMetrics)
+
+Visits are checked against perf_budgets.json: the "*" entry applies to every
+path and per-path entries override it.
+"""
+import json
+import weakref
+
+from playwright import async_api
+
+from .config import TESTS_DIR
+
+BUDGETS_FILE = TESTS_DIR / "perf_budgets.json"
+
+_VITALS_SCRIPT = """(() => {
+  if (window.__nutritrackVitals) return;
+  window.__nutritrackVitals = true;
+  const doc = Math.random().toString(36).slice(2);
+  const report = (metric, value) => {
+    try { window.__nutritrackReport({ doc, path: location.pathname, metric, value }); } catch (e) {}
+  };
+  const observe = (type, callback) => {
+    try {
+      new PerformanceObserver(list => list.getEntries().forEach(callback)).observe({ type, buffered: true });
+    } catch (e) {}
+  };
+  observe('largest-contentful-paint', e => report('lcp_ms', e.startTime));
+  observe('layout-shift', e => { if (!e.hadRecentInput) report('layout_shift', e.value); });
+  observe('longtask', e => report('long_task', e.duration));
+  observe('resource', e => {
+    if (e.initiatorType === 'script' || /\\.(m?jsx?|tsx?)$/.test(new URL(e.name).pathname)) {
+      report('js_bytes', e.transferSize || 0);
+    }
+  });
+  window.addEventListener('load', () => setTimeout(() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    if (nav) {
+      report('ttfb_ms', nav.responseStart);
+      report('dom_content_loaded_ms', nav.domContentLoadedEventEnd);
+      report('load_ms', nav.loadEventEnd);
+    }
+    report('loaded', 0);
+  }, 0));
+  for (const name of ['pushState', 'replaceState']) {
+    const original = history[name];
+    history[name] = function (...args) {
+      const before = location.pathname;
+      const result = original.apply(this, args);
+      if (location.pathname !== before) report('route', 0);
+      return result;
+    };
+  }
+  window.addEventListener('popstate', () => report('route', 0));
+})();"""
+
+_MB = 1024 * 1024
+
+
+def _new_visit(key, path):
+    return {
+        "_key": key,
+        "path": path,
+        "lcp_ms": 0.0,
+        "cls": 0.0,
+        "long_tasks": 0,
+        "long_task_ms": 0.0,
+        "js_transferred_kb": 0.0,
+    }
+
+
+class VitalsRecorder:
+    """Collects per-visit metrics for every page opened in one context."""
+
+    def __init__(self, context):
+        self.context = context
+        self.visits = []
+        self._current = {}
+        self._cdp = {}
+
+    async def attach(self):
+        await self.context.expose_binding("__nutritrackReport", self._on_report)
+        await self.context.add_init_script(script=_VITALS_SCRIPT)
+        return self
+
+    async def _heap_mb(self, page):
+        try:
+            session = self._cdp.get(page)
+            if session is None:
+                session = await self.context.new_cdp_session(page)
+                await session.send("Performance.enable")
+                self._cdp[page] = session
+            metrics = await session.send("Performance.getMetrics")
+        except async_api.Error:
+            return None
+        for metric in metrics["metrics"]:
+            if metric["name"] == "JSHeapUsedSize":
+                return metric["value"] / _MB
+        return None
+
+    async def _sample_heap(self, page, visit):
+        heap = await self._heap_mb(page)
+        if heap is not None:
+            visit["js_heap_mb"] = round(max(visit.get("js_heap_mb", 0.0), heap), 1)
+
+    async def _on_report(self, source, report):
+        page = source["page"]
+        if source["frame"] != page.main_frame:
+            return
+        key = (report["doc"], report["path"])
+        visit = self._current.get(page)
+        if visit is None or visit["_key"] != key:
+            if visit is not None and report["metric"] == "route":
+                # The old route is still mounted: this is its closing heap size
+                await self._sample_heap(page, visit)
+            visit = _new_visit(key, report["path"])
+            self._current[page] = visit
+            self.visits.append(visit)
+
+        metric, value = report["metric"], report["value"]
+        if metric == "lcp_ms":
+            visit["lcp_ms"] = round(max(visit["lcp_ms"], value), 1)
+        elif metric == "layout_shift":
+            visit["cls"] = round(visit["cls"] + value, 4)
+        elif metric == "long_task":
+            visit["long_tasks"] += 1
+            visit["long_task_ms"] = round(visit["long_task_ms"] + value, 1)
+        elif metric == "js_bytes":
+            visit["js_transferred_kb"] = round(visit["js_transferred_kb"] + value / 1024, 1)
+        elif metric in ("ttfb_ms", "dom_content_loaded_ms", "load_ms"):
+            visit[metric] = round(value, 1)
+        elif metric == "loaded":
+            await self._sample_heap(page, visit)
+
+    async def finish(self):
+        """Take closing heap samples and return the visits recorded so far."""
+        for page, visit in self._current.items():
+            if not page.is_closed():
+                await self._sample_heap(page, visit)
+        return [{k: v for k, v in visit.items() if k != "_key"} for visit in self.visits]
+
+
+_recorders = weakref.WeakKeyDictionary()
+
+
+async def record(context):
+    """Start recording vitals for ``context``; called by BrowserPool."""
+    recorder = await VitalsRecorder(context).attach()
+    _recorders[context] = recorder
+    return recorder
+
+
+async def collect(context):
+    """Return the visits recorded in ``context`` (empty if it wasn't recorded)."""
+    recorder = _recorders.get(context)
+    return await recorder.finish() if recorder else []
+
+
+def load_budgets(path=BUDGETS_FILE):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def over_budget(visits, budgets=None):
+    """Return a description of every metric that exceeded its page budget."""
+    budgets = load_budgets() if budgets is None else budgets
+    problems = []
+    for visit in visits:
+        limits = {**budgets.get("*", {}), **budgets.get(visit["path"], {})}
+        for metric, limit in limits.items():
+            value = visit.get(metric)
+            if value is not None and value > limit:
+                problems.append(f"{visit['path']} {metric} {value} > {limit}")
+    return problems
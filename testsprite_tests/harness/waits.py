@@ -0,0 +1,166 @@
+"""Event-driven waits for the TC scripts.
+
+The generated scripts slept ``wait_for_timeout(3000)`` before every step, so
+a test's runtime was fixed by its step count. ``settle`` instead returns as
+soon as the page is actually ready for the next step:
+
+* the target element (if any) is attached and visible,
+* no matching ``/api`` request has been in flight for ``IDLE_MS``,
+* React Query reports no running fetches or mutations.
+
+Each wait is bounded by a ceiling. ``settle`` never raises: when the ceiling
+is hit it returns and lets the following click/fill report the real failure
+with its own timeout.
+
+Each ``settle`` call also starts a new step for the test's StepClock, so the
+result store can keep per-step timings without changes to the scripts.
+"""
+import asyncio
+import time
+import weakref
+from urllib.parse import urlsplit
+
+from playwright import async_api
+
+# Upper bound for one settle() call; the old fixed sleep was 3000 ms
+WAIT_CEILING_MS = 10000
+
+# How long the API must stay quiet before the page counts as idle
+IDLE_MS = 100
+
+API_PREFIX = "/api/"
+
+# queryClient is published on window in development builds (lib/queryClient.ts)
+_REACT_QUERY_IDLE = """() => {
+  const client = window.__REACT_QUERY_CLIENT__;
+  return !client || (client.isFetching() === 0 && client.isMutating() === 0);
+}"""
+
+
+class ApiActivity:
+    """Tracks in-flight ``/api`` requests for one browser context."""
+
+    def __init__(self):
+        self._inflight = {}
+        self._last_change = time.monotonic()
+
+    def _path(self, request):
+        url = request.url
+        start = url.find(API_PREFIX)
+        return url[start:] if start != -1 else None
+
+    def on_request(self, request):
+        path = self._path(request)
+        if path is not None:
+            self._inflight[request] = path
+            self._last_change = time.monotonic()
+
+    def on_done(self, request):
+        if self._inflight.pop(request, None) is not None:
+            self._last_change = time.monotonic()
+
+    def busy(self, api=None):
+        return any(api is None or path.startswith(api) for path in self._inflight.values())
+
+    async def wait_idle(self, deadline, api=None):
+        """Wait until nothing matching ``api`` has been in flight for IDLE_MS."""
+        idle = IDLE_MS / 1000
+        while time.monotonic() < deadline:
+            quiet = time.monotonic() - self._last_change
+            if not self.busy(api) and quiet >= idle:
+                return True
+            await asyncio.sleep(min(idle, max(0.01, idle - quiet)))
+        return False
+
+
+class StepClock:
+    """Splits a test into steps, one per settle() call.
+
+    A step runs from one settle() to the next (or to the end of the test), so
+    ``ms`` covers the wait plus the action that followed it and ``wait_ms`` is
+    the part spent waiting.
+    """
+
+    def __init__(self):
+        self.steps = []
+        self._current = None
+
+    def _close(self, now):
+        if self._current is not None:
+            started = self._current.pop("_started")
+            self._current["ms"] = round((now - started) * 1000, 1)
+            self.steps.append(self._current)
+            self._current = None
+
+    def begin(self, path):
+        now = time.monotonic()
+        self._close(now)
+        self._current = {"_started": now, "path": path, "wait_ms": 0.0}
+
+    def waited(self, seconds):
+        if self._current is not None:
+            self._current["wait_ms"] = round(seconds * 1000, 1)
+
+    def finish(self):
+        self._close(time.monotonic())
+        return self.steps
+
+
+_activity = weakref.WeakKeyDictionary()
+_clocks = weakref.WeakKeyDictionary()
+
+
+def track(context):
+    """Start recording API activity and steps for ``context``; called by BrowserPool."""
+    activity = ApiActivity()
+    context.on("request", activity.on_request)
+    context.on("requestfinished", activity.on_done)
+    context.on("requestfailed", activity.on_done)
+    _activity[context] = activity
+    _clocks[context] = StepClock()
+    return activity
+
+
+def step_timings(context):
+    """Return the steps recorded in ``context`` (empty if it wasn't tracked)."""
+    clock = _clocks.get(context)
+    return clock.finish() if clock else []
+
+
+def _remaining_ms(deadline):
+    return max(1, int((deadline - time.monotonic()) * 1000))
+
+
+async def settle(page, locator=None, api=None, timeout=WAIT_CEILING_MS):
+    """Wait until ``page`` is ready for the next step, for at most ``timeout`` ms.
+
+    ``locator`` is the element about to be used; ``api`` narrows the network
+    wait to one endpoint prefix such as ``"/api/food-entries"``.
+    """
+    started = time.monotonic()
+    deadline = started + timeout / 1000
+    clock = _clocks.get(page.context)
+    if clock is not None:
+        clock.begin(urlsplit(page.url).path)
+    try:
+        await _wait_ready(page, locator, api, deadline)
+    finally:
+        if clock is not None:
+            clock.waited(time.monotonic() - started)
+
+
+async def _wait_ready(page, locator, api, deadline):
+    if locator is not None:
+        try:
+            await locator.wait_for(state="visible", timeout=_remaining_ms(deadline))
+        except async_api.Error:
+            return
+
+    activity = _activity.get(page.context)
+    if activity is not None and not await activity.wait_idle(deadline, api):
+        return
+
+    try:
+        await page.wait_for_function(_REACT_QUERY_IDLE, timeout=_remaining_ms(deadline), polling=50)
+    except async_api.Error:
+        pass